@@ -0,0 +1 @@
+"""Benchmarking tools: synthetic feed corpora, stub encoder and stage runner."""
@@ -0,0 +1,286 @@
+"""Deterministic synthetic feed corpora for benchmarks.
+
+A corpus is a directory of RSS 2.0 and Atom files plus a ``manifest.json``
+describing them. The same spec and seed always produce byte-identical files,
+so results from different runs (or machines) measure the code, not the data.
+
+Duplicates are planted on purpose: a share of entries re-publish an earlier
+story from another source verbatim (syndication, caught by the SimHash
+prefilter) or with a word changed (near-duplicates, caught by embeddings).
+"""
+
+import json
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+
+# Words per topic; slugs match the default topics in config.yaml
+TOPIC_WORDS: Dict[str, List[str]] = {
+    'tech': ["software", "hardware", "ai", "programming", "developer", "code", "compiler",
+             "cloud", "chip", "open-source", "framework", "release"],
+    'science': ["research", "study", "discovery", "experiment", "scientific", "telescope",
+                "genome", "climate", "particle", "laboratory", "species", "data"],
+    'business': ["market", "company", "economy", "startup", "finance", "investors", "revenue",
+                 "merger", "shares", "quarter", "profit", "funding"],
+    'politics': ["government", "election", "policy", "law", "political", "senate", "vote",
+                 "minister", "campaign", "parliament", "reform", "court"],
+    'entertainment': ["movie", "music", "tv", "gaming", "film", "album", "series", "studio",
+                      "premiere", "festival", "actor", "trailer"],
+    'sports': ["game", "team", "player", "match", "championship", "league", "season", "coach",
+               "final", "goal", "transfer", "tournament"],
+}
+
+# Newest entry of huge_feed
+HUGE_FEED_DATE = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+FILLER_WORDS = [
+    "the", "a", "new", "after", "with", "for", "on", "in", "report", "says", "today", "week",
+    "major", "early", "plans", "update", "people", "city", "first", "year", "more", "could",
+    "over", "announced", "latest", "amid", "while", "expected", "record", "global",
+]
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a synthetic corpus."""
+
+    sources: int = 20
+    entries: int = 50  # Per source
+    duplicate_rate: float = 0.1  # Share of entries that copy an earlier story verbatim
+    near_duplicate_rate: float = 0.05  # Share that copy an earlier story with one word changed
+    atom_fraction: float = 0.5  # Share of sources published as Atom instead of RSS
+    seed: int = 1234
+
+    @property
+    def articles(self) -> int:
+        return self.sources * self.entries
+
+
+# Named scales for `feedrr bench run --scale`
+SCALES: Dict[str, CorpusSpec] = {
+    '1k': CorpusSpec(sources=20, entries=50),
+    '10k': CorpusSpec(sources=100, entries=100),
+    '100k': CorpusSpec(sources=500, entries=200),
+}
+
+
+@dataclass
+class FeedFile:
+    """One generated feed."""
+
+    name: str
+    path: str  # Relative to the corpus directory
+    format: str  # 'rss' or 'atom'
+    entries: int
+    duplicates: int = 0
+    near_duplicates: int = 0
+
+
+@dataclass
+class Corpus:
+    """A generated corpus on disk."""
+
+    directory: Path
+    spec: CorpusSpec
+    feeds: List[FeedFile] = field(default_factory=list)
+
+    def feed_bytes(self, feed: FeedFile) -> bytes:
+        return (self.directory / feed.path).read_bytes()
+
+    @property
+    def duplicates(self) -> int:
+        return sum(feed.duplicates for feed in self.feeds)
+
+    @property
+    def near_duplicates(self) -> int:
+        return sum(feed.near_duplicates for feed in self.feeds)
+
+
+def _story(rng: random.Random) -> Tuple[str, str]:
+    """A (title, html body) pair about a random topic."""
+    words = TOPIC_WORDS[rng.choice(sorted(TOPIC_WORDS))]
+
+    def sentence(length: int) -> str:
+        return ' '.join(rng.choice(words) if rng.random() < 0.4 else rng.choice(FILLER_WORDS)
+                        for _ in range(length))
+
+    title = sentence(rng.randint(6, 10)).capitalize()
+    paragraphs = [sentence(rng.randint(20, 40)).capitalize() + '.' for _ in range(rng.randint(2, 4))]
+    return title, ''.join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+
+
+def _illustrated(rng: random.Random, index: int, body: str) -> str:
+    """A story body dressed up like a real CMS export: figure, inline markup, tracking script."""
+    figure = (f'<figure><img src="https://images.bench.example/{index}.jpg" alt="" width="800" />'
+              f'<figcaption>Photo {index}</figcaption></figure>')
+    words = body.split(' ')
+    emphasis = rng.randrange(1, len(words) - 1)
+    words[emphasis] = f"<strong>{words[emphasis]}</strong>"
+    return (f'<div class="entry">{figure}{" ".join(words)}'
+            f'<script>track({index});</script><!-- ad slot --></div>')
+
+
+def _perturb(rng: random.Random, body: str) -> str:
+    """Change one word of a story body."""
+    words = body.split(' ')
+    index = rng.randrange(1, len(words) - 1)
+    words[index] = rng.choice(FILLER_WORDS)
+    return ' '.join(words)
+
+
+def _pick_earlier(
+    rng: random.Random,
+    stories: List[Tuple[int, str, str]],
+    index: int,
+    window: int = 1000
+) -> Optional[Tuple[int, str, str]]:
+    """A recent story from a source other than index, if one turns up quickly."""
+    low = max(0, len(stories) - window)
+    for _ in range(8):
+        if len(stories) == low:
+            break
+        story = stories[rng.randrange(low, len(stories))]
+        if story[0] != index:
+            return story
+    return None
+
+
+def _rss(name: str, link: str, items: List[Dict]) -> str:
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>',
+        f"<title>{escape(name)}</title><link>{escape(link)}</link><description>{escape(name)}</description>",
+    ]
+    for item in items:
+        parts.append(
+            f"<item><title>{escape(item['title'])}</title><link>{escape(item['url'])}</link>"
+            f"<guid>{escape(item['url'])}</guid><pubDate>{format_datetime(item['published'])}</pubDate>"
+            f"<description>{escape(item['body'])}</description></item>"
+        )
+    parts.append('</channel></rss>\n')
+    return '\n'.join(parts)
+
+
+def _atom(name: str, link: str, items: List[Dict]) -> str:
+    updated = items[0]['published'].isoformat() if items else '1970-01-01T00:00:00+00:00'
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"<title>{escape(name)}</title><link href={quoteattr(link)}/><id>{escape(link)}</id>"
+        f"<updated>{updated}</updated>",
+    ]
+    for item in items:
+        parts.append(
+            f"<entry><title>{escape(item['title'])}</title><link href={quoteattr(item['url'])}/>"
+            f"<id>{escape(item['url'])}</id><updated>{item['published'].isoformat()}</updated>"
+            f"<summary type=\"html\">{escape(item['body'])}</summary></entry>"
+        )
+    parts.append('</feed>\n')
+    return '\n'.join(parts)
+
+
+def generate_corpus(directory: Path, spec: CorpusSpec) -> Corpus:
+    """
+    Write a synthetic corpus.
+
+    Entries are generated round-robin across sources (newest first), so a
+    duplicate always copies a story some other source published earlier in
+    the generation order.
+
+    Args:
+        directory: Output directory (feeds/ and manifest.json are written here)
+        spec: Corpus shape and seed
+
+    Returns:
+        The generated corpus
+    """
+    rng = random.Random(spec.seed)
+    directory = Path(directory)
+    (directory / "feeds").mkdir(parents=True, exist_ok=True)
+
+    base_date = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    stories: List[Tuple[int, str, str]] = []  # (source index, title, body)
+    items: List[List[Dict]] = [[] for _ in range(spec.sources)]
+    feeds = [
+        FeedFile(
+            name=f"Bench Source {index:04d}",
+            path=f"feeds/source-{index:04d}.xml",
+            format='atom' if rng.random() < spec.atom_fraction else 'rss',
+            entries=spec.entries,
+        )
+        for index in range(spec.sources)
+    ]
+
+    for position in range(spec.entries):
+        for index in range(spec.sources):
+            roll = rng.random()
+            earlier = None
+            if roll < spec.duplicate_rate + spec.near_duplicate_rate:
+                earlier = _pick_earlier(rng, stories, index)
+            if earlier and roll < spec.duplicate_rate:
+                _, title, body = earlier
+                feeds[index].duplicates += 1
+            elif earlier:
+                _, title, body = earlier
+                body = _perturb(rng, body)
+                feeds[index].near_duplicates += 1
+            else:
+                title, body = _story(rng)
+            stories.append((index, title, body))
+            items[index].append({
+                'title': title,
+                'body': body,
+                'url': f"https://source-{index:04d}.bench.example/{position:05d}-{rng.getrandbits(32):08x}",
+                'published': base_date - timedelta(minutes=15 * position + index),
+            })
+
+    for index, feed in enumerate(feeds):
+        link = f"https://source-{index:04d}.bench.example/"
+        render = _atom if feed.format == 'atom' else _rss
+        (directory / feed.path).write_text(render(feed.name, link, items[index]), encoding='utf-8')
+
+    corpus = Corpus(directory=directory, spec=spec, feeds=feeds)
+    manifest = {'spec': asdict(spec), 'feeds': [asdict(feed) for feed in feeds]}
+    (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return corpus
+
+
+def huge_feed(entries: int, images: bool = False) -> bytes:
+    """
+    One RSS feed with many entries, a minute apart going back from HUGE_FEED_DATE.
+
+    Args:
+        entries: Number of items
+        images: Give each body a figure, inline markup and a script, like
+            full-content feeds from real sites
+
+    Returns:
+        UTF-8 encoded feed
+    """
+    rng = random.Random(entries)
+    items = []
+    for index in range(entries):
+        title, body = _story(rng)
+        if images:
+            body = _illustrated(rng, index, body)
+        items.append({
+            'title': title,
+            'body': body,
+            'url': f"https://huge.bench.example/{index}",
+            'published': HUGE_FEED_DATE - timedelta(minutes=index),
+        })
+    return _rss("Huge feed", "https://huge.bench.example/", items).encode('utf-8')
+
+
+def load_corpus(directory: Path) -> Corpus:
+    """Load a corpus previously written by generate_corpus."""
+    directory = Path(directory)
+    manifest = json.loads((directory / "manifest.json").read_text())
+    return Corpus(
+        directory=directory,
+        spec=CorpusSpec(**manifest['spec']),
+        feeds=[FeedFile(**feed) for feed in manifest['feeds']],
+    )
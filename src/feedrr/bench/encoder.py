@@ -0,0 +1,41 @@
+"""Tiny stand-in for the sentence-transformers model.
+
+Hashes words into a fixed number of dimensions, so texts sharing words get
+similar vectors. It is fast and deterministic and needs no torch, so
+benchmarks measure feedrr's own code instead of the model (pass
+``--encoder model`` to include the real model).
+"""
+
+import hashlib
+from typing import List, Union
+
+import numpy as np
+
+
+class StubEncoder:
+    """Deterministic bag-of-words hashing encoder with the model's encode() API."""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self.texts_encoded = 0
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            digest = hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest()
+            vector[int.from_bytes(digest, 'little') % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Encode one text to a (D,) vector or a list of texts to an (N x D) matrix."""
+        if isinstance(texts, str):
+            self.texts_encoded += 1
+            return self._encode_one(texts)
+        self.texts_encoded += len(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._encode_one(text) for text in texts])
@@ -0,0 +1,401 @@
+"""Stage benchmarks over a synthetic corpus.
+
+Runs the pipeline end to end against a fresh database in a scratch directory,
+timing each stage with the build RunReport (wall, CPU, query count/time):
+
+- parse: ``parse_feed`` over every corpus file
+- save: ``save_articles`` per source (URL/SimHash dedup on insert)
+- process: ``ArticleProcessor`` tagging, prefilter and embedding dedup
+- generate: ``generate_site``
+
+The sum is reported as ``build``. ``run_fetch_benchmark`` times the HTTP
+fetch path separately, against the local ``FeedServer``, and
+``run_extract_benchmark`` times entry extraction alone. Results are plain
+JSON so runs can be kept and compared with ``feedrr bench compare``.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from .. import __version__
+from ..config import get_config_path
+from ..instrumentation import RunReport, record_source
+from .corpus import Corpus, CorpusSpec, generate_corpus
+from .encoder import StubEncoder
+
+
+# Bump when the result layout changes
+RESULT_VERSION = 1
+
+
+@contextmanager
+def use_encoder(encoder: Optional[Any]) -> Iterator[None]:
+    """Temporarily replace the process-wide sentence-transformers model."""
+    from ..processor import topics
+
+    if encoder is None:
+        yield
+        return
+
+    previous_model = topics._model
+    previous_matrices = dict(topics._topic_matrices)
+    topics._model = encoder
+    topics._topic_matrices.clear()
+    try:
+        yield
+    finally:
+        topics._model = previous_model
+        topics._topic_matrices.clear()
+        topics._topic_matrices.update(previous_matrices)
+
+
+def environment() -> Dict[str, Any]:
+    """Details needed to compare results across machines and commits."""
+    import numpy
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, cwd=Path(__file__).parent
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        'feedrr': __version__,
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run_pipeline(
+    corpus: Corpus,
+    work_dir: Path,
+    config: Dict,
+    report: RunReport,
+    max_articles: int = 500
+) -> Dict[str, int]:
+    """
+    Run every stage over a corpus, recording each into the report.
+
+    Returns:
+        Items handled per stage (entries parsed, articles saved, ...)
+    """
+    from ..fetcher.rss import parse_feed
+    from ..generator.site import generate_site
+    from ..processor.batch import ArticleProcessor
+    from ..storage.db import get_articles_without_topics, load_topics_from_config, save_articles
+    from ..storage.models import Source, get_session
+
+    items: Dict[str, int] = {}
+    data_dir = work_dir / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    session = get_session(str(data_dir / "feedrr.db"))
+    load_topics_from_config(session, config['topics'])
+
+    with report.stage("parse"):
+        parsed: List[Tuple[str, List[Dict]]] = [
+            (feed.name, parse_feed(corpus.feed_bytes(feed))) for feed in corpus.feeds
+        ]
+    items['parse'] = sum(len(entries) for _, entries in parsed)
+
+    with report.stage("save"):
+        saved = 0
+        for name, entries in parsed:
+            source = Source(name=name, feed_url=f"https://{name.replace(' ', '-').lower()}.bench.example/feed")
+            session.add(source)
+            session.commit()
+            saved += save_articles(session, source, entries)
+    items['save'] = saved
+
+    with report.stage("process"):
+        processor = ArticleProcessor(session, config, data_dir)
+        result = processor.process(get_articles_without_topics(session))
+        processor.close()
+    items['process'] = result.processed
+    items['duplicates'] = result.duplicates
+
+    with report.stage("generate"):
+        generate_site(session, work_dir / "site", max_articles=max_articles)
+    items['generate'] = min(max_articles, saved)
+
+    session.close()
+    return items
+
+
+def run_benchmark(
+    spec: CorpusSpec,
+    work_dir: Path,
+    encoder: Optional[Any] = None,
+    config: Optional[Dict] = None,
+    max_articles: int = 500,
+    label: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Generate a corpus and benchmark the pipeline over it.
+
+    Args:
+        spec: Corpus shape
+        work_dir: Scratch directory (corpus, database, site)
+        encoder: Encoder to use instead of the real model (None = real model)
+        config: Parsed config.yaml (defaults to the project config)
+        max_articles: Articles rendered by the generate stage
+        label: Name for the run (defaults to the article count)
+
+    Returns:
+        JSON-serializable result
+    """
+    if config is None:
+        with open(get_config_path()) as f:
+            config = yaml.safe_load(f)
+
+    work_dir = Path(work_dir)
+    corpus = generate_corpus(work_dir / "corpus", spec)
+    report = RunReport("bench")
+
+    with use_encoder(encoder), report.activate():
+        items = run_pipeline(corpus, work_dir, config, report, max_articles=max_articles)
+
+    stages = {stage['name']: dict(stage) for stage in report.stages}
+    for name, stage in stages.items():
+        count = items.get(name, 0)
+        stage['items'] = count
+        stage['items_per_second'] = count / stage['wall_seconds'] if stage['wall_seconds'] else None
+    stages['build'] = {
+        'wall_seconds': report.total_seconds,
+        'cpu_seconds': sum(stage['cpu_seconds'] for stage in report.stages),
+        'queries': report.query_count,
+        'query_seconds': report.query_seconds,
+        'items': items['save'],
+        'items_per_second': items['save'] / report.total_seconds if report.total_seconds else None,
+    }
+
+    return {
+        'version': RESULT_VERSION,
+        'label': label or f"{spec.articles}",
+        'started_at': report.started_at.isoformat(),
+        'encoder': type(encoder).__name__ if encoder is not None else 'model',
+        'spec': asdict(spec),
+        'corpus': {
+            'bytes': sum((corpus.directory / feed.path).stat().st_size for feed in corpus.feeds),
+            'duplicates': corpus.duplicates,
+            'near_duplicates': corpus.near_duplicates,
+        },
+        'detected_duplicates': items['duplicates'],
+        'environment': environment(),
+        'stages': stages,
+        'encode_batches': len(report.batches),
+    }
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of values (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_fetch_benchmark(
+    urls: List[str],
+    label: str = "fetch",
+    timeout: int = 30,
+    workers: int = 8,
+    min_interval: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Benchmark fetching feeds over HTTP (typically from the local FeedServer).
+
+    Feeds go through the HostScheduler, like `feedrr fetch`. All feeds of a
+    local server share one host, so min_interval defaults to 0 and the host
+    may have every worker busy.
+
+    Args:
+        urls: Feed URLs to fetch
+        label: Name for the run
+        timeout: Per-request timeout passed to the fetcher
+        workers: Requests in flight at once
+        min_interval: Seconds between requests to the same host
+
+    Returns:
+        JSON-serializable result with totals and latency percentiles
+    """
+    from functools import partial
+    from ..fetcher.scheduler import HostScheduler
+    from ..fetcher.stream import stream_feed
+
+    scheduler = HostScheduler(
+        min_interval=min_interval,
+        max_workers=workers,
+        host_concurrency=workers,
+        fetch=partial(stream_feed, timeout=timeout)
+    )
+    report = RunReport("bench fetch")
+    latencies = []
+    articles = 0
+    deferred = 0
+    with report.activate(), report.stage("fetch"):
+        for url, result in scheduler.run(urls):
+            if result is None:
+                deferred += 1
+                continue
+            articles += len(result.articles)
+            latencies.append(result.seconds)
+            record_source(url, seconds=result.seconds)
+
+    stage = report.stages[0]
+    sources = list(report.sources.values())
+    return {
+        'version': RESULT_VERSION,
+        'label': label,
+        'started_at': report.started_at.isoformat(),
+        'environment': environment(),
+        'feeds': len(urls),
+        'workers': workers,
+        'deferred': deferred,
+        'errors': sum(1 for source in sources if source.get('error')),
+        'articles': articles,
+        'bytes': sum(source.get('bytes', 0) for source in sources),
+        'latency': {
+            'p50': percentile(latencies, 0.5),
+            'p95': percentile(latencies, 0.95),
+            'max': max(latencies, default=None),
+        },
+        'stages': {
+            'fetch': {
+                **stage,
+                'items': len(urls),
+                'items_per_second': len(urls) / stage['wall_seconds'] if stage['wall_seconds'] else None,
+            }
+        },
+        'sources': sources,
+    }
+
+
+def run_extract_benchmark(entries: int = 5000, label: str = "extract", repeat: int = 3) -> Dict[str, Any]:
+    """
+    Benchmark entry extraction on one large feed with full HTML bodies.
+
+    Both parse paths are timed over the same bytes: ``parse_feed``
+    (feedparser, used by fetch_feed and as the streaming fallback) and
+    ``iter_entries`` (the streaming fetcher). ``extractor`` times
+    ``EntryExtractor`` alone over entries feedparser already parsed. The
+    best of ``repeat`` runs is reported for each.
+
+    Args:
+        entries: Items in the feed
+        label: Name for the run
+        repeat: Runs per path
+
+    Returns:
+        JSON-serializable result with per-path timings
+    """
+    import feedparser
+    from ..fetcher.extract import EntryExtractor
+    from ..fetcher.rss import parse_feed
+    from ..fetcher.stream import CHUNK_SIZE, iter_entries
+    from .corpus import huge_feed
+
+    data = huge_feed(entries, images=True)
+    chunks = [data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+    parsed_entries = feedparser.parse(data).entries
+
+    def extract() -> List[Dict[str, Any]]:
+        extractor = EntryExtractor()
+        return [extractor.from_entry(entry) for entry in parsed_entries]
+
+    paths = {
+        'parse_feed': lambda: parse_feed(data),
+        'stream': lambda: list(iter_entries(chunks)),
+        'extractor': extract,
+    }
+
+    stages = {}
+    for name, run in paths.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            articles = run()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        stages[name] = {
+            'wall_seconds': best,
+            'items': len(articles),
+            'items_per_second': len(articles) / best if best else None,
+            'images': sum(1 for article in articles if article['image_url']),
+        }
+
+    return {
+        'version': RESULT_VERSION,
+        'label': label,
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'environment': environment(),
+        'entries': entries,
+        'bytes': len(data),
+        'stages': stages,
+    }
+
+
+def write_results(results: List[Dict[str, Any]], output_dir: Path) -> Path:
+    """
+    Write benchmark results as one JSON file.
+
+    Returns:
+        Path of bench-<UTC timestamp>.json in output_dir
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
+    path = output_dir / f"bench-{stamp}.json"
+    path.write_text(json.dumps({'version': RESULT_VERSION, 'runs': results}, indent=2, default=str))
+    return path
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare stage wall times of runs with the same label.
+
+    Args:
+        baseline: Contents of an earlier results file
+        current: Contents of a newer results file
+
+    Returns:
+        Rows with label, stage, both wall times and the relative change
+    """
+    earlier = {run['label']: run for run in baseline['runs']}
+    rows = []
+    for run in current['runs']:
+        before = earlier.get(run['label'])
+        if before is None:
+            continue
+        for stage, timing in run['stages'].items():
+            if stage not in before['stages']:
+                continue
+            old = before['stages'][stage]['wall_seconds']
+            new = timing['wall_seconds']
+            rows.append({
+                'label': run['label'],
+                'stage': stage,
+                'baseline_seconds': old,
+                'current_seconds': new,
+                'change': (new - old) / old if old else None,
+            })
+    return rows
+
+
+def default_encoder(name: str) -> Optional[StubEncoder]:
+    """Encoder for a --encoder choice ('stub' or 'model')."""
+    return StubEncoder() if name == 'stub' else None
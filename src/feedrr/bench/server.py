@@ -0,0 +1,274 @@
+"""Local HTTP server for reproducible fetch benchmarks and tests.
+
+Serves the feeds of a generated corpus (``/feeds/<file>.xml``) plus
+on-the-fly huge feeds (``/huge.xml?entries=N``), and can misbehave like real
+publishers do. Server-wide behaviour comes from ``ServerBehaviour``; any
+request can override it with query parameters:
+
+- ``latency=<seconds>``: delay before the response headers
+- ``rate=<bytes per second>``: trickle the body out slowly
+- ``status=<code>``: respond with this status (e.g. 429, 500, 503)
+- ``retry_after=<seconds>``: Retry-After header on 429/503
+- ``fail_every=<n>``: every n-th request for the path fails with 503
+- ``redirect=<n>``: follow a chain of n 302 redirects first
+- ``gzip=0|1``: gzip the body when the client accepts it
+
+Every response carries an ETag and Last-Modified, and conditional requests
+get a 304. Requests are logged on ``FeedServer.requests`` for assertions.
+"""
+
+import gzip
+import hashlib
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from .corpus import Corpus, huge_feed
+
+
+@dataclass
+class ServerBehaviour:
+    """Server-wide defaults; query parameters override them per request."""
+
+    latency: float = 0.0
+    bytes_per_second: Optional[int] = None
+    gzip: bool = True
+    error_rate: float = 0.0  # Share of feed paths that always fail (chosen by path hash)
+    error_status: int = 503
+    retry_after: Optional[int] = None
+
+
+@dataclass
+class RequestRecord:
+    """One request handled by the server."""
+
+    path: str
+    status: int
+    bytes: int
+    conditional: bool = False
+    gzip: bool = False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "feedrr-bench"
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # Keep benchmark output clean
+
+    def do_GET(self) -> None:
+        self.server.feed_server.handle(self)  # type: ignore[attr-defined]
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients hanging up early (size caps, early stop) are expected
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class FeedServer:
+    """
+    Threaded feed server running in the background.
+
+    Use as a context manager, or call start()/stop().
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        behaviour: Optional[ServerBehaviour] = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        self.directory = Path(directory) if directory else None
+        self.behaviour = behaviour or ServerBehaviour()
+        self.host = host
+        self.port = port
+        self.requests: List[RequestRecord] = []
+        self._counts: Dict[str, int] = {}
+        self._huge: Dict[int, bytes] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def feed_url(self, path: str, **params) -> str:
+        """Absolute URL for a corpus-relative path, with optional behaviour overrides."""
+        query = f"?{urlencode(params)}" if params else ""
+        return f"{self.url}/{path.lstrip('/')}{query}"
+
+    def feed_urls(self, corpus: Corpus) -> List[str]:
+        return [self.feed_url(feed.path) for feed in corpus.feeds]
+
+    def start(self) -> "FeedServer":
+        self._httpd = _QuietServer((self.host, self.port), _Handler)
+        self._httpd.feed_server = self  # type: ignore[attr-defined]
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05}, name="feed-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "FeedServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _body(self, path: str, params: Dict[str, str]) -> Optional[Tuple[bytes, float]]:
+        """Body bytes and modification time for a path, or None if unknown."""
+        if path == "/huge.xml":
+            entries = int(params.get('entries', 10000))
+            with self._lock:
+                if entries not in self._huge:
+                    self._huge[entries] = huge_feed(entries)
+            return self._huge[entries], self._started
+
+        if self.directory is None:
+            return None
+        file_path = (self.directory / path.lstrip('/')).resolve()
+        if self.directory.resolve() not in file_path.parents or not file_path.is_file():
+            return None
+        return file_path.read_bytes(), file_path.stat().st_mtime
+
+    def _failing(self, path: str) -> bool:
+        rate = self.behaviour.error_rate
+        return rate > 0 and (zlib.crc32(path.encode('utf-8')) % 10000) < rate * 10000
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> None:
+        """Serve one request according to the configured behaviour."""
+        parts = urlsplit(handler.path)
+        path = parts.path
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        behaviour = self.behaviour
+
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            count = self._counts[path]
+
+        latency = float(params.get('latency', behaviour.latency))
+        if latency:
+            time.sleep(latency)
+
+        redirects = int(params.pop('redirect', 0))
+        if redirects > 0:
+            if redirects > 1:
+                params['redirect'] = str(redirects - 1)
+            location = path + (f"?{urlencode(params)}" if params else "")
+            self._send_empty(handler, path, 302, {'Location': location})
+            return
+
+        status = int(params.get('status', 0))
+        fail_every = int(params.get('fail_every', 0))
+        if not status and fail_every and count % fail_every == 0:
+            status = 503
+        if not status and self._failing(path):
+            status = behaviour.error_status
+        if status and status >= 400:
+            headers = {}
+            retry_after = params.get('retry_after', behaviour.retry_after)
+            if retry_after is not None and status in (429, 503):
+                headers['Retry-After'] = str(retry_after)
+            self._send_empty(handler, path, status, headers)
+            return
+
+        found = self._body(path, params)
+        if found is None:
+            self._send_empty(handler, path, 404)
+            return
+        body, mtime = found
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        last_modified = formatdate(mtime, usegmt=True)
+        if self._not_modified(handler, etag, mtime):
+            self._send_empty(handler, path, 304, {'ETag': etag, 'Last-Modified': last_modified}, conditional=True)
+            return
+
+        use_gzip = params.get('gzip', '1' if behaviour.gzip else '0') == '1' and \
+            'gzip' in handler.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            body = gzip.compress(body, mtime=0)
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/xml; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.send_header('ETag', etag)
+        handler.send_header('Last-Modified', last_modified)
+        if use_gzip:
+            handler.send_header('Content-Encoding', 'gzip')
+        handler.end_headers()
+
+        rate = params.get('rate', behaviour.bytes_per_second)
+        try:
+            if rate:
+                # Trickle the body out in ~10 chunks per second
+                chunk = max(1, int(rate) // 10)
+                for start in range(0, len(body), chunk):
+                    handler.wfile.write(body[start:start + chunk])
+                    handler.wfile.flush()
+                    time.sleep(0.1)
+            else:
+                handler.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up (timeout or size cap)
+        self._log(RequestRecord(path, 200, len(body), gzip=use_gzip))
+
+    @staticmethod
+    def _not_modified(handler: BaseHTTPRequestHandler, etag: str, mtime: float) -> bool:
+        if_none_match = handler.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        if_modified_since = handler.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_empty(
+        self,
+        handler: BaseHTTPRequestHandler,
+        path: str,
+        status: int,
+        headers: Optional[Dict[str, str]] = None,
+        conditional: bool = False
+    ) -> None:
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', '0')
+        handler.end_headers()
+        self._log(RequestRecord(path, status, 0, conditional=conditional))
+
+    def _log(self, record: RequestRecord) -> None:
+        with self._lock:
+            self.requests.append(record)
+
+    def status_counts(self) -> Dict[int, int]:
+        """Number of responses per status code."""
+        counts: Dict[int, int] = {}
+        for record in self.requests:
+            counts[record.status] = counts.get(record.status, 0) + 1
+        return counts
@@ -1,27 +1,30 @@
 """feedrr CLI - Command Line Interface."""
 
 import click
+import time
 import yaml
+from datetime import datetime
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 
-from feedrr.config import get_config_path, get_feeds_path, get_data_dir
-from feedrr.storage.models import create_database, get_session, Article
+from feedrr.config import get_config_path, get_feeds_path, get_data_dir, get_site_dir, get_logs_dir
+from feedrr.instrumentation import RunReport, profiled, record_source
+from feedrr.storage.models import create_database, get_session
 from feedrr.storage.db import (
     load_sources_from_config,
     get_enabled_sources,
+    get_due_sources,
     save_articles,
     get_article_count,
     get_source_count,
     load_topics_from_config,
-    get_articles_without_topics,
-    assign_topic_to_article
+    get_articles_without_topics
 )
-from feedrr.fetcher.rss import fetch_feed
-from feedrr.processor.topics import assign_topics
-from feedrr.generator.site import generate_site
-from feedrr.config import get_site_dir
+
+# Heavy dependencies (feedparser, sentence-transformers/torch, numpy, jinja2) are
+# imported inside the commands that need them so that `feedrr --help`, `stats`
+# and friends start without loading an ML stack.
 
 console = Console()
 
@@ -72,11 +75,37 @@ def init_db() -> None:
         console.print(f"[red]Error:[/red] {e}")
 
 
+def _fetch_scheduler(session, config: dict, sources: list):
+    """HostScheduler for sources, with host state kept in data/host_state.json."""
+    from feedrr.fetcher.scheduler import scheduler_for_sources
+
+    return scheduler_for_sources(session, config, sources, get_data_dir() / "host_state.json")
+
+
+def _print_fetch_result(source, result, new_count: int) -> None:
+    """Per-source fetch line(s) shared by fetch and the pipelined build."""
+    console.print(f"  Fetched: [bold]{source.name}[/bold]")
+    if result.entries:
+        note = " [dim](stopped at already-seen entries)[/dim]" if result.stopped_early else ""
+        note += " [yellow](truncated at size cap)[/yellow]" if result.truncated else ""
+        console.print(f"    [green]✓[/green] Read {result.entries} entries, {new_count} new{note}")
+    else:
+        console.print(f"    [yellow]![/yellow] No articles found")
+
+
 @main.command()
 @click.option("--all", "fetch_all", is_flag=True, help="Fetch all sources", default=True)
-def fetch(fetch_all: bool) -> None:
-    """Fetch RSS feeds."""
+@click.option("--force", is_flag=True, help="Fetch every enabled source, even if not due yet")
+def fetch(fetch_all: bool, force: bool) -> None:
+    """Fetch RSS feeds that are due (see fetcher.min/max_poll_interval)."""
     try:
+        from feedrr.fetcher.frequency import (
+            DEFAULT_MAX_POLL_INTERVAL,
+            DEFAULT_MIN_POLL_INTERVAL,
+            DUE_GRACE,
+            update_source_schedule
+        )
+
         # Get database path
         db_path = get_data_dir() / "feedrr.db"
         if not db_path.exists():
@@ -86,29 +115,64 @@ def fetch(fetch_all: bool) -> None:
         session = get_session(str(db_path))
 
         # Get enabled sources
-        sources = get_enabled_sources(session)
-        if not sources:
+        enabled = get_enabled_sources(session)
+        if not enabled:
             console.print("[yellow]No enabled sources found[/yellow]")
             session.close()
             return
 
-        console.print(f"[cyan]Fetching from {len(sources)} sources...[/cyan]\n")
+        # Only poll sources that are due, unless forced
+        sources = enabled if force else get_due_sources(session, datetime.utcnow() + DUE_GRACE)
+        if not sources:
+            console.print(f"[yellow]No sources due yet[/yellow] ({len(enabled)} enabled; use --force to fetch anyway)")
+            session.close()
+            return
 
-        total_new = 0
-        for source in sources:
-            console.print(f"  Fetching: [bold]{source.name}[/bold]")
+        with open(get_config_path()) as f:
+            config = yaml.safe_load(f)
+        fetcher_config = config.get('fetcher', {})
+        min_poll = fetcher_config.get('min_poll_interval', DEFAULT_MIN_POLL_INTERVAL)
+        max_poll = fetcher_config.get('max_poll_interval', DEFAULT_MAX_POLL_INTERVAL)
+        by_url = {source.feed_url: source for source in sources}
+        scheduler = _fetch_scheduler(session, config, sources)
 
-            # Fetch articles
-            articles_data = fetch_feed(source.feed_url)
+        skipped = len(enabled) - len(sources)
+        console.print(f"[cyan]Fetching from {len(sources)} sources...[/cyan]"
+                      + (f" [dim]({skipped} not due yet)[/dim]" if skipped else "") + "\n")
 
-            if articles_data:
-                # Save to database
+        total_new = 0
+        deferred = 0
+        for url, result in scheduler.run(by_url):
+            source = by_url[url]
+            if result is None:
+                # Host is backing off after throttling or errors; try again next run
+                deferred += 1
+                console.print(f"  [dim]Deferred: {source.name} (host backing off)[/dim]")
+                continue
+
+            start = time.perf_counter()
+            articles_data = result.articles
+
+            new_count = 0
+            if result.ok:
+                # Save to database (also records the fetch time for the next run's early stop)
                 new_count = save_articles(session, source, articles_data)
                 total_new += new_count
-                console.print(f"    [green]✓[/green] Found {len(articles_data)} articles, {new_count} new")
-            else:
-                console.print(f"    [yellow]![/yellow] No articles found")
-
+                update_source_schedule(source, result.published_dates, new_count,
+                                       min_interval=min_poll, max_interval=max_poll)
+                session.commit()
+            _print_fetch_result(source, result, new_count)
+
+            record_source(
+                source.feed_url,
+                name=source.name,
+                seconds=result.seconds + time.perf_counter() - start,
+                articles=len(articles_data),
+                new=new_count
+            )
+
+        if deferred:
+            console.print(f"\n[yellow]![/yellow] Deferred {deferred} sources on hosts that are backing off")
         session.close()
         console.print(f"\n[bold green]✓ Fetch complete![/bold green] Added {total_new} new articles")
 
@@ -122,13 +186,7 @@ def fetch(fetch_all: bool) -> None:
 def process(limit: int | None, skip_dedup: bool) -> None:
     """Process articles with topic tagging and deduplication."""
     try:
-        from feedrr.processor.dedup import (
-            generate_article_embedding,
-            find_duplicate,
-            mark_as_duplicate,
-            serialize_embedding,
-        )
-        from feedrr.processor.topics import get_model
+        from feedrr.processor.batch import ArticleProcessor
 
         # Get database path
         db_path = get_data_dir() / "feedrr.db"
@@ -138,18 +196,28 @@ def process(limit: int | None, skip_dedup: bool) -> None:
 
         session = get_session(str(db_path))
 
-        # Load topic definitions from config
+        # Load topic definitions and tagging settings from config
         config_path = get_config_path()
         with open(config_path) as f:
             config = yaml.safe_load(f)
 
-        topic_definitions = config['topics']
+        processor = ArticleProcessor(session, config, get_data_dir(), skip_dedup=skip_dedup)
+
+        # Re-score stored embeddings for topics edited in config.yaml
+        retag = processor.retag()
+        if retag.articles:
+            console.print(
+                f"[cyan]Topics changed ({', '.join(retag.changed_topics)}): "
+                f"re-tagged {retag.articles} articles "
+                f"(+{retag.added}/-{retag.removed} assignments)[/cyan]\n"
+            )
 
         # Get articles without topics
         articles = get_articles_without_topics(session)
 
         if not articles:
             console.print("[green]All articles already tagged![/green]")
+            processor.close()
             session.close()
             return
 
@@ -159,55 +227,18 @@ def process(limit: int | None, skip_dedup: bool) -> None:
 
         console.print(f"[cyan]Processing {len(articles)} articles...[/cyan]\n")
 
-        # Load model once for both tagging and deduplication
-        model = get_model()
-
-        processed_count = 0
-        duplicate_count = 0
-
-        for article in articles:
-            # Combine title and content for topic assignment
-            article_text = f"{article.title} {article.content or ''}"
-
-            # Assign topics
-            topic_slugs = assign_topics(article_text, topic_definitions)
-
-            # Save topic assignments
-            for slug in topic_slugs:
-                assign_topic_to_article(session, article, slug)
-
-            # Deduplication
-            if not skip_dedup and not article.is_duplicate:
-                # Generate and store embedding
-                embedding = generate_article_embedding(model, article)
-                article.embedding = serialize_embedding(embedding)
-
-                # Check for duplicates against existing articles with embeddings
-                existing_articles = session.query(Article).filter(
-                    Article.id != article.id,
-                    Article.embedding.isnot(None),
-                    Article.is_duplicate == False
-                ).all()
-
-                duplicate_of = find_duplicate(model, article, existing_articles)
-
-                if duplicate_of:
-                    mark_as_duplicate(article, duplicate_of)
-                    duplicate_count += 1
-
-                session.commit()
-
-            processed_count += 1
-
-            if processed_count % 10 == 0:
-                console.print(f"  Processed {processed_count}/{len(articles)} articles...")
-
+        result = processor.process(
+            articles,
+            progress=lambda done, total: console.print(f"  Processed {done}/{total} articles...")
+        )
+        processor.close()
         session.close()
 
         console.print(f"\n[bold green]✓ Processing complete![/bold green]")
-        console.print(f"  Tagged {processed_count} articles")
+        console.print(f"  Tagged {result.processed} articles")
         if not skip_dedup:
-            console.print(f"  Found {duplicate_count} duplicates")
+            console.print(f"  Found {result.duplicates} duplicates ({result.prefiltered} by prefilter)")
+        console.print(f"  Embedding cache: {processor.cache.hits} hits, {processor.cache.misses} misses")
 
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
@@ -221,6 +252,9 @@ def process(limit: int | None, skip_dedup: bool) -> None:
 def generate(max_articles: int, output: str | None) -> None:
     """Generate static site."""
     try:
+        from feedrr.generator.site import generate_site
+        from feedrr.generator.thumbs import thumbnail_options_from_config
+
         # Get database path
         db_path = get_data_dir() / "feedrr.db"
         if not db_path.exists():
@@ -235,12 +269,19 @@ def generate(max_articles: int, output: str | None) -> None:
 
         session = get_session(str(db_path))
 
+        with open(get_config_path()) as f:
+            config = yaml.safe_load(f)
+        min_topic_score = config.get('generator', {}).get('min_topic_score')
+        site_url = config.get('generator', {}).get('site_url')
+        thumbnails = thumbnail_options_from_config(config)
+
         console.print(f"[cyan]Generating static site...[/cyan]")
         console.print(f"  Output: {output_dir}")
         console.print(f"  Max articles: {max_articles}")
 
         # Generate site
-        generate_site(session, output_dir, max_articles=max_articles)
+        generate_site(session, output_dir, max_articles=max_articles, min_topic_score=min_topic_score,
+                      site_url=site_url, thumbnails=thumbnails)
 
         session.close()
 
@@ -253,36 +294,336 @@ def generate(max_articles: int, output: str | None) -> None:
         console.print(traceback.format_exc())
 
 
+def _build_pipelined() -> None:
+    """Fetch due sources and tag their articles as they arrive (see feedrr.pipeline)."""
+    try:
+        from feedrr.fetcher.frequency import DUE_GRACE
+        from feedrr.pipeline import run_pipelined
+
+        session = get_session(str(get_data_dir() / "feedrr.db"))
+        with open(get_config_path()) as f:
+            config = yaml.safe_load(f)
+
+        sources = get_due_sources(session, datetime.utcnow() + DUE_GRACE)
+        console.print(f"[cyan]Fetching from {len(sources)} due sources...[/cyan]\n")
+
+        def report_result(source, result, new_count: int) -> None:
+            _print_fetch_result(source, result, new_count)
+            record_source(source.feed_url, name=source.name, seconds=result.seconds,
+                          articles=len(result.articles), new=new_count)
+
+        result = run_pipelined(
+            session, config, get_data_dir(), sources, _fetch_scheduler(session, config, sources),
+            on_result=report_result
+        )
+        session.close()
+
+        if result.deferred:
+            console.print(f"\n[yellow]![/yellow] Deferred {result.deferred} sources on hosts that are backing off")
+        if result.retagged:
+            console.print(f"[cyan]Topics changed: re-tagged {result.retagged} articles[/cyan]")
+        console.print(f"\n[bold green]✓ Pipeline complete![/bold green] Added {result.new} new articles, "
+                      f"tagged {result.processed}, found {result.duplicates} duplicates "
+                      f"({result.prefiltered} by prefilter)")
+
+        # Overlap shows as busy time adding up to more than the wall time
+        busy = ", ".join(f"{name} {stage.busy_seconds:.2f}s" for name, stage in result.stages.items())
+        console.print(f"  Stage busy time: {busy} (wall {result.wall_seconds:.2f}s)")
+
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        import traceback
+        console.print(traceback.format_exc())
+
+
 @main.command()
-def build() -> None:
+@click.option("--profile", is_flag=True, help="Write a profile of the run to logs/")
+@click.option(
+    "--profiler",
+    type=click.Choice(["cprofile", "pyinstrument"]),
+    default="cprofile",
+    help="Profiler used with --profile (pyinstrument must be installed)"
+)
+@click.option("--pipelined", is_flag=True,
+              help="Overlap fetching, embedding and tagging instead of running them in turn")
+def build(profile: bool, profiler: str, pipelined: bool) -> None:
     """Run full pipeline: fetch → process → generate."""
     console.print("[bold cyan]feedrr build pipeline[/bold cyan]\n")
 
-    # Step 0: Initialize database if needed
+    report = RunReport("build")
+    profile_path = None
+    if profile:
+        profile_path = get_logs_dir() / f"profile-{report.started_at.strftime('%Y%m%d-%H%M%S')}"
+
+    ctx = click.get_current_context()
+    with report.activate(), profiled(profile_path, profiler) as profile_file:
+        # Step 0: Initialize database if needed
+        db_path = get_data_dir() / "feedrr.db"
+        if not db_path.exists():
+            console.print("[bold]Step 0: Initializing database[/bold]")
+            with report.stage("init"):
+                ctx.invoke(init_db)
+            console.print()
+
+        if pipelined:
+            # Steps 1+2: Fetch, embed and tag concurrently
+            console.print("[bold]Steps 1-2: Fetching and processing (pipelined)[/bold]")
+            with report.stage("pipeline"):
+                _build_pipelined()
+            console.print()
+        else:
+            # Step 1: Fetch
+            console.print("[bold]Step 1: Fetching RSS feeds[/bold]")
+            with report.stage("fetch"):
+                ctx.invoke(fetch)
+            console.print()
+
+            # Step 2: Process
+            console.print("[bold]Step 2: Processing articles[/bold]")
+            with report.stage("process"):
+                ctx.invoke(process)
+            console.print()
+
+        # Step 3: Generate
+        console.print("[bold]Step 3: Generating static site[/bold]")
+        with report.stage("generate"):
+            ctx.invoke(generate)
+        console.print()
+
+    console.print("[bold green]✓ Build pipeline complete![/bold green]\n")
+
+    # Timings: JSON under logs/ for later comparison, table for the run log
+    console.print(report.summary_table())
+    console.print(f"  Run report: {report.write(get_logs_dir())}")
+    if profile_file:
+        console.print(f"  Profile: {profile_file}")
+
+
+@main.command()
+@click.option("--interval", type=float, default=30 * 60, show_default=True,
+              help="Longest sleep between cycles in seconds (cycles start sooner when a source is due)")
+@click.option("--max-articles", type=int, default=500, show_default=True, help="Articles on the generated site")
+@click.option("--cycles", type=int, help="Exit after this many cycles (default: run until stopped)")
+def daemon(interval: float, max_articles: int, cycles: int | None) -> None:
+    """Keep fetching, processing and generating with the model and indexes held in memory.
+
+    SIGTERM/SIGINT stop after the current cycle, SIGHUP reloads config.yaml and
+    rebuilds, SIGUSR1 rebuilds every enabled source right away.
+    """
+    import os
+    from feedrr.daemon import Daemon
+
     db_path = get_data_dir() / "feedrr.db"
     if not db_path.exists():
-        console.print("[bold]Step 0: Initializing database[/bold]")
-        ctx = click.get_current_context()
-        ctx.invoke(init_db)
-        console.print()
+        console.print("[red]Error:[/red] Database not found. Run 'feedrr init-db' first")
+        return
+
+    def log(line: str) -> None:
+        console.print(f"[dim]{time.strftime('%H:%M:%S')}[/dim] {line}")
+
+    runner = Daemon(get_config_path(), get_data_dir(), get_site_dir(),
+                    interval=interval, max_articles=max_articles, log=log)
+    runner.install_signal_handlers()
+    console.print(f"[bold cyan]feedrr daemon[/bold cyan] (pid {os.getpid()}); "
+                  f"kill -HUP to reload and rebuild, kill -TERM to stop\n")
+    runner.run(max_cycles=cycles)
+    console.print("[bold green]✓ Daemon stopped[/bold green]")
+
+
+def _semantic_search(session, query: str, limit: int, duplicates: bool, since, until, source, topic) -> list:
+    """Embed the query (cached) and rank the embedding matrix; see feedrr.processor.semantic."""
+    from datetime import timedelta
+    from feedrr.processor.cache import EmbeddingCache
+    from feedrr.processor.matrix import EmbeddingMatrix
+    from feedrr.processor.semantic import SearchFilters, encode_query, semantic_search
+    from feedrr.processor.topics import MODEL_NAME
+
+    data_dir = get_data_dir()
+    cache = EmbeddingCache(data_dir / "embedding_cache.db", MODEL_NAME)
+    try:
+        query_vector = encode_query(query, cache=cache)
+    finally:
+        cache.close()
 
-    # Step 1: Fetch
-    console.print("[bold]Step 1: Fetching RSS feeds[/bold]")
-    ctx = click.get_current_context()
-    ctx.invoke(fetch)
-    console.print()
+    filters = SearchFilters(
+        since=since,
+        until=until + timedelta(days=1) if until else None,  # Through the end of that day
+        source=source,
+        topic=topic,
+        include_duplicates=duplicates
+    )
+    return semantic_search(session, EmbeddingMatrix(data_dir, MODEL_NAME), query_vector, limit, filters)
 
-    # Step 2: Process
-    console.print("[bold]Step 2: Processing articles[/bold]")
-    ctx.invoke(process)
-    console.print()
 
-    # Step 3: Generate
-    console.print("[bold]Step 3: Generating static site[/bold]")
-    ctx.invoke(generate)
-    console.print()
+@main.command()
+@click.argument("query")
+@click.option("--limit", type=int, default=20, show_default=True, help="Maximum number of results")
+@click.option("--duplicates", is_flag=True, help="Include articles marked as duplicates")
+@click.option("--semantic", is_flag=True, help="Rank by embedding similarity instead of matching words")
+@click.option("--since", type=click.DateTime(formats=["%Y-%m-%d"]), help="Published on or after (--semantic)")
+@click.option("--until", type=click.DateTime(formats=["%Y-%m-%d"]), help="Published on or before (--semantic)")
+@click.option("--source", help="Only this source, by name (--semantic)")
+@click.option("--topic", help="Only this topic, by slug or name (--semantic)")
+def search(
+    query: str,
+    limit: int,
+    duplicates: bool,
+    semantic: bool,
+    since: datetime | None,
+    until: datetime | None,
+    source: str | None,
+    topic: str | None
+) -> None:
+    """Search articles by words in their title and text, or by meaning with --semantic.
+
+    Full-text search matches every word (the last one also as a prefix).
+    Semantic search embeds the query and ranks stored article embeddings.
+    """
+    from rich.markup import escape
+    from feedrr.storage.search import search_articles
 
-    console.print("[bold green]✓ Build pipeline complete![/bold green]")
+    db_path = get_data_dir() / "feedrr.db"
+    if not db_path.exists():
+        console.print("[red]Error:[/red] Database not found. Run 'feedrr init-db' first")
+        return
+    if not semantic and (since or until or source or topic):
+        console.print("[red]Error:[/red] --since, --until, --source and --topic need --semantic")
+        return
+
+    session = get_session(str(db_path))
+    try:
+        start = time.perf_counter()
+        if semantic:
+            hits = _semantic_search(session, query, limit, duplicates, since, until, source, topic)
+        else:
+            hits = search_articles(session, query, limit=limit, include_duplicates=duplicates)
+        elapsed = time.perf_counter() - start
+        if not hits:
+            console.print(f"[yellow]No articles match[/yellow] {query!r}")
+            return
+
+        table = Table(title=f"{len(hits)} results for {query!r} ({elapsed * 1000:.1f} ms)")
+        table.add_column("Date", style="dim", no_wrap=True)
+        table.add_column("Source", style="cyan")
+        table.add_column("Article")
+        if semantic:
+            table.add_column("Score", justify="right")
+        for hit in hits:
+            article = hit.article
+            date = article.published_date or article.fetched_date
+            table.add_row(
+                date.strftime("%Y-%m-%d") if date else "",
+                escape(article.source.name),
+                f"[bold]{escape(article.title)}[/bold]\n[dim]{escape(hit.snippet)}[/dim]\n{escape(article.url)}",
+                *([f"{hit.score:.3f}"] if semantic else [])
+            )
+        console.print(table)
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+    finally:
+        session.close()
+
+
+@main.command()
+@click.option("--days", type=int, help="Retention window in days (default: database.retention_days, else 90)")
+@click.option("--keep", type=int, default=500, show_default=True,
+              help="Newest articles that keep their content whatever their age")
+@click.option("--dry-run", is_flag=True, help="Only report how many articles would be archived")
+def compact(days: int | None, keep: int, dry_run: bool) -> None:
+    """Archive old articles' content and embeddings, then VACUUM and ANALYZE the database.
+
+    Archived articles keep their url, title, topics and cluster; their text
+    goes to data/archive/articles-YYYY-MM.jsonl.gz.
+    """
+    from feedrr.processor.matrix import EmbeddingMatrix
+    from feedrr.processor.topics import MODEL_NAME
+    from feedrr.storage.models import get_engine
+    from feedrr.storage.retention import DEFAULT_RETENTION_DAYS, archive_articles, vacuum
+
+    data_dir = get_data_dir()
+    db_path = data_dir / "feedrr.db"
+    if not db_path.exists():
+        console.print("[red]Error:[/red] Database not found. Run 'feedrr init-db' first")
+        return
+
+    if days is None:
+        with open(get_config_path()) as f:
+            config = yaml.safe_load(f)
+        days = config.get('database', {}).get('retention_days', DEFAULT_RETENTION_DAYS)
+
+    matrix = EmbeddingMatrix(data_dir, MODEL_NAME)
+    tracked = [db_path, matrix.vectors_path, matrix.ids_path]
+
+    def total_size() -> int:
+        return sum(path.stat().st_size for path in tracked if path.exists())
+
+    before = total_size()
+    session = get_session(str(db_path))
+    result = archive_articles(session, data_dir / "archive", days=days, keep=keep, dry_run=dry_run)
+
+    if dry_run or not result.articles:
+        session.close()
+        if dry_run:
+            console.print(f"[bold]{result.articles}[/bold] articles older than {days} days would be archived")
+        else:
+            console.print(f"Nothing to compact: no article older than {days} days still holds content")
+        return
+
+    console.print(f"[green]✓[/green] Archived {result.articles} articles to {len(result.files)} "
+                  f"file(s) in {data_dir / 'archive'}")
+
+    # Drop the cleared embeddings from the memory-mapped mirror too
+    matrix.sync(session)
+    session.close()
+    vacuum(get_engine(str(db_path)))
+
+    after = total_size()
+    console.print(f"[bold green]✓ Compacted[/bold green] {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+                  f"({(before - after) / 1e6:.1f} MB reclaimed)")
+
+
+@main.group()
+def cache() -> None:
+    """Export or import warm-start snapshots (model, embedding cache and matrix)."""
+    pass
+
+
+@cache.command("export")
+@click.argument("path", type=click.Path(dir_okay=False), default="feedrr-snapshot.tar")
+def cache_export(path: str) -> None:
+    """Write the model, embedding cache and embedding matrix to PATH."""
+    from feedrr.snapshot import export_snapshot
+
+    manifest = export_snapshot(Path(path), get_data_dir())
+    files = manifest['files']
+    size = sum(entry['size'] for entry in files.values())
+    model_files = sum(1 for name in files if name.startswith('model/'))
+    console.print(f"[green]✓[/green] Snapshot written to {path}: {len(files)} files, "
+                  f"{size / 1e6:.1f} MB ({model_files} model files)")
+
+
+@cache.command("import")
+@click.argument("path", type=click.Path(dir_okay=False), default="feedrr-snapshot.tar")
+@click.option("--force", is_flag=True, help="Replace files that already exist")
+def cache_import(path: str, force: bool) -> None:
+    """Restore a snapshot written by 'feedrr cache export'.
+
+    Exits with status 1 if the snapshot is unusable, so CI can fall back to a cold start.
+    """
+    from feedrr.snapshot import SnapshotError, import_snapshot
+
+    try:
+        outcome = import_snapshot(Path(path), get_data_dir(), overwrite=force)
+    except SnapshotError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise SystemExit(1)
+
+    for name in outcome['restored']:
+        console.print(f"  [green]✓[/green] Restored {name}")
+    for name in outcome['skipped']:
+        console.print(f"  [dim]Skipped {name}[/dim]")
+    console.print(f"[bold green]✓ Snapshot imported[/bold green] ({len(outcome['restored'])} restored, "
+                  f"{len(outcome['skipped'])} skipped)")
 
 
 @main.command()
@@ -316,6 +657,254 @@ def stats() -> None:
         console.print(f"[red]Error:[/red] {e}")
 
 
+@main.group()
+def bench() -> None:
+    """Run performance benchmarks on synthetic corpora."""
+    pass
+
+
+@bench.command("run")
+@click.option("--scale", "scales", multiple=True, default=["1k"], show_default=True,
+              type=click.Choice(["1k", "10k", "100k"]), help="Corpus size (repeatable)")
+@click.option("--sources", "source_count", type=int, help="Override the number of sources")
+@click.option("--entries", type=int, help="Override entries per source")
+@click.option("--duplicate-rate", type=float, help="Share of verbatim syndicated copies")
+@click.option("--near-duplicate-rate", type=float, help="Share of copies with one word changed")
+@click.option("--seed", type=int, default=1234, show_default=True, help="Corpus random seed")
+@click.option("--encoder", type=click.Choice(["stub", "model"]), default="stub", show_default=True,
+              help="Hashing stub encoder or the real sentence-transformers model")
+@click.option("--output", type=click.Path(), help="Results directory (default: logs/bench/)")
+def bench_run(
+    scales: tuple,
+    source_count: int | None,
+    entries: int | None,
+    duplicate_rate: float | None,
+    near_duplicate_rate: float | None,
+    seed: int,
+    encoder: str,
+    output: str | None
+) -> None:
+    """Benchmark each pipeline stage and the full build."""
+    import dataclasses
+    import tempfile
+    from feedrr.bench.corpus import SCALES
+    from feedrr.bench.runner import default_encoder, run_benchmark, write_results
+
+    overrides = {
+        'sources': source_count,
+        'entries': entries,
+        'duplicate_rate': duplicate_rate,
+        'near_duplicate_rate': near_duplicate_rate,
+        'seed': seed,
+    }
+    overrides = {key: value for key, value in overrides.items() if value is not None}
+
+    results = []
+    for scale in scales:
+        spec = dataclasses.replace(SCALES[scale], **overrides)
+        console.print(f"[cyan]Benchmarking {spec.articles} articles "
+                      f"({spec.sources} sources x {spec.entries} entries)...[/cyan]")
+        with tempfile.TemporaryDirectory(prefix="feedrr-bench-") as work_dir:
+            result = run_benchmark(spec, Path(work_dir), encoder=default_encoder(encoder), label=scale)
+        results.append(result)
+
+        table = Table(title=f"feedrr bench {scale}")
+        table.add_column("Stage", style="cyan")
+        table.add_column("Wall (s)", justify="right")
+        table.add_column("CPU (s)", justify="right")
+        table.add_column("Queries", justify="right")
+        table.add_column("Items/s", justify="right", style="green")
+        for name, stage in result['stages'].items():
+            rate = stage['items_per_second']
+            table.add_row(
+                name,
+                f"{stage['wall_seconds']:.2f}",
+                f"{stage['cpu_seconds']:.2f}",
+                str(stage['queries']),
+                f"{rate:,.0f}" if rate else "-",
+            )
+        console.print(table)
+
+    path = write_results(results, Path(output) if output else get_logs_dir() / "bench")
+    console.print(f"[green]✓[/green] Results written to {path}")
+
+
+@bench.command("fetch")
+@click.option("--scale", default="1k", show_default=True, type=click.Choice(["1k", "10k", "100k"]),
+              help="Corpus size when generating a corpus")
+@click.option("--sources", "source_count", type=int, help="Override the number of feeds")
+@click.option("--corpus", "corpus_dir", type=click.Path(exists=True, file_okay=False),
+              help="Use an existing corpus directory instead of generating one")
+@click.option("--url", "base_url", help="Fetch from an already running server (e.g. feedrr bench serve)")
+@click.option("--latency", type=float, default=0.0, help="Seconds before each response")
+@click.option("--rate", type=int, help="Trickle bodies at this many bytes per second")
+@click.option("--error-rate", type=float, default=0.0, help="Share of feeds answering with an error")
+@click.option("--error-status", type=int, default=503, show_default=True, help="Status used for errors")
+@click.option("--no-gzip", is_flag=True, help="Serve uncompressed bodies")
+@click.option("--workers", type=int, default=8, show_default=True, help="Requests in flight at once")
+@click.option("--min-interval", type=float, default=0.0, show_default=True,
+              help="Seconds between requests to the same host")
+@click.option("--output", type=click.Path(), help="Results directory (default: logs/bench/)")
+def bench_fetch(
+    scale: str,
+    source_count: int | None,
+    corpus_dir: str | None,
+    base_url: str | None,
+    latency: float,
+    rate: int | None,
+    error_rate: float,
+    error_status: int,
+    no_gzip: bool,
+    workers: int,
+    min_interval: float,
+    output: str | None
+) -> None:
+    """Benchmark fetching against the local fake feed server."""
+    import dataclasses
+    import tempfile
+    from feedrr.bench.corpus import SCALES, generate_corpus, load_corpus
+    from feedrr.bench.runner import run_fetch_benchmark, write_results
+    from feedrr.bench.server import FeedServer, ServerBehaviour
+
+    with tempfile.TemporaryDirectory(prefix="feedrr-bench-") as work_dir:
+        if corpus_dir:
+            corpus = load_corpus(Path(corpus_dir))
+        else:
+            spec = SCALES[scale]
+            if source_count:
+                spec = dataclasses.replace(spec, sources=source_count)
+            corpus = generate_corpus(Path(work_dir) / "corpus", spec)
+
+        behaviour = ServerBehaviour(
+            latency=latency,
+            bytes_per_second=rate,
+            gzip=not no_gzip,
+            error_rate=error_rate,
+            error_status=error_status
+        )
+        if base_url:
+            urls = [f"{base_url.rstrip('/')}/{feed.path}" for feed in corpus.feeds]
+            console.print(f"[cyan]Fetching {len(urls)} feeds from {base_url}...[/cyan]")
+            result = run_fetch_benchmark(urls, label=f"fetch-{len(urls)}", workers=workers,
+                                         min_interval=min_interval)
+        else:
+            with FeedServer(corpus.directory, behaviour) as server:
+                console.print(f"[cyan]Fetching {len(corpus.feeds)} feeds from {server.url}...[/cyan]")
+                result = run_fetch_benchmark(server.feed_urls(corpus), label=f"fetch-{len(corpus.feeds)}",
+                                             workers=workers, min_interval=min_interval)
+
+    fetch_stage = result['stages']['fetch']
+    latencies = result['latency']
+    table = Table(title="feedrr bench fetch")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right", style="green")
+    table.add_row("Feeds", str(result['feeds']))
+    table.add_row("Errors", str(result['errors']))
+    table.add_row("Deferred", str(result['deferred']))
+    table.add_row("Articles", str(result['articles']))
+    table.add_row("Downloaded", f"{result['bytes'] / 1024:,.0f} KiB")
+    table.add_row("Wall (s)", f"{fetch_stage['wall_seconds']:.2f}")
+    table.add_row("Feeds/s", f"{fetch_stage['items_per_second'] or 0:,.1f}")
+    if latencies['p50'] is not None:
+        table.add_row("Latency p50/p95/max (s)",
+                      f"{latencies['p50']:.3f} / {latencies['p95']:.3f} / {latencies['max']:.3f}")
+    console.print(table)
+
+    path = write_results([result], Path(output) if output else get_logs_dir() / "bench")
+    console.print(f"[green]✓[/green] Results written to {path}")
+
+
+@bench.command("extract")
+@click.option("--entries", type=int, default=5000, show_default=True, help="Items in the benchmark feed")
+@click.option("--repeat", type=int, default=3, show_default=True, help="Runs per parse path (best is kept)")
+@click.option("--output", type=click.Path(), help="Results directory (default: logs/bench/)")
+def bench_extract(entries: int, repeat: int, output: str | None) -> None:
+    """Benchmark entry extraction on one large feed with full HTML bodies."""
+    from feedrr.bench.runner import run_extract_benchmark, write_results
+
+    console.print(f"[cyan]Extracting {entries} entries...[/cyan]")
+    result = run_extract_benchmark(entries, label=f"extract-{entries}", repeat=repeat)
+
+    table = Table(title=f"feedrr bench extract ({result['bytes'] / 1024:,.0f} KiB)")
+    table.add_column("Path", style="cyan")
+    table.add_column("Wall (s)", justify="right", style="green")
+    table.add_column("Entries/s", justify="right", style="green")
+    table.add_column("Images", justify="right")
+    for name, stage in result['stages'].items():
+        table.add_row(name, f"{stage['wall_seconds']:.3f}", f"{stage['items_per_second'] or 0:,.0f}",
+                      str(stage['images']))
+    console.print(table)
+
+    path = write_results([result], Path(output) if output else get_logs_dir() / "bench")
+    console.print(f"[green]✓[/green] Results written to {path}")
+
+
+@bench.command("serve")
+@click.option("--scale", default="1k", show_default=True, type=click.Choice(["1k", "10k", "100k"]))
+@click.option("--corpus", "corpus_dir", type=click.Path(file_okay=False),
+              help="Corpus directory (generated there if it has no manifest)")
+@click.option("--port", type=int, default=8765, show_default=True)
+@click.option("--latency", type=float, default=0.0, help="Seconds before each response")
+@click.option("--error-rate", type=float, default=0.0, help="Share of feeds answering with an error")
+def bench_serve(scale: str, corpus_dir: str | None, port: int, latency: float, error_rate: float) -> None:
+    """Serve a synthetic corpus over HTTP until interrupted."""
+    import tempfile
+    import time as time_module
+    from feedrr.bench.corpus import SCALES, generate_corpus, load_corpus
+    from feedrr.bench.server import FeedServer, ServerBehaviour
+
+    directory = Path(corpus_dir) if corpus_dir else Path(tempfile.mkdtemp(prefix="feedrr-corpus-"))
+    if (directory / "manifest.json").exists():
+        corpus = load_corpus(directory)
+    else:
+        corpus = generate_corpus(directory, SCALES[scale])
+
+    behaviour = ServerBehaviour(latency=latency, error_rate=error_rate)
+    with FeedServer(corpus.directory, behaviour, port=port) as server:
+        console.print(f"[green]✓[/green] Serving {len(corpus.feeds)} feeds from {corpus.directory}")
+        console.print(f"  First feed: {server.feed_url(corpus.feeds[0].path)}")
+        console.print(f"  Huge feed:  {server.feed_url('huge.xml', entries=50000)}")
+        console.print("  Press Ctrl+C to stop")
+        try:
+            while True:
+                time_module.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+@bench.command("compare")
+@click.argument("baseline", type=click.Path(exists=True))
+@click.argument("current", type=click.Path(exists=True))
+def bench_compare(baseline: str, current: str) -> None:
+    """Compare two benchmark result files."""
+    import json
+    from feedrr.bench.runner import compare_results
+
+    rows = compare_results(json.loads(Path(baseline).read_text()), json.loads(Path(current).read_text()))
+    if not rows:
+        console.print("[yellow]No runs with matching labels to compare[/yellow]")
+        return
+
+    table = Table(title="feedrr bench comparison")
+    table.add_column("Run", style="cyan")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Baseline (s)", justify="right")
+    table.add_column("Current (s)", justify="right")
+    table.add_column("Change", justify="right")
+    for row in rows:
+        change = row['change']
+        if change is None:
+            change_str = "-"
+        else:
+            colour = "red" if change > 0.1 else "green" if change < -0.1 else "white"
+            change_str = f"[{colour}]{change:+.1%}[/{colour}]"
+        table.add_row(
+            row['label'], row['stage'],
+            f"{row['baseline_seconds']:.2f}", f"{row['current_seconds']:.2f}", change_str
+        )
+    console.print(table)
+
+
 @main.group()
 def sources() -> None:
     """Manage RSS feed sources."""
@@ -0,0 +1,235 @@
+"""Long-running build loop for self-hosted deployments.
+
+A cron job pays the full cold start on every run: importing torch, loading
+the model, connecting and upgrading the database, building the SimHash and
+embedding indexes. ``feedrr daemon`` pays it once and then keeps everything
+in memory:
+
+- the database engine (one connection pool for the process)
+- the SentenceTransformer model and the topic matrix
+- one ArticleProcessor with its embedding cache, SimHash index and
+  memory-mapped embedding index, extended as articles are added
+
+Each cycle fetches the sources that are due through the pipelined build
+(fetch, embed and tag overlapped) and regenerates the site only when
+something changed. Between cycles the daemon sleeps until the next source is
+due, capped at ``interval``.
+
+Signals:
+
+- SIGTERM / SIGINT: finish the current cycle, then exit (a second one exits
+  immediately)
+- SIGHUP: reload config.yaml and rebuild now
+- SIGUSR1: rebuild now (every enabled source, due or not)
+"""
+
+import signal
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import yaml
+from sqlalchemy import func
+
+from .fetcher.frequency import DUE_GRACE
+from .fetcher.scheduler import scheduler_for_sources
+from .generator.site import generate_site
+from .generator.thumbs import thumbnail_options_from_config
+from .pipeline import PipelineResult, run_pipelined
+from .processor.batch import ArticleProcessor
+from .storage.db import get_due_sources, get_enabled_sources
+from .storage.models import Source, get_session
+
+
+# Longest sleep between cycles, and the shortest (so a source that is always due can't spin)
+DEFAULT_INTERVAL = 30 * 60
+MIN_INTERVAL = 60
+
+
+@dataclass
+class CycleResult:
+    """What one daemon cycle did."""
+
+    sources: int
+    pipeline: PipelineResult
+    generated: bool
+    seconds: float
+
+
+class Daemon:
+    """
+    Fetch/process/generate loop with warm in-memory state.
+
+    Args:
+        config_path: config.yaml, re-read on SIGHUP
+        data_dir: Database, caches and host state
+        site_dir: Output directory for the generated site
+        interval: Longest sleep between cycles (seconds)
+        max_articles: Articles rendered per site generation
+        model: Encoder to use instead of get_model() (tests, benchmarks)
+        log: Receives one line per event
+    """
+
+    def __init__(
+        self,
+        config_path: Path,
+        data_dir: Path,
+        site_dir: Path,
+        interval: float = DEFAULT_INTERVAL,
+        max_articles: int = 500,
+        model: Optional[Any] = None,
+        log: Callable[[str], None] = print
+    ):
+        self.config_path = Path(config_path)
+        self.data_dir = Path(data_dir)
+        self.site_dir = Path(site_dir)
+        self.interval = interval
+        self.max_articles = max_articles
+        self.model = model
+        self.log = log
+
+        self.session = get_session(str(self.data_dir / "feedrr.db"))
+        self.config: Dict = {}
+        self.processor: Optional[ArticleProcessor] = None
+        self.cycles = 0
+
+        self._wake = threading.Event()
+        self._stopping = False
+        self._rebuild = False
+        self._reload = True
+
+    # Requests (safe to call from signal handlers and other threads)
+
+    def request_stop(self) -> None:
+        """Exit after the current cycle."""
+        self._stopping = True
+        self._wake.set()
+
+    def request_rebuild(self, reload_config: bool = False) -> None:
+        """Run a full cycle now instead of waiting for the next due source."""
+        self._rebuild = True
+        self._reload = self._reload or reload_config
+        self._wake.set()
+
+    def install_signal_handlers(self) -> None:
+        """Map SIGTERM/SIGINT to a graceful stop, SIGHUP/SIGUSR1 to a rebuild (main thread only)."""
+        def stop(signum, frame) -> None:
+            if self._stopping:
+                raise KeyboardInterrupt
+            self.log(f"Received {signal.Signals(signum).name}, stopping after this cycle")
+            self.request_stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.request_rebuild(reload_config=True))
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.request_rebuild())
+
+    # Cycle
+
+    def _load(self) -> None:
+        """(Re)read config.yaml and rebuild the processor for its topics and settings."""
+        with open(self.config_path) as f:
+            self.config = yaml.safe_load(f)
+        if self.processor is not None:
+            self.processor.close()
+        self.processor = ArticleProcessor(self.session, self.config, self.data_dir)
+        self._reload = False
+
+    def cycle(self, force: bool = False) -> CycleResult:
+        """
+        Fetch due sources (every enabled source if force), tag what's new and regenerate if needed.
+
+        Returns:
+            What the cycle did
+        """
+        start = time.perf_counter()
+        if self._reload:
+            self._load()
+
+        if force:
+            sources = get_enabled_sources(self.session)
+        else:
+            sources = get_due_sources(self.session, datetime.utcnow() + DUE_GRACE)
+        scheduler = scheduler_for_sources(self.session, self.config, sources, self.data_dir / "host_state.json")
+        result = run_pipelined(
+            self.session, self.config, self.data_dir, sources, scheduler,
+            model=self.model, processor=self.processor
+        )
+
+        # The first cycle always renders, so the site reflects this process's templates
+        generated = force or self.cycles == 0 or bool(result.new or result.retagged)
+        if generated:
+            generator_config = self.config.get('generator', {})
+            generate_site(self.session, self.site_dir, max_articles=self.max_articles,
+                          min_topic_score=generator_config.get('min_topic_score'),
+                          site_url=generator_config.get('site_url'),
+                          thumbnails=thumbnail_options_from_config(self.config))
+
+        # Drop this cycle's ORM objects; the engine and indexes stay warm
+        self.session.close()
+        self.cycles += 1
+        return CycleResult(len(sources), result, generated, time.perf_counter() - start)
+
+    def next_wait(self) -> float:
+        """Seconds until the next source is due, between MIN_INTERVAL and interval."""
+        next_due = self.session.query(func.min(Source.next_due_at)).filter(Source.enabled == True).scalar()
+        self.session.close()
+        if next_due is None:
+            return self.interval
+        wait = (next_due - datetime.utcnow()).total_seconds()
+        return min(self.interval, max(MIN_INTERVAL, wait))
+
+    def run(self, max_cycles: Optional[int] = None) -> int:
+        """
+        Run cycles until stopped (or max_cycles have run).
+
+        A cycle that raises is logged with its traceback and rolled back, and
+        the loop goes on to the next wait; KeyboardInterrupt still stops it.
+
+        Returns:
+            Number of cycles run
+        """
+        try:
+            while not self._stopping and (max_cycles is None or self.cycles < max_cycles):
+                force, self._rebuild = self._rebuild, False
+                try:
+                    cycle = self.cycle(force=force)
+                except Exception:
+                    # One bad feed, lock or render must not take the daemon down
+                    self.cycles += 1
+                    self.log(f"Cycle {self.cycles} failed:\n{traceback.format_exc().rstrip()}")
+                    self.session.rollback()
+                    self.session.close()
+                    self._reload = True  # The processor may hold state from the failed cycle
+                else:
+                    pipeline = cycle.pipeline
+                    self.log(
+                        f"Cycle {self.cycles}: {cycle.sources} sources, {pipeline.new} new articles, "
+                        f"{pipeline.duplicates} duplicates"
+                        + (", site regenerated" if cycle.generated else "")
+                        + f" ({cycle.seconds:.1f}s)"
+                    )
+                if self._stopping or (max_cycles is not None and self.cycles >= max_cycles):
+                    break
+
+                wait = self.next_wait()
+                if not self._rebuild:
+                    self.log(f"Next cycle in {wait:.0f}s")
+                    self._wake.wait(wait)
+                self._wake.clear()
+        finally:
+            self.close()
+        return self.cycles
+
+    def close(self) -> None:
+        """Flush the embedding cache and release the session."""
+        if self.processor is not None:
+            self.processor.close()
+            self.processor = None
+        self.session.close()
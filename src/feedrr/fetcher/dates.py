@@ -0,0 +1,133 @@
+"""Fast, consistent date parsing for feed entries.
+
+Feeds almost always use one date format throughout, so a ``DateNormalizer``
+is created per feed and remembers which parser worked last. Parsers are
+tried cheapest first:
+
+1. feedparser's pre-parsed ``*_parsed`` struct (already UTC)
+2. RFC 822 (RSS ``pubDate``) via ``email.utils``
+3. ISO 8601 (Atom, ``dc:date``) via ``datetime.fromisoformat``
+4. ``dateutil`` as a last resort for everything else
+
+Results are always timezone-aware UTC. Dates without a zone are taken as UTC.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_tz
+from typing import Callable, Dict, List, Optional
+
+from dateutil import parser as date_parser
+from dateutil.tz import tzoffset
+
+
+# Common timezone abbreviations dateutil doesn't know (avoids its warnings)
+TZINFOS = {
+    name: tzoffset(name, offset) for name, offset in {
+        'EST': -18000,  # UTC-5
+        'EDT': -14400,  # UTC-4
+        'CST': -21600,  # UTC-6
+        'CDT': -18000,  # UTC-5
+        'MST': -25200,  # UTC-7
+        'MDT': -21600,  # UTC-6
+        'PST': -28800,  # UTC-8
+        'PDT': -25200,  # UTC-7
+    }.items()
+}
+
+
+def _to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def from_struct(parsed: Optional[time.struct_time]) -> Optional[datetime]:
+    """Datetime from a feedparser ``*_parsed`` struct (which feedparser keeps in UTC)."""
+    if not parsed:
+        return None
+    try:
+        return datetime(*parsed[:6], tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rfc822(value: str) -> Optional[datetime]:
+    """Parse an RFC 822/2822 date such as ``Mon, 01 Jan 2024 12:00:00 GMT``."""
+    parts = parsedate_tz(value)
+    if parts is None:
+        return None
+    try:
+        zone = timezone(timedelta(seconds=parts[9] or 0))
+        return datetime(*parts[:6], tzinfo=zone).astimezone(timezone.utc)
+    except ValueError:
+        return None
+
+
+def parse_iso8601(value: str) -> Optional[datetime]:
+    """Parse an ISO 8601 date such as ``2024-01-01T12:00:00+02:00``."""
+    try:
+        return _to_utc(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+
+def parse_fuzzy(value: str) -> Optional[datetime]:
+    """Parse anything dateutil understands (slow)."""
+    try:
+        return _to_utc(date_parser.parse(value, tzinfos=TZINFOS))
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+
+class DateNormalizer:
+    """
+    Turns entry dates into aware UTC datetimes, learning the feed's format.
+
+    Use one instance per feed: the parser that succeeded last is tried first
+    on the next entry, so a feed pays for format detection once.
+    """
+
+    PARSERS: Dict[str, Callable[[str], Optional[datetime]]] = {
+        'rfc822': parse_rfc822,
+        'iso8601': parse_iso8601,
+        'fuzzy': parse_fuzzy,
+    }
+
+    def __init__(self) -> None:
+        self.order: List[str] = list(self.PARSERS)
+        self.hits: Dict[str, int] = {name: 0 for name in ('struct', *self.PARSERS)}
+
+    def normalize(self, value: Optional[str], parsed: Optional[time.struct_time] = None) -> Optional[datetime]:
+        """
+        Parse one date.
+
+        Args:
+            value: Date string as found in the feed
+            parsed: feedparser's pre-parsed struct for the same field, if any
+
+        Returns:
+            Aware UTC datetime, or None if nothing could parse the value
+        """
+        result = from_struct(parsed)
+        if result is not None:
+            self.hits['struct'] += 1
+            return result
+        if not value:
+            return None
+
+        value = value.strip()
+        for index, name in enumerate(self.order):
+            result = self.PARSERS[name](value)
+            if result is not None:
+                self.hits[name] += 1
+                if index:
+                    # Remember what this feed uses
+                    self.order.insert(0, self.order.pop(index))
+                return result
+        return None
+
+
+def normalize_date(value: Optional[str], parsed: Optional[time.struct_time] = None) -> Optional[datetime]:
+    """Parse a single date without keeping per-feed state."""
+    return DateNormalizer().normalize(value, parsed)
@@ -0,0 +1,195 @@
+"""Single-pass extraction of article fields from feed entries.
+
+An ``EntryExtractor`` is created per feed. It:
+
+- learns which fields the feed's entries carry (a set of keys, updated when
+  an entry brings a new one) and only probes those, in precedence order
+- reads feedparser entries with plain dict lookups instead of
+  ``FeedParserDict`` attribute access
+- cleans content with compiled patterns over a bounded prefix: tags,
+  scripts and styles are stripped, whitespace is collapsed, the first
+  ``<img>`` within ``image_scan_chars`` is picked up, and text is cut at
+  ``max_content_chars``
+
+Entities are left encoded, so the stored text goes through the site
+generator's tag stripping and the templates exactly as the raw HTML did.
+Block-level tags become word breaks; inline tags do not.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .dates import DateNormalizer
+
+
+# Text kept per article; the site shows it in the expanded view, so be generous
+DEFAULT_MAX_CONTENT_CHARS = 20000
+
+# Only this much of the raw HTML is searched for an <img> fallback
+IMAGE_SCAN_CHARS = 16384
+
+# Raw HTML cleaned per character of text kept; the rest of a huge body is never scanned
+RAW_CHARS_PER_TEXT_CHAR = 4
+
+# Tags that separate words (inline tags like <b> or <sub> don't)
+BLOCK_TAGS = (
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure',
+    'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'img', 'li', 'ol', 'p', 'pre',
+    'section', 'table', 'td', 'th', 'tr', 'ul',
+)
+
+# Replaced by a space: blocks whose text never shows (closed or cut off), comments, block tags
+BREAK_RE = re.compile(
+    r'<(script|style)\b.*?(?:</\1\s*>|$)'
+    r'|<!--.*?(?:-->|$)'
+    r'|</?(?:' + '|'.join(BLOCK_TAGS) + r')\b[^>]*>',
+    re.IGNORECASE | re.DOTALL
+)
+# Replaced by nothing: the remaining (inline) tags
+TAG_RE = re.compile(r'<[^>]*>')
+IMG_SRC_RE = re.compile(r'<img\b[^>]*?\bsrc\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
+# Fields in precedence order
+CONTENT_FIELDS = ('content', 'summary')
+DATE_FIELDS = (('published', 'published_parsed'), ('updated', 'updated_parsed'))
+IMAGE_FIELDS = ('media_content', 'media_thumbnail', 'enclosures', 'links')
+
+
+def clean_content(
+    html: str,
+    max_chars: int = DEFAULT_MAX_CONTENT_CHARS,
+    image_scan_chars: int = IMAGE_SCAN_CHARS
+) -> Tuple[str, Optional[str]]:
+    """
+    Strip markup from an HTML fragment, truncate it and find its first image.
+
+    Each step is a single regex pass over a bounded prefix of the input:
+    only the first ``max_chars * RAW_CHARS_PER_TEXT_CHAR`` characters are
+    cleaned and only the first ``image_scan_chars`` searched for an image.
+
+    Args:
+        html: Entry content or summary
+        max_chars: Longest text to keep (cut at a word boundary, with an ellipsis)
+        image_scan_chars: Raw characters searched for an <img> tag
+
+    Returns:
+        (text, first image src or None)
+    """
+    image = IMG_SRC_RE.search(html, 0, image_scan_chars)
+    image_url = image.group(1) if image else None
+
+    limit = max_chars * RAW_CHARS_PER_TEXT_CHAR
+    cut_off = len(html) > limit
+    if cut_off:
+        html = html[:limit]
+        open_tag = html.rfind('<')
+        if open_tag > html.rfind('>'):
+            html = html[:open_tag]  # Don't leave half a tag behind
+    if '<' in html:
+        html = TAG_RE.sub('', BREAK_RE.sub(' ', html))
+    text = ' '.join(html.split())
+
+    if len(text) > max_chars:
+        cut = text.rfind(' ', 0, max_chars)
+        text = text[:cut if cut > 0 else max_chars].rstrip() + '…'
+    elif cut_off:
+        text += '…'
+    return text, image_url
+
+
+def image_from_fields(entry: Dict, fields: Iterable[str]) -> Optional[str]:
+    """Image URL from feedparser media/enclosure/link fields; the first present field decides."""
+    for field in fields:
+        value = dict.get(entry, field)
+        if not value:
+            continue
+        if field in ('media_content', 'media_thumbnail'):
+            return value[0].get('url')
+        for item in value:
+            if item.get('type', '').startswith('image/'):
+                return item.get('href')
+        return None
+    return None
+
+
+class EntryExtractor:
+    """
+    Builds article dicts for one feed's entries.
+
+    Args:
+        max_content_chars: Text kept per article
+        image_scan_chars: Raw HTML searched for an <img> fallback
+        dates: The feed's DateNormalizer (a fresh one if not given)
+    """
+
+    def __init__(
+        self,
+        max_content_chars: int = DEFAULT_MAX_CONTENT_CHARS,
+        image_scan_chars: int = IMAGE_SCAN_CHARS,
+        dates: Optional[DateNormalizer] = None
+    ):
+        self.max_content_chars = max_content_chars
+        self.image_scan_chars = image_scan_chars
+        self.dates = dates or DateNormalizer()
+        self.fields: Set[str] = set()
+        self.content_fields: List[str] = []
+        self.date_fields: List[Tuple[str, str]] = []
+        self.image_fields: List[str] = []
+
+    def detect(self, keys: Iterable[str]) -> None:
+        """Add an entry's keys to the feed's known fields and rebuild the probe lists."""
+        self.fields.update(keys)
+        self.content_fields = [field for field in CONTENT_FIELDS if field in self.fields]
+        self.date_fields = [pair for pair in DATE_FIELDS if pair[0] in self.fields]
+        self.image_fields = [field for field in IMAGE_FIELDS if field in self.fields]
+
+    def build(
+        self,
+        url: str,
+        title: Optional[str],
+        content: Optional[str],
+        image_url: Optional[str],
+        published_date: Any
+    ) -> Dict[str, Any]:
+        """Article dict from raw fields, cleaning the content (and finding an image in it if needed)."""
+        if content:
+            content, content_image = clean_content(content, self.max_content_chars, self.image_scan_chars)
+            image_url = image_url or content_image
+        return {
+            'url': url,
+            'title': title or 'Untitled',
+            'content': content or None,
+            'image_url': image_url,
+            'published_date': published_date,
+        }
+
+    def from_entry(self, entry: Dict) -> Optional[Dict[str, Any]]:
+        """
+        Article dict for a feedparser entry.
+
+        Returns:
+            Article dict, or None if the entry has no link
+        """
+        url = dict.get(entry, 'link')
+        if not url:
+            return None
+        if not self.fields.issuperset(entry.keys()):
+            self.detect(entry.keys())
+
+        content = None
+        for field in self.content_fields:
+            value = dict.get(entry, field)
+            if value is not None:
+                content = value[0].value if field == 'content' else value
+                break
+
+        # feedparser's pre-parsed struct when it has one
+        published_date = None
+        for field, parsed in self.date_fields:
+            value = dict.get(entry, field)
+            if value is not None:
+                published_date = self.dates.normalize(value, dict.get(entry, parsed))
+                break
+
+        image_url = image_from_fields(entry, self.image_fields) if self.image_fields else None
+        return self.build(url, dict.get(entry, 'title', 'Untitled'), content, image_url, published_date)
@@ -0,0 +1,104 @@
+"""Adaptive per-source fetch frequency.
+
+Each source remembers how often it posts (``Source.post_interval``, an
+exponentially weighted average of the spacing between its entries), when a
+fetch last found something new (``last_new_item_at``) and when it should be
+fetched next (``next_due_at``).
+
+A source is polled about twice per expected post, so busy feeds are fetched
+on every run while quiet ones are left alone. The longer a feed stays silent,
+the further out its next poll moves. Intervals are clamped to
+``[min_interval, max_interval]``. Sources that fail to fetch keep their old
+due time, so they are retried on the next run (host-level backoff is handled
+by the HostScheduler).
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from ..storage.models import Source
+
+
+# Defaults for fetcher.min_poll_interval / max_poll_interval (seconds)
+DEFAULT_MIN_POLL_INTERVAL = 30 * 60
+DEFAULT_MAX_POLL_INTERVAL = 24 * 3600
+
+# Sources due this soon are fetched now; cron runs don't start exactly on time
+DUE_GRACE = timedelta(minutes=5)
+
+# Weight of the newest observation in the posting interval average
+SMOOTHING = 0.5
+
+# Polls per expected post
+POLLS_PER_POST = 2
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive UTC datetime (the database convention) from naive or aware input."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def observed_post_interval(published_dates: Iterable[Optional[datetime]], now: datetime) -> Optional[float]:
+    """
+    Average spacing in seconds between a feed's entry dates.
+
+    Missing and future dates are ignored. Returns None with fewer than two
+    usable dates.
+    """
+    dates = sorted(_as_utc(date) for date in published_dates if isinstance(date, datetime))
+    dates = [date for date in dates if date <= now]
+    if len(dates) < 2 or dates[-1] == dates[0]:
+        return None
+    return (dates[-1] - dates[0]).total_seconds() / (len(dates) - 1)
+
+
+def poll_interval(
+    source: Source,
+    now: datetime,
+    min_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+    max_interval: float = DEFAULT_MAX_POLL_INTERVAL
+) -> float:
+    """Seconds until a source should be polled again."""
+    if source.post_interval is None:
+        return min_interval
+    expected = source.post_interval
+    if source.last_new_item_at is not None:
+        # A feed silent for longer than usual is probably slowing down
+        expected = max(expected, (now - source.last_new_item_at).total_seconds())
+    return min(max(expected / POLLS_PER_POST, min_interval), max_interval)
+
+
+def update_source_schedule(
+    source: Source,
+    published_dates: Iterable[Optional[datetime]],
+    new_count: int,
+    now: Optional[datetime] = None,
+    min_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+    max_interval: float = DEFAULT_MAX_POLL_INTERVAL
+) -> None:
+    """
+    Update a source's posting history and next due time after a fetch.
+
+    Args:
+        source: Source that was fetched (changes are left for the caller to commit)
+        published_dates: Dates of the entries the feed returned, stored or not (FetchResult.published_dates)
+        new_count: How many of them were new
+        now: Current UTC time (naive)
+        min_interval: Shortest time between polls, in seconds
+        max_interval: Longest time between polls, in seconds
+    """
+    now = now or datetime.utcnow()
+
+    observed = observed_post_interval(published_dates, now)
+    if observed is not None:
+        if source.post_interval is None:
+            source.post_interval = observed
+        else:
+            source.post_interval = SMOOTHING * observed + (1 - SMOOTHING) * source.post_interval
+    if new_count:
+        source.last_new_item_at = now
+
+    source.next_due_at = now + timedelta(seconds=poll_interval(source, now, min_interval, max_interval))
+
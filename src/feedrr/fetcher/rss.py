@@ -2,123 +2,139 @@
 
 import feedparser
 import requests
-import re
-from datetime import datetime, timezone, timedelta
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict, Any, Optional
-from dateutil import parser as date_parser
 
+from ..instrumentation import record_source
+from .extract import EntryExtractor
 
-def fetch_feed(feed_url: str, timeout: int = 30) -> List[Dict[str, Any]]:
+
+# Statuses publishers use to ask clients to back off
+THROTTLE_STATUSES = {420, 429, 503}
+
+# Sent with every request; a browser-like user agent avoids 403 errors
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (compatible; feedrr/1.0; +https://github.com/jamiefletchertv/feedrr)'
+}
+
+
+def parse_feed(data: bytes, extractor: Optional[EntryExtractor] = None) -> List[Dict[str, Any]]:
     """
-    Fetch and parse an RSS feed.
+    Parse a raw RSS/Atom document into article dictionaries.
 
     Returns a list of article dictionaries with:
     - url: Article URL
     - title: Article title
-    - content: Article content/summary
-    - published_date: Publication date (datetime or None)
+    - content: Article content/summary as plain text (see fetcher.extract)
+    - image_url: Image URL (or None)
+    - published_date: Publication date (aware UTC datetime or None)
+    """
+    extractor = extractor or EntryExtractor()
+    feed = feedparser.parse(data)
+    articles = []
+    for entry in feed.entries:
+        article = extractor.from_entry(entry)
+        if article is not None:
+            articles.append(article)
+    return articles
 
-    Error Handling:
-    - HTTP errors (404, 420 rate limits, etc.) are caught and logged
-    - Network timeouts are caught and logged
-    - Parse errors are caught and logged
-    - Returns empty list on any error to allow other feeds to continue processing
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
     """
-    # Define common timezone abbreviations to avoid warnings
-    tzinfos = {
-        'EST': -18000,  # UTC-5
-        'EDT': -14400,  # UTC-4
-        'CST': -21600,  # UTC-6
-        'CDT': -18000,  # UTC-5
-        'MST': -25200,  # UTC-7
-        'MDT': -21600,  # UTC-6
-        'PST': -28800,  # UTC-8
-        'PDT': -25200,  # UTC-7
-    }
+    Parse a Retry-After header into seconds to wait.
 
-    articles = []
+    Accepts both forms allowed by RFC 9110: delay-seconds and an HTTP date.
+    Returns None for missing or malformed values.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return max(0.0, (until - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one feed, including what the scheduler needs."""
+
+    url: str
+    articles: List[Dict[str, Any]] = field(default_factory=list)
+    status: Optional[int] = None
+    error: Optional[str] = None
+    retry_after: Optional[float] = None  # Seconds, from the Retry-After header
+    bytes: int = 0
+    seconds: float = 0.0
+    entries: int = 0  # Entries parsed, including already-stored ones
+    published_dates: List[Optional[datetime]] = field(default_factory=list)  # Of every entry parsed, stored or not
+    truncated: bool = False  # Body was cut off at the size cap
+    stopped_early: bool = False  # Parsing stopped at a run of already-seen entries
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def throttled(self) -> bool:
+        """True if the publisher asked us to slow down."""
+        return self.status in THROTTLE_STATUSES
+
+
+def fetch_feed_result(feed_url: str, timeout: int = 30) -> FetchResult:
+    """
+    Fetch and parse an RSS feed, reporting status and throttling details.
 
+    Never raises; failures are reported through FetchResult.error.
+    """
+    result = FetchResult(url=feed_url)
+    start = time.perf_counter()
     try:
         # Fetch the feed with user-agent header to avoid 403 errors
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (compatible; feedrr/1.0; +https://github.com/jamiefletchertv/feedrr)'
-        }
-        response = requests.get(feed_url, headers=headers, timeout=timeout, verify=True)
+        response = requests.get(feed_url, headers=HEADERS, timeout=timeout, verify=True)
+        result.status = response.status_code
+        result.bytes = len(response.content)
+        record_source(
+            feed_url,
+            download_seconds=time.perf_counter() - start,
+            bytes=result.bytes,
+            status=result.status
+        )
+        if result.throttled:
+            result.retry_after = parse_retry_after(response.headers.get('Retry-After'))
         response.raise_for_status()
 
-        # Parse with feedparser
-        feed = feedparser.parse(response.content)
-
-        # Extract articles
-        for entry in feed.entries:
-            # Get URL (required)
-            url = entry.get('link')
-            if not url:
-                continue
-
-            # Get title (required)
-            title = entry.get('title', 'Untitled')
-
-            # Get content (try multiple fields)
-            content = None
-            if hasattr(entry, 'content'):
-                content = entry.content[0].value
-            elif hasattr(entry, 'summary'):
-                content = entry.summary
-            elif hasattr(entry, 'description'):
-                content = entry.description
-
-            # Get published date
-            published_date = None
-            if hasattr(entry, 'published'):
-                try:
-                    published_date = date_parser.parse(entry.published, tzinfos=tzinfos)
-                except:
-                    pass
-            elif hasattr(entry, 'updated'):
-                try:
-                    published_date = date_parser.parse(entry.updated, tzinfos=tzinfos)
-                except:
-                    pass
-
-            # Get image URL (try multiple fields)
-            image_url = None
-            if hasattr(entry, 'media_content') and entry.media_content:
-                # RSS media:content
-                image_url = entry.media_content[0].get('url')
-            elif hasattr(entry, 'media_thumbnail') and entry.media_thumbnail:
-                # RSS media:thumbnail
-                image_url = entry.media_thumbnail[0].get('url')
-            elif hasattr(entry, 'enclosures') and entry.enclosures:
-                # RSS enclosure (check if it's an image)
-                for enclosure in entry.enclosures:
-                    if enclosure.get('type', '').startswith('image/'):
-                        image_url = enclosure.get('href')
-                        break
-            elif hasattr(entry, 'links'):
-                # Check links for image
-                for link in entry.links:
-                    if link.get('type', '').startswith('image/'):
-                        image_url = link.get('href')
-                        break
-
-            # If no image found in standard fields, try extracting from HTML content
-            if not image_url and content:
-                # Look for img tags in the content HTML
-                img_match = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', content)
-                if img_match:
-                    image_url = img_match.group(1)
-
-            articles.append({
-                'url': url,
-                'title': title,
-                'content': content,
-                'image_url': image_url,
-                'published_date': published_date
-            })
+        result.articles = parse_feed(response.content)
+        result.entries = len(result.articles)
+        result.published_dates = [article['published_date'] for article in result.articles]
 
     except Exception as e:
         print(f"Error fetching {feed_url}: {e}")
-        return []
+        record_source(feed_url, error=str(e))
+        result.error = str(e)
 
-    return articles
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def fetch_feed(feed_url: str, timeout: int = 30) -> List[Dict[str, Any]]:
+    """
+    Fetch and parse an RSS feed.
+
+    Returns the articles from parse_feed().
+
+    Error Handling:
+    - HTTP errors (404, 420 rate limits, etc.) are caught and logged
+    - Network timeouts are caught and logged
+    - Parse errors are caught and logged
+    - Returns empty list on any error to allow other feeds to continue processing
+    """
+    return fetch_feed_result(feed_url, timeout=timeout).articles
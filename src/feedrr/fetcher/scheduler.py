@@ -0,0 +1,278 @@
+"""Per-host politeness scheduling for feed fetches.
+
+Feeds are grouped by host. Each host gets one request in flight at a time
+(``host_concurrency``) and at least ``min_interval`` seconds between requests,
+while different hosts are fetched in parallel on a thread pool.
+
+When a host throttles us (420/429/503), returns a server error or cannot be
+reached, its next-allowed time is pushed back: by ``Retry-After`` when the
+publisher sent one, otherwise exponentially (``backoff_base * 2**(failures-1)``,
+capped at ``backoff_max``) with random jitter so many clients don't come back
+in lockstep. Feeds on a host that won't be allowed again within ``max_wait``
+seconds are deferred to a later run instead of occupying a worker.
+
+Host state is kept in a small JSON file so that backoff carries over between
+cron runs.
+"""
+
+import json
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from sqlalchemy.orm import Session
+
+from ..instrumentation import record_source
+from ..storage.db import get_recent_urls
+from ..storage.models import Source
+from .rss import FetchResult
+from .stream import StreamOptions, stream_feed, stream_options_from_config
+
+
+# Host state older than this with no failures is dropped when saving
+STATE_RETENTION_SECONDS = 7 * 24 * 3600
+
+
+@dataclass
+class HostState:
+    """What we know about one host."""
+
+    next_allowed: float = 0.0  # Epoch seconds
+    failures: int = 0  # Consecutive failed or throttled requests
+    last_status: Optional[int] = None
+    last_request: float = 0.0
+
+
+def host_key(url: str) -> str:
+    """Host (and port) a feed URL is scheduled under."""
+    return urlsplit(url).netloc.lower()
+
+
+class HostScheduler:
+    """
+    Fetch feeds in parallel across hosts while staying polite to each host.
+
+    Args:
+        state_path: JSON file for host state (None = keep it in memory only)
+        min_interval: Seconds between requests to the same host
+        backoff_base: First backoff after a failure, in seconds
+        backoff_max: Upper bound on any backoff, Retry-After included
+        jitter: Random spread applied to backoffs (0.2 = +/-20%)
+        max_workers: Requests in flight at once across all hosts
+        host_concurrency: Requests in flight at once to the same host
+        max_wait: Longest a feed may wait for its host before being deferred
+        retry_attempts: Attempts per feed while its host is throttling us
+        fetch: Fetch function (defaults to stream_feed)
+        clock: Time source returning epoch seconds
+        sleep: Sleep function used while every host is waiting
+        rng: Random source for jitter
+    """
+
+    def __init__(
+        self,
+        state_path: Optional[Path] = None,
+        min_interval: float = 1.0,
+        backoff_base: float = 60.0,
+        backoff_max: float = 6 * 3600.0,
+        jitter: float = 0.2,
+        max_workers: int = 8,
+        host_concurrency: int = 1,
+        max_wait: float = 30.0,
+        retry_attempts: int = 3,
+        fetch: Optional[Callable[[str], FetchResult]] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None
+    ):
+        self.state_path = Path(state_path) if state_path else None
+        self.min_interval = min_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.max_workers = max(1, max_workers)
+        self.host_concurrency = max(1, host_concurrency)
+        self.max_wait = max_wait
+        self.retry_attempts = max(1, retry_attempts)
+        self.fetch = fetch or stream_feed
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.hosts: Dict[str, HostState] = self._load()
+
+    def _load(self) -> Dict[str, HostState]:
+        if self.state_path is None or not self.state_path.exists():
+            return {}
+        try:
+            data = json.loads(self.state_path.read_text())
+            return {host: HostState(**state) for host, state in data.items()}
+        except (ValueError, TypeError):
+            return {}  # Corrupt state only costs us politeness history
+
+    def save(self) -> None:
+        """Write host state, dropping hosts that have been healthy for a while."""
+        if self.state_path is None:
+            return
+        cutoff = self.clock() - STATE_RETENTION_SECONDS
+        keep = {
+            host: asdict(state) for host, state in self.hosts.items()
+            if state.failures or state.next_allowed > cutoff or state.last_request > cutoff
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(keep, indent=2, sort_keys=True))
+        tmp.replace(self.state_path)
+
+    def state(self, host: str) -> HostState:
+        if host not in self.hosts:
+            self.hosts[host] = HostState()
+        return self.hosts[host]
+
+    def backoff_delay(self, failures: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to leave a host alone after its n-th consecutive failure."""
+        if retry_after is not None:
+            return min(max(retry_after, self.min_interval), self.backoff_max)
+        delay = min(self.backoff_base * 2 ** max(0, failures - 1), self.backoff_max)
+        spread = delay * self.jitter
+        return max(self.min_interval, delay + self.rng.uniform(-spread, spread))
+
+    @staticmethod
+    def _host_failure(result: FetchResult) -> bool:
+        """True if the failure says something about the host, not just the feed."""
+        if result.ok:
+            return False
+        return result.throttled or result.status is None or result.status >= 500
+
+    def record(self, host: str, result: FetchResult) -> HostState:
+        """Update a host's state from a fetch result."""
+        state = self.state(host)
+        now = self.clock()
+        state.last_status = result.status
+        state.last_request = now
+        if self._host_failure(result):
+            state.failures += 1
+            state.next_allowed = now + self.backoff_delay(state.failures, result.retry_after)
+        else:
+            state.failures = 0
+            state.next_allowed = now + self.min_interval
+        return state
+
+    def run(self, urls: Iterable[str]) -> Iterator[Tuple[str, Optional[FetchResult]]]:
+        """
+        Fetch feeds, yielding results as they complete.
+
+        Results are yielded to the calling thread, so callers can write to
+        the database without locking.
+
+        Yields:
+            (url, result) pairs; result is None when the feed was deferred
+            because its host is backing off
+        """
+        queues: Dict[str, Deque[Tuple[str, int]]] = {}
+        for url in urls:
+            queues.setdefault(host_key(url), deque()).append((url, 1))
+
+        in_flight: Dict[Future, Tuple[str, str, int]] = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+        try:
+            while queues or in_flight:
+                now = self.clock()
+                busy: Dict[str, int] = {}
+                for host, _, _ in in_flight.values():
+                    busy[host] = busy.get(host, 0) + 1
+                soonest: Optional[float] = None
+
+                for host in list(queues):
+                    if busy.get(host, 0) >= self.host_concurrency:
+                        continue
+                    wait_for = self.state(host).next_allowed - now
+                    if wait_for > self.max_wait:
+                        for url, _ in queues.pop(host):
+                            record_source(url, deferred=round(wait_for, 1))
+                            yield url, None
+                    elif wait_for > 0:
+                        soonest = wait_for if soonest is None else min(soonest, wait_for)
+                    else:
+                        while (queues.get(host) and len(in_flight) < self.max_workers
+                               and busy.get(host, 0) < self.host_concurrency):
+                            url, attempt = queues[host].popleft()
+                            in_flight[executor.submit(self.fetch, url)] = (host, url, attempt)
+                            busy[host] = busy.get(host, 0) + 1
+                        if not queues.get(host):
+                            queues.pop(host, None)
+                        self.state(host).next_allowed = now + self.min_interval
+
+                if in_flight:
+                    done, _ = wait(list(in_flight), timeout=soonest, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        host, url, attempt = in_flight.pop(future)
+                        result = future.result()
+                        state = self.record(host, result)
+                        retry_in = state.next_allowed - self.clock()
+                        if result.throttled and attempt < self.retry_attempts and retry_in <= self.max_wait:
+                            queues.setdefault(host, deque()).appendleft((url, attempt + 1))
+                        else:
+                            yield url, result
+                elif soonest is not None:
+                    self.sleep(soonest)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.save()
+
+    def fetch_all(self, urls: Iterable[str]) -> List[Tuple[str, Optional[FetchResult]]]:
+        """Run the scheduler to completion."""
+        return list(self.run(urls))
+
+
+def scheduler_from_config(
+    config: Dict,
+    state_path: Optional[Path] = None,
+    stream_options: Optional[Dict[str, StreamOptions]] = None,
+    **overrides
+) -> HostScheduler:
+    """
+    Build a HostScheduler from the ``fetcher`` section of config.yaml.
+
+    Feeds are fetched with stream_feed.
+
+    Args:
+        config: Parsed config.yaml
+        state_path: Host state file (None = in memory only)
+        stream_options: Per-URL StreamOptions (known URLs, last fetch time)
+        **overrides: HostScheduler arguments that take precedence over config
+    """
+    fetcher = config.get('fetcher', {})
+    timeout = fetcher.get('timeout', 30)
+    default_options = stream_options_from_config(config)
+    stream_options = stream_options or {}
+
+    def fetch(url: str) -> FetchResult:
+        return stream_feed(url, timeout=timeout, options=stream_options.get(url, default_options))
+
+    options = {
+        'min_interval': fetcher.get('host_min_interval', 1.0),
+        'backoff_base': fetcher.get('backoff_base', 60.0),
+        'backoff_max': fetcher.get('backoff_max', 6 * 3600.0),
+        'max_workers': fetcher.get('max_workers', 8),
+        'max_wait': fetcher.get('max_wait', 30.0),
+        'retry_attempts': fetcher.get('retry_attempts', 3),
+        'fetch': fetch,
+    }
+    options.update(overrides)
+    return HostScheduler(state_path, **options)
+
+
+def scheduler_for_sources(session: Session, config: Dict, sources: List[Source], state_path: Path) -> HostScheduler:
+    """HostScheduler for sources, letting each feed skip and stop at articles we already have."""
+    known_urls = get_recent_urls(session, sources)
+    stream_options = {
+        source.feed_url: stream_options_from_config(
+            config, known_urls=known_urls[source.id], since=source.last_fetched
+        )
+        for source in sources
+    }
+    return scheduler_from_config(config, state_path, stream_options)
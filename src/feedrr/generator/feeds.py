@@ -0,0 +1,232 @@
+"""Atom and JSON Feed output for the static site.
+
+Feeds are derived from the same article view model that ``index.html`` is
+rendered from (no extra queries), one overall feed plus one per topic and
+one per source category::
+
+    feeds/all.atom                  feeds/all.json
+    feeds/topic/<slug>.atom         feeds/topic/<slug>.json
+    feeds/category/<slug>.atom      feeds/category/<slug>.json
+
+Each holds the newest FEED_ITEMS articles, ordered by publication date and
+then id, so the same articles always produce the same bytes: the feed's
+``updated`` time is that of its newest item, not the time of the build.
+Files are streamed to a temporary file and only replace the published one
+when its content differs, so an unchanged feed keeps its mtime and static
+hosts answer pollers with 304 Not Modified.
+
+Feeds of topics or categories that no longer have articles are left in
+place rather than deleted, so existing subscribers do not get 404s.
+"""
+
+import filecmp
+import json
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from jinja2 import Environment, FileSystemLoader
+
+from feedrr.config import get_templates_dir
+
+
+# Newest articles per feed
+FEED_ITEMS = 50
+
+# Characters of article text in each item's summary
+SUMMARY_CHARS = 300
+
+JSON_FEED_VERSION = "https://jsonfeed.org/version/1.1"
+
+# Feed-level updated time of a feed without items
+EPOCH = datetime(1970, 1, 1)
+
+SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+
+@dataclass
+class Feed:
+    """One feed: where it goes, what it is called and its articles, newest first."""
+
+    path: str  # Relative to feeds/, without suffix (e.g. "topic/tech")
+    title: str
+    items: List[Dict[str, Any]]
+
+
+@dataclass
+class FeedsResult:
+    """Outcome of write_feeds: files produced and files actually rewritten."""
+
+    files: int
+    written: int
+
+
+def slugify(name: str) -> str:
+    """Lowercase ASCII slug of name ("Film & TV" -> "film-tv")."""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    return SLUG_RE.sub('-', ascii_name.lower()).strip('-') or 'untitled'
+
+
+def newest(articles: List[Dict[str, Any]], limit: int = FEED_ITEMS) -> List[Dict[str, Any]]:
+    """The limit newest articles, by publication date and then id (descending)."""
+    return sorted(articles, key=lambda article: (article['published_at'], article['id']), reverse=True)[:limit]
+
+
+def group_feeds(
+    articles: List[Dict[str, Any]],
+    topic_slugs: Optional[Dict[str, str]] = None,
+    limit: int = FEED_ITEMS
+) -> List[Feed]:
+    """
+    Split the article view model into the overall, topic and category feeds.
+
+    Args:
+        articles: Article dicts from get_articles_with_topics
+        topic_slugs: Topic name to slug (names missing from it are slugified)
+        limit: Items per feed
+
+    Returns:
+        Feeds, the overall one first, then topics and categories by path
+    """
+    topic_slugs = topic_slugs or {}
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    titles: Dict[str, str] = {}
+
+    for article in articles:
+        paths = [f"topic/{topic_slugs.get(name) or slugify(name)}" for name in article['topics']]
+        titles.update(zip(paths, article['topics']))
+        if article.get('source_category'):
+            path = f"category/{slugify(article['source_category'])}"
+            titles.setdefault(path, article['source_category'])
+            paths.append(path)
+        for path in paths:
+            groups.setdefault(path, []).append(article)
+
+    feeds = [Feed("all", "feedrr", newest(articles, limit))]
+    feeds.extend(
+        Feed(path, f"feedrr: {titles[path]}", newest(groups[path], limit))
+        for path in sorted(groups)
+    )
+    return feeds
+
+
+def timestamp(value: datetime) -> str:
+    """RFC 3339 form of a naive UTC datetime."""
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def summary(article: Dict[str, Any]) -> Optional[str]:
+    """Article text cut to SUMMARY_CHARS, or None if it has none."""
+    content = article.get('content')
+    if not content or len(content) <= SUMMARY_CHARS:
+        return content
+    return content[:SUMMARY_CHARS].rstrip() + '…'
+
+
+def feed_urls(feed: Feed, site_url: Optional[str], suffix: str) -> Dict[str, Optional[str]]:
+    """Feed id plus the site and feed links (None without a site_url)."""
+    if not site_url:
+        return {'id': f"urn:feedrr:{feed.path}", 'home': None, 'self': None}
+    base = site_url.rstrip('/') + '/'
+    return {'id': f"{base}feeds/{feed.path}", 'home': base, 'self': f"{base}feeds/{feed.path}{suffix}"}
+
+
+def atom_chunks(env: Environment, feed: Feed, site_url: Optional[str]) -> Iterator[str]:
+    """Stream the Atom document of feed."""
+    items = [
+        {
+            'article': article,
+            'published': timestamp(article['published_at']),
+            'summary': summary(article),
+        }
+        for article in feed.items
+    ]
+    updated = feed.items[0]['published_at'] if feed.items else EPOCH
+    return env.get_template('feed.xml').generate(
+        feed=feed, urls=feed_urls(feed, site_url, '.atom'), updated=timestamp(updated), items=items
+    )
+
+
+def json_feed_item(article: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON Feed item for an article."""
+    item: Dict[str, Any] = {
+        'id': article['url'],
+        'url': article['url'],
+        'title': article['title'],
+        'content_text': summary(article) or article['title'],
+        'date_published': timestamp(article['published_at']),
+        'authors': [{'name': article['source_name']}],
+    }
+    if article['topics']:
+        item['tags'] = article['topics']
+    if article.get('image_url'):
+        item['image'] = article['image_url']
+    return item
+
+
+def json_chunks(feed: Feed, site_url: Optional[str]) -> Iterator[str]:
+    """Stream the JSON Feed document of feed."""
+    urls = feed_urls(feed, site_url, '.json')
+    document: Dict[str, Any] = {'version': JSON_FEED_VERSION, 'title': feed.title}
+    if urls['home']:
+        document['home_page_url'] = urls['home']
+        document['feed_url'] = urls['self']
+    document['items'] = [json_feed_item(article) for article in feed.items]
+    return json.JSONEncoder(ensure_ascii=False, indent=1).iterencode(document)
+
+
+def write_if_changed(path: Path, chunks: Iterable[str]) -> bool:
+    """
+    Stream chunks to path unless the file already holds exactly that content.
+
+    Returns:
+        Whether path was (re)written
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+    if path.exists() and filecmp.cmp(temp_path, path, shallow=False):
+        temp_path.unlink()
+        return False
+    os.replace(temp_path, path)
+    return True
+
+
+def write_feeds(
+    articles: List[Dict[str, Any]],
+    output_dir: Path,
+    topic_slugs: Optional[Dict[str, str]] = None,
+    site_url: Optional[str] = None
+) -> FeedsResult:
+    """
+    Write the Atom and JSON feeds of articles under output_dir.
+
+    Args:
+        articles: Article dicts from get_articles_with_topics
+        output_dir: Feeds directory (site/feeds)
+        topic_slugs: Topic name to slug, for feed paths
+        site_url: Public URL of the site, for absolute feed links (optional)
+
+    Returns:
+        How many files were produced and how many of them changed
+    """
+    env = Environment(
+        loader=FileSystemLoader(str(get_templates_dir())),
+        autoescape=True, trim_blocks=True, lstrip_blocks=True
+    )
+    result = FeedsResult(files=0, written=0)
+    for feed in group_feeds(articles, topic_slugs):
+        for suffix, chunks in (
+            ('.atom', atom_chunks(env, feed, site_url)),
+            ('.json', json_chunks(feed, site_url)),
+        ):
+            result.files += 1
+            result.written += write_if_changed(output_dir / f"{feed.path}{suffix}", chunks)
+    return result
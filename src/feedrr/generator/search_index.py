@@ -0,0 +1,93 @@
+"""Prebuilt client-side search index for the static site.
+
+The site cannot query SQLite, and shipping every article's text to the
+browser would cost more than the page itself. Instead ``generate_site``
+writes an inverted index over the rendered articles, split into shards by
+the first two characters of each term::
+
+    search/meta.json        {"version": 1, "documents": N, "shards": ["ab", ...]}
+    search/terms-ab.json    {"about": [12, 3, 40], "abroad": [7], ...}
+
+Posting lists hold article ids (the ``data-id`` of each rendered article),
+delta-encoded in ascending order. A query loads only the shards of its terms
+(``static/js/search.js``); the last term is matched as a prefix within its
+shard. Terms are lowercased, stripped of diacritics and split on anything
+that is not ``[a-z0-9]``, exactly as in the browser.
+"""
+
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set
+
+
+# Bump when the file layout changes (search.js checks it)
+INDEX_VERSION = 1
+
+# Characters of a term that pick its shard; shorter terms are not indexed
+SHARD_PREFIX = 2
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+DIACRITICS_RE = re.compile(r'[\u0300-\u036f]')
+
+
+def tokenize(text: str) -> List[str]:
+    """Search terms in text, in order (same rules as tokenize() in search.js)."""
+    text = DIACRITICS_RE.sub('', unicodedata.normalize('NFKD', text.lower()))
+    return [token for token in TOKEN_RE.findall(text) if len(token) >= SHARD_PREFIX]
+
+
+def document_terms(article: Dict[str, Any]) -> Set[str]:
+    """Distinct terms of a rendered article: title, text, source and topics."""
+    fields = [article.get('title'), article.get('content'), article.get('source_name')]
+    fields.extend(article.get('topics', []))
+    return {term for field in fields if field for term in tokenize(field)}
+
+
+def build_shards(articles: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Inverted index over articles, grouped by shard.
+
+    Returns:
+        {shard: {term: delta-encoded ascending article ids}}
+    """
+    postings: Dict[str, List[int]] = {}
+    for article in sorted(articles, key=lambda article: article['id']):
+        for term in document_terms(article):
+            postings.setdefault(term, []).append(article['id'])
+
+    shards: Dict[str, Dict[str, List[int]]] = {}
+    for term in sorted(postings):
+        ids = postings[term]
+        shards.setdefault(term[:SHARD_PREFIX], {})[term] = [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+    return shards
+
+
+def write_search_index(articles: List[Dict[str, Any]], output_dir: Path) -> int:
+    """
+    Write the sharded index for the rendered articles to output_dir.
+
+    Shards left over from an earlier generation are removed.
+
+    Returns:
+        Bytes written
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    shards = build_shards(articles)
+
+    written = 0
+    for shard, terms in shards.items():
+        data = json.dumps(terms, separators=(',', ':'))
+        (output_dir / f"terms-{shard}.json").write_text(data)
+        written += len(data)
+
+    meta = json.dumps({'version': INDEX_VERSION, 'documents': len(articles), 'shards': sorted(shards)},
+                      separators=(',', ':'))
+    (output_dir / "meta.json").write_text(meta)
+    written += len(meta)
+
+    for path in output_dir.glob("terms-*.json"):
+        if path.stem[len("terms-"):] not in shards:
+            path.unlink()
+    return written
@@ -2,30 +2,106 @@
 
 import re
 import shutil
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from jinja2 import Environment, FileSystemLoader
 from sqlalchemy.orm import Session
 
 from feedrr.storage.models import Article, Source, Topic, ArticleTopic
 from feedrr.config import get_templates_dir, get_static_dir
+from feedrr.instrumentation import record_render
+from feedrr.generator.feeds import write_feeds
+from feedrr.generator.search_index import write_search_index
+from feedrr.generator.thumbs import THUMBS_PATH, ThumbnailOptions, generate_thumbnails
 
 
-def get_articles_with_topics(session: Session, limit: int = 100) -> List[Dict[str, Any]]:
+def get_cluster_members(session: Session, cluster_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Get the member articles of story clusters in a single query.
+
+    Returns dict mapping cluster id to a list of members with:
+    - id, url
+    - name (source name)
+    """
+    members: Dict[int, List[Dict[str, Any]]] = {}
+    if not cluster_ids:
+        return members
+
+    rows = session.query(
+        Article.cluster_id, Article.id, Article.url, Source.name
+    ).join(Source).filter(
+        Article.cluster_id.in_(cluster_ids)
+    ).order_by(
+        Article.cluster_id,
+        Article.published_date.asc().nullslast(),
+        Article.id
+    )
+
+    for cluster_id, article_id, url, source_name in rows:
+        members.setdefault(cluster_id, []).append({
+            'id': article_id,
+            'name': source_name,
+            'url': url
+        })
+
+    return members
+
+
+def get_article_topics(
+    session: Session,
+    article_ids: List[int],
+    min_score: Optional[float] = None
+) -> Dict[int, List[str]]:
+    """
+    Get topic names for many articles in a single query.
+
+    Args:
+        session: Database session
+        article_ids: Articles to look up
+        min_score: Hide assignments scoring below this (the unscored
+            'general' fallback is always kept)
+
+    Returns:
+        Dict mapping article id to topic names, best match first
+    """
+    topics: Dict[int, List[str]] = {}
+    if not article_ids:
+        return topics
+
+    query = session.query(ArticleTopic.article_id, Topic.name).join(Topic).filter(
+        ArticleTopic.article_id.in_(article_ids)
+    )
+    if min_score is not None:
+        query = query.filter((ArticleTopic.score >= min_score) | (ArticleTopic.score == None))
+
+    for article_id, name in query.order_by(ArticleTopic.article_id, ArticleTopic.rank, Topic.name):
+        topics.setdefault(article_id, []).append(name)
+
+    return topics
+
+
+def get_articles_with_topics(
+    session: Session,
+    limit: int = 100,
+    min_topic_score: Optional[float] = None
+) -> List[Dict[str, Any]]:
     """
     Get articles with their topics and source information.
 
     Only returns non-duplicate articles from enabled sources.
-    Includes duplicate count for articles that have duplicates.
+    Includes duplicate count for articles that have duplicates. Topics scoring
+    below min_topic_score are left out.
 
     Returns list of article dictionaries with:
     - id, url, title, content
     - published_date (formatted string)
+    - published_at (datetime: published, else fetched)
     - source_name
     - topics (list of topic names)
-    - duplicate_count (number of duplicates)
-    - duplicate_sources (list of source names for duplicates)
+    - duplicate_count (number of other articles in the story cluster)
+    - duplicate_sources (list of source names/urls for those articles)
     """
     articles = []
 
@@ -38,19 +114,20 @@ def get_articles_with_topics(session: Session, limit: int = 100) -> List[Dict[st
         Article.published_date.desc().nullslast(),
         Article.fetched_date.desc()
     ).limit(limit)
+    rows = query.all()
+
+    # Cluster sizes and member sources for every displayed article at once
+    cluster_members = get_cluster_members(
+        session, [article.cluster_id for article in rows if article.cluster_id is not None]
+    )
+    article_topics = get_article_topics(session, [article.id for article in rows], min_topic_score)
 
-    for article in query:
-        # Get topics for this article
-        topic_names = []
-        for article_topic in article.topics:
-            if article_topic.topic:
-                topic_names.append(article_topic.topic.name)
+    for article in rows:
+        topic_names = article_topics.get(article.id, [])
 
         # Format published date
-        if article.published_date:
-            published_str = article.published_date.strftime("%b %d, %Y")
-        else:
-            published_str = article.fetched_date.strftime("%b %d, %Y")
+        published_at = article.published_date or article.fetched_date
+        published_str = published_at.strftime("%b %d, %Y")
 
         # Clean content - remove if it's just "Comments" or HTML links
         clean_content = None
@@ -64,16 +141,13 @@ def get_articles_with_topics(session: Session, limit: int = 100) -> List[Dict[st
                 # Consider it "full content" if it's longer than 300 characters
                 has_full_content = len(text_content) > 300
 
-        # Get duplicate information
-        duplicate_count = len(article.duplicates) if hasattr(article, 'duplicates') else 0
-        duplicate_sources = []
-        if duplicate_count > 0:
-            for dup in article.duplicates:
-                if dup.source:
-                    duplicate_sources.append({
-                        'name': dup.source.name,
-                        'url': dup.url
-                    })
+        # Get duplicate information from the article's story cluster
+        duplicate_sources = [
+            {'name': member['name'], 'url': member['url']}
+            for member in cluster_members.get(article.cluster_id, [])
+            if member['id'] != article.id
+        ]
+        duplicate_count = len(duplicate_sources)
 
         articles.append({
             'id': article.id,
@@ -83,6 +157,7 @@ def get_articles_with_topics(session: Session, limit: int = 100) -> List[Dict[st
             'has_full_content': has_full_content,
             'image_url': article.image_url,
             'published_date': published_str,
+            'published_at': published_at,
             'source_name': article.source.name,
             'source_category': article.source.category,
             'topics': sorted(topic_names),  # Sort for consistent display
@@ -93,7 +168,14 @@ def get_articles_with_topics(session: Session, limit: int = 100) -> List[Dict[st
     return articles
 
 
-def generate_site(session: Session, output_dir: Path, max_articles: int = 100) -> None:
+def generate_site(
+    session: Session,
+    output_dir: Path,
+    max_articles: int = 100,
+    min_topic_score: Optional[float] = None,
+    site_url: Optional[str] = None,
+    thumbnails: Optional[ThumbnailOptions] = None
+) -> None:
     """
     Generate static site from database.
 
@@ -101,6 +183,9 @@ def generate_site(session: Session, output_dir: Path, max_articles: int = 100) -
         session: Database session
         output_dir: Output directory for generated site
         max_articles: Maximum number of articles to include
+        min_topic_score: Hide topic assignments scoring below this
+        site_url: Public URL of the site, for absolute links in feeds
+        thumbnails: Serve article images as local thumbnails (None = hot-link originals)
     """
     # Ensure output directory exists
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -110,7 +195,17 @@ def generate_site(session: Session, output_dir: Path, max_articles: int = 100) -
     env = Environment(loader=FileSystemLoader(str(templates_dir)))
 
     # Get articles with topics
-    articles = get_articles_with_topics(session, limit=max_articles)
+    start = time.perf_counter()
+    articles = get_articles_with_topics(session, limit=max_articles, min_topic_score=min_topic_score)
+    record_render("load articles", time.perf_counter() - start, articles=len(articles))
+
+    if thumbnails is not None:
+        start = time.perf_counter()
+        thumbs = generate_thumbnails(articles, output_dir, thumbnails)
+        record_render(
+            "thumbnails", time.perf_counter() - start,
+            images=thumbs.images, downloaded=thumbs.downloaded, failed=thumbs.failed
+        )
 
     # Collect all categories from enabled sources (not just displayed articles)
     categories = set()
@@ -127,6 +222,7 @@ def generate_site(session: Session, output_dir: Path, max_articles: int = 100) -
         all_topics.update(article.get('topics', []))
 
     # Render index page
+    start = time.perf_counter()
     template = env.get_template('index.html')
     html = template.render(
         articles=articles,
@@ -138,15 +234,36 @@ def generate_site(session: Session, output_dir: Path, max_articles: int = 100) -
     # Write index.html
     index_path = output_dir / 'index.html'
     index_path.write_text(html)
+    record_render("index.html", time.perf_counter() - start, bytes=len(html))
+
+    # Client-side search over the rendered articles
+    start = time.perf_counter()
+    index_bytes = write_search_index(articles, output_dir / 'search')
+    record_render("search index", time.perf_counter() - start, bytes=index_bytes)
+
+    # Atom/JSON feeds of the same articles, rewritten only when they change
+    start = time.perf_counter()
+    topic_slugs = dict(session.query(Topic.name, Topic.slug))
+    feeds = write_feeds(articles, output_dir / 'feeds', topic_slugs, site_url)
+    record_render("feeds", time.perf_counter() - start, files=feeds.files, written=feeds.written)
 
     # Copy static assets
+    start = time.perf_counter()
     static_src = get_static_dir()
     static_dest = output_dir / 'static'
 
-    # Remove existing static directory if it exists
+    # Remove existing static files, keeping the thumbnail cache while it is in use
+    thumbs_dest = output_dir / THUMBS_PATH
     if static_dest.exists():
-        shutil.rmtree(static_dest)
+        for path in static_dest.iterdir():
+            if path == thumbs_dest and thumbnails is not None:
+                continue
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
 
     # Copy static files
     if static_src.exists():
-        shutil.copytree(static_src, static_dest)
+        shutil.copytree(static_src, static_dest, dirs_exist_ok=True)
+    record_render("static", time.perf_counter() - start)
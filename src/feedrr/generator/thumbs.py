@@ -0,0 +1,302 @@
+"""Local thumbnails for article images.
+
+Feeds point at full-size originals, often several megabytes, which the
+generated pages would otherwise hot-link. With ``generator.thumbnails``
+enabled, ``generate_site`` downloads each article image once, shrinks it
+to fit within width x height and stores it under ``static/thumbs/``. The
+file name is a hash of the original bytes and the thumbnail settings:
+
+    static/thumbs/manifest.json     {"version": 1, "settings": "600x400-webp-q75",
+                                     "images": {image url: {"file", "width", "height"}
+                                                or {"error", "failed_at"}}}
+    static/thumbs/<hash>.webp
+
+The manifest records which URL maps to which thumbnail, so an image that
+was already processed is not downloaded again. Failed images are retried
+after FAILURE_RETRY. Thumbnails of images that are no longer shown are
+removed, and changing the settings starts a new cache.
+
+Images are downloaded on a thread pool that shares one pooled HTTP session.
+Pillow is needed only when thumbnails are enabled:
+``pip install 'feedrr[images]'``.
+"""
+
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from feedrr.fetcher.rss import HEADERS
+
+
+# Bump when the manifest layout changes
+MANIFEST_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+# Where thumbnails live, relative to the site root
+THUMBS_PATH = "static/thumbs"
+
+# Hex characters of the content hash in thumbnail names
+NAME_CHARS = 24
+
+# How long a failed image is left alone before it is tried again
+FAILURE_RETRY = timedelta(days=1)
+
+CHUNK_SIZE = 64 * 1024
+
+FORMATS = {'webp': ('WEBP', '.webp'), 'jpeg': ('JPEG', '.jpg')}
+
+
+@dataclass
+class ThumbnailOptions:
+    """Thumbnail size, encoding and download limits."""
+
+    width: int = 600
+    height: int = 400
+    format: str = 'webp'  # 'webp' or 'jpeg'
+    quality: int = 75
+    max_workers: int = 8  # Downloads in flight
+    max_bytes: int = 10 * 1024 * 1024  # Larger originals are skipped
+    timeout: int = 15
+
+    @property
+    def settings(self) -> str:
+        """Everything that changes thumbnail bytes, as recorded in the manifest."""
+        return f"{self.width}x{self.height}-{self.format}-q{self.quality}"
+
+
+@dataclass
+class ThumbnailResult:
+    """Outcome of generate_thumbnails."""
+
+    images: int  # Distinct image URLs shown
+    downloaded: int  # Processed this run
+    failed: int  # Failed this run
+    removed: int  # Thumbnails no longer shown, deleted
+
+
+def thumbnail_options_from_config(config: Dict) -> Optional[ThumbnailOptions]:
+    """
+    ThumbnailOptions from ``generator.thumbnails`` in config.yaml, or None if disabled.
+
+    Raises:
+        ValueError: If thumbnails are enabled but the format is unknown or
+            Pillow is not installed
+    """
+    section = config.get('generator', {}).get('thumbnails') or {}
+    if not section.get('enabled'):
+        return None
+    fields = {key: section[key] for key in ThumbnailOptions.__dataclass_fields__ if key in section}
+    options = ThumbnailOptions(**fields)
+    if options.format not in FORMATS:
+        raise ValueError(f"Unknown thumbnail format {options.format!r} (expected one of: {', '.join(FORMATS)})")
+    if importlib.util.find_spec('PIL') is None:
+        raise ValueError("Thumbnails need Pillow: pip install 'feedrr[images]'")
+    return options
+
+
+def make_session(max_workers: int) -> requests.Session:
+    """HTTP session whose connection pool fits max_workers concurrent downloads."""
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    http.mount('http://', adapter)
+    http.mount('https://', adapter)
+    http.headers.update(HEADERS)
+    return http
+
+
+def download(http: requests.Session, url: str, options: ThumbnailOptions) -> bytes:
+    """
+    Body of url, up to options.max_bytes.
+
+    Raises:
+        requests.RequestException: On network and HTTP errors
+        ValueError: If the body is larger than options.max_bytes
+    """
+    with http.get(url, timeout=options.timeout, stream=True) as response:
+        response.raise_for_status()
+        length = response.headers.get('Content-Length', '')
+        if length.isdigit() and int(length) > options.max_bytes:
+            raise ValueError(f"Image is larger than {options.max_bytes} bytes")
+        body = bytearray()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            body += chunk
+            if len(body) > options.max_bytes:
+                raise ValueError(f"Image is larger than {options.max_bytes} bytes")
+    return bytes(body)
+
+
+def make_thumbnail(data: bytes, options: ThumbnailOptions) -> Tuple[bytes, int, int]:
+    """
+    Shrink an encoded image to fit options.width x options.height.
+
+    Images already small enough are re-encoded but not enlarged.
+
+    Returns:
+        (encoded thumbnail, width, height)
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as original:
+        # JPEGs can be decoded at a fraction of their size, which is far cheaper
+        original.draft('RGB', (options.width * 2, options.height * 2))
+        image = ImageOps.exif_transpose(original)
+    image.thumbnail((options.width, options.height), Image.Resampling.LANCZOS)
+
+    transparent = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    image_format, _ = FORMATS[options.format]
+    out = io.BytesIO()
+    if image_format == 'WEBP':
+        image = image.convert('RGBA' if transparent else 'RGB')
+        image.save(out, 'WEBP', quality=options.quality, method=4)
+    else:
+        if transparent:
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, 'white')
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        image.convert('RGB').save(out, 'JPEG', quality=options.quality, optimize=True, progressive=True)
+    return out.getvalue(), image.width, image.height
+
+
+def image_size(path: Path) -> Tuple[int, int]:
+    """(width, height) of an image file, read from its header."""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return image.size
+
+
+def process_image(http: requests.Session, url: str, thumbs_dir: Path, options: ThumbnailOptions) -> Dict[str, Any]:
+    """
+    Download url and store its thumbnail in thumbs_dir.
+
+    Returns:
+        Manifest entry: file name, width and height
+    """
+    data = download(http, url, options)
+    digest = hashlib.sha256(data)
+    digest.update(options.settings.encode())
+    name = digest.hexdigest()[:NAME_CHARS] + FORMATS[options.format][1]
+    path = thumbs_dir / name
+
+    if path.exists():
+        # The same image under another URL
+        width, height = image_size(path)
+    else:
+        thumbnail, width, height = make_thumbnail(data, options)
+        # Unique temporary name: another worker may be writing the same thumbnail
+        fd, temp_name = tempfile.mkstemp(dir=thumbs_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(thumbnail)
+        os.replace(temp_name, path)
+    return {'file': name, 'width': width, 'height': height}
+
+
+def load_manifest(thumbs_dir: Path, options: ThumbnailOptions) -> Dict[str, Dict[str, Any]]:
+    """Manifest entries by image URL (empty if missing, unreadable or for other settings)."""
+    try:
+        manifest = json.loads((thumbs_dir / MANIFEST_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('settings') != options.settings:
+        return {}
+    return manifest.get('images', {})
+
+
+def save_manifest(thumbs_dir: Path, options: ThumbnailOptions, images: Dict[str, Dict[str, Any]]) -> None:
+    """Atomically write the manifest."""
+    manifest = {'version': MANIFEST_VERSION, 'settings': options.settings, 'images': images}
+    temp_path = thumbs_dir / (MANIFEST_FILE + '.tmp')
+    temp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(temp_path, thumbs_dir / MANIFEST_FILE)
+
+
+def is_current(entry: Optional[Dict[str, Any]], thumbs_dir: Path, now: datetime) -> bool:
+    """True if a manifest entry needs no new download."""
+    if entry is None:
+        return False
+    if 'file' in entry:
+        return (thumbs_dir / entry['file']).exists()
+    return now - datetime.fromisoformat(entry['failed_at']) < FAILURE_RETRY
+
+
+def generate_thumbnails(
+    articles: List[Dict[str, Any]],
+    output_dir: Path,
+    options: ThumbnailOptions,
+    now: Optional[datetime] = None
+) -> ThumbnailResult:
+    """
+    Make thumbnails for the articles' images and point the view model at them.
+
+    Each article dict gets a 'thumbnail' key: a dict with the url (relative
+    to the site root), width and height of its thumbnail, or None if it has
+    no image or its image could not be processed (the page then falls back
+    to image_url).
+
+    Args:
+        articles: Article dicts from get_articles_with_topics (updated in place)
+        output_dir: Site root; thumbnails go to THUMBS_PATH below it
+        options: Thumbnail settings
+        now: Current time, for retrying failures (default: utcnow)
+
+    Returns:
+        Counts of images shown, processed, failed and removed
+    """
+    now = now or datetime.utcnow()
+    thumbs_dir = output_dir / THUMBS_PATH
+    thumbs_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(thumbs_dir, options)
+
+    urls = sorted({
+        article['image_url'] for article in articles
+        if (article.get('image_url') or '').startswith(('http://', 'https://'))
+    })
+    pending = [url for url in urls if not is_current(manifest.get(url), thumbs_dir, now)]
+
+    downloaded = failed = 0
+    if pending:
+        workers = max(1, options.max_workers)
+        with make_session(workers) as http, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbs") as executor:
+            futures = {executor.submit(process_image, http, url, thumbs_dir, options): url for url in pending}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    manifest[url] = future.result()
+                    downloaded += 1
+                except Exception as e:
+                    manifest[url] = {'error': str(e), 'failed_at': now.isoformat()}
+                    failed += 1
+
+    # Only images still shown stay in the cache
+    images = {url: manifest[url] for url in urls}
+    keep = {entry['file'] for entry in images.values() if 'file' in entry} | {MANIFEST_FILE}
+    removed = 0
+    for path in thumbs_dir.iterdir():
+        if path.is_file() and path.name not in keep:
+            path.unlink()
+            if path.suffix != '.tmp':
+                removed += 1
+    save_manifest(thumbs_dir, options, images)
+
+    for article in articles:
+        entry = images.get(article.get('image_url'))
+        if entry is not None and 'file' in entry:
+            article['thumbnail'] = {
+                'url': f"{THUMBS_PATH}/{entry['file']}", 'width': entry['width'], 'height': entry['height']
+            }
+        else:
+            article['thumbnail'] = None
+
+    return ThumbnailResult(images=len(urls), downloaded=downloaded, failed=failed, removed=removed)
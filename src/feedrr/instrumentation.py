@@ -0,0 +1,217 @@
+"""Run instrumentation for the build pipeline.
+
+A ``RunReport`` records per-stage wall/CPU time, per-source fetch latency and
+size, per-batch encode time, database query counts and times, and render
+timings. Pipeline code records into the active report through the module-level
+``record_*`` helpers, which do nothing when no report is active, so commands
+run standalone behave exactly as before.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from rich.table import Table
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Report currently collecting measurements (set by RunReport.activate)
+_active: Optional["RunReport"] = None
+
+
+class RunReport:
+    """Timings and counters for one pipeline run."""
+
+    def __init__(self, command: str):
+        self.command = command
+        self.started_at = datetime.now(timezone.utc)
+        self.stages: List[Dict[str, Any]] = []
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.batches: List[Dict[str, Any]] = []
+        self.renders: List[Dict[str, Any]] = []
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self._query_starts: List[float] = []
+
+    # SQLAlchemy cursor hooks (registered on the Engine class while active)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self._query_starts.append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self._query_starts:
+            self.query_seconds += time.perf_counter() - self._query_starts.pop()
+        self.query_count += 1
+
+    @contextmanager
+    def activate(self) -> Iterator["RunReport"]:
+        """Make this the report that record_* helpers and query hooks write to."""
+        global _active
+        previous = _active
+        _active = self
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        try:
+            yield self
+        finally:
+            event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+            _active = previous
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a pipeline stage (wall and CPU) and the queries it runs."""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        queries_start = self.query_count
+        query_seconds_start = self.query_seconds
+        try:
+            yield
+        finally:
+            self.stages.append({
+                'name': name,
+                'wall_seconds': time.perf_counter() - wall_start,
+                'cpu_seconds': time.process_time() - cpu_start,
+                'queries': self.query_count - queries_start,
+                'query_seconds': self.query_seconds - query_seconds_start,
+            })
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(stage['wall_seconds'] for stage in self.stages)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable report."""
+        return {
+            'command': self.command,
+            'started_at': self.started_at.isoformat(),
+            'total_seconds': self.total_seconds,
+            'stages': self.stages,
+            'queries': {'count': self.query_count, 'seconds': self.query_seconds},
+            'sources': sorted(self.sources.values(), key=lambda s: s.get('seconds', 0), reverse=True),
+            'encode_batches': self.batches,
+            'renders': self.renders,
+        }
+
+    def write(self, logs_dir: Path) -> Path:
+        """
+        Write the report as JSON.
+
+        Returns:
+            Path of the written file (logs/run-<UTC timestamp>.json)
+        """
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        path = logs_dir / f"run-{self.started_at.strftime('%Y%m%d-%H%M%S')}.json"
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=str))
+        return path
+
+    def summary_table(self, slowest_sources: int = 5) -> Table:
+        """Rich table of stage timings plus the slowest sources."""
+        table = Table(title=f"feedrr {self.command} timings")
+        table.add_column("Stage", style="cyan")
+        table.add_column("Wall (s)", justify="right")
+        table.add_column("CPU (s)", justify="right")
+        table.add_column("Queries", justify="right")
+        table.add_column("Query (s)", justify="right")
+
+        for stage in self.stages:
+            table.add_row(
+                stage['name'],
+                f"{stage['wall_seconds']:.2f}",
+                f"{stage['cpu_seconds']:.2f}",
+                str(stage['queries']),
+                f"{stage['query_seconds']:.2f}",
+            )
+        table.add_row(
+            "[bold]total[/bold]", f"[bold]{self.total_seconds:.2f}[/bold]", "",
+            str(self.query_count), f"{self.query_seconds:.2f}"
+        )
+
+        slowest = self.to_dict()['sources'][:slowest_sources]
+        if slowest:
+            table.add_section()
+            for source in slowest:
+                label = f"  {source.get('name') or source['url']}"
+                if source.get('error'):
+                    label += " [red](error)[/red]"
+                elif source.get('bytes') is not None:
+                    label += f" ({source['bytes'] / 1024:.0f} KiB)"
+                table.add_row(label, f"{source.get('seconds', 0):.2f}", "", "", "")
+        if self.batches:
+            encode_seconds = sum(batch['seconds'] for batch in self.batches)
+            table.add_section()
+            table.add_row(f"  encode ({len(self.batches)} batches)", f"{encode_seconds:.2f}", "", "", "")
+        for render in self.renders:
+            table.add_row(f"  render {render['name']}", f"{render['seconds']:.2f}", "", "", "")
+        return table
+
+
+def active_report() -> Optional[RunReport]:
+    """The report currently collecting measurements, if any."""
+    return _active
+
+
+def record_source(url: str, **fields: Any) -> None:
+    """Merge fetch measurements (name, seconds, bytes, status, articles, new, error) for a source."""
+    if _active is not None:
+        _active.sources.setdefault(url, {'url': url}).update(fields)
+
+
+def record_batch(size: int, encoded: int, seconds: float) -> None:
+    """Record one embedding batch: articles in it, texts actually encoded and time taken."""
+    if _active is not None:
+        _active.batches.append({'size': size, 'encoded': encoded, 'seconds': seconds})
+
+
+def record_render(name: str, seconds: float, **fields: Any) -> None:
+    """Record a site generation step."""
+    if _active is not None:
+        _active.renders.append({'name': name, 'seconds': seconds, **fields})
+
+
+@contextmanager
+def profiled(output_path: Optional[Path], profiler: str = "cprofile") -> Iterator[Optional[Path]]:
+    """
+    Profile the enclosed block.
+
+    With profiler="pyinstrument" an HTML report is written (requires the
+    optional ``pyinstrument`` package); otherwise cProfile stats are written
+    in pstats format, readable with ``python -m pstats`` or snakeviz.
+
+    Args:
+        output_path: Path without suffix, or None to disable profiling
+
+    Yields:
+        Path the profile will be written to, or None
+    """
+    if output_path is None:
+        yield None
+        return
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if profiler == "pyinstrument":
+        from pyinstrument import Profiler
+
+        path = output_path.with_suffix('.html')
+        sampler = Profiler()
+        sampler.start()
+        try:
+            yield path
+        finally:
+            sampler.stop()
+            path.write_text(sampler.output_html())
+    else:
+        import cProfile
+
+        path = output_path.with_suffix('.prof')
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield path
+        finally:
+            profile.disable()
+            profile.dump_stats(str(path))
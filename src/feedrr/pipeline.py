@@ -0,0 +1,371 @@
+"""Pipelined build: fetch, embed and tag/write stages running concurrently.
+
+``feedrr build`` runs fetch, process and generate one after another, so the
+CPU idles while feeds download and the network idles while the model runs.
+``feedrr build --pipelined`` instead connects three stages with bounded
+queues::
+
+    fetch (HostScheduler workers) -> embed (batching model calls) -> write (DB)
+
+- fetch: sources are fetched exactly as by ``feedrr fetch``; each result is
+  queued as soon as it arrives
+- embed: article texts are batched across feeds (up to the processor's
+  batch size, or whatever is queued when the queue runs dry), looked up in
+  the embedding cache, and the misses encoded with one model call per batch
+- write: the only stage writing to the database. It saves each feed's new
+  articles, puts the newly encoded vectors in the embedding cache and runs the
+  ArticleProcessor (prefilter, tagging, dedup, clusters) once a batch of new
+  articles has built up, so the model is never called twice for a text
+
+A full queue blocks the stage feeding it, so memory stays bounded however
+far fetching runs ahead of the model. Texts are embedded before the SimHash
+prefilter sees them; the few syndicated copies it would have caught cost a
+model row each, in exchange for never holding up the writer.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .fetcher.frequency import DEFAULT_MAX_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL, update_source_schedule
+from .fetcher.rss import FetchResult
+from .fetcher.scheduler import HostScheduler
+from .processor.batch import ArticleProcessor, ProcessResult
+from .processor.cache import CACHE_FILE, EmbeddingCache
+from .processor.dedup import entry_text
+from .processor.topics import MODEL_NAME, get_model
+from .storage.db import get_articles_without_topics, save_articles
+from .storage.models import Source
+
+
+# Items waiting between two stages
+DEFAULT_QUEUE_SIZE = 64
+
+# How often a blocked stage checks whether the pipeline was stopped
+POLL_SECONDS = 0.1
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Time a stage spent working (not waiting on its queues) and items it handled."""
+
+    busy_seconds: float = 0.0
+    items: int = 0
+
+
+@dataclass
+class PipelineResult:
+    """Counters and stage timings for one pipelined run."""
+
+    fetched: int = 0
+    deferred: int = 0
+    new: int = 0
+    retagged: int = 0
+    processed: int = 0
+    duplicates: int = 0
+    prefiltered: int = 0
+    wall_seconds: float = 0.0
+    stages: Dict[str, StageStats] = field(
+        default_factory=lambda: {name: StageStats() for name in ('fetch', 'embed', 'write')}
+    )
+
+
+@dataclass
+class _Item:
+    """One feed's result on its way through the pipeline."""
+
+    url: str
+    result: Optional[FetchResult]  # None when the host is backing off
+    texts: List[str] = field(default_factory=list)
+    vectors: Optional[np.ndarray] = None
+    encoded: List[int] = field(default_factory=list)  # Indexes of texts the model encoded (cache misses)
+
+
+class _Stopped(Exception):
+    """Raised in a stage when another stage failed."""
+
+
+def _put(target: queue.Queue, item: Any, stop: threading.Event) -> None:
+    """Blocking put that gives up once the pipeline is stopped."""
+    while True:
+        if stop.is_set():
+            raise _Stopped()
+        try:
+            target.put(item, timeout=POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+
+
+def _get(source: queue.Queue, stop: threading.Event) -> Any:
+    """Blocking get that gives up once the pipeline is stopped."""
+    while True:
+        if stop.is_set():
+            raise _Stopped()
+        try:
+            return source.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            continue
+
+
+def fetch_stage(
+    scheduler: HostScheduler,
+    urls: List[str],
+    outbox: queue.Queue,
+    stop: threading.Event,
+    stats: StageStats
+) -> None:
+    """Queue each feed's FetchResult (or None if deferred) as the scheduler delivers it."""
+    start = time.perf_counter()
+    results = scheduler.run(urls)
+    try:
+        for url, result in results:
+            _put(outbox, _Item(url, result), stop)
+            stats.items += 1
+    finally:
+        results.close()
+        # Network time, as seen by the pipeline: until the last feed arrived
+        stats.busy_seconds = time.perf_counter() - start
+
+
+def embed_stage(
+    model: Optional[Any],
+    batch_size: int,
+    inbox: queue.Queue,
+    outbox: queue.Queue,
+    stop: threading.Event,
+    stats: StageStats,
+    cache_path: Optional[Path] = None
+) -> None:
+    """
+    Attach embeddings to each item's new articles, batching texts across feeds.
+
+    A batch is encoded once it holds batch_size texts or the inbox is empty,
+    so a slow trickle of feeds is never held back waiting for a full batch.
+    Texts found in the embedding cache at cache_path skip the model. The
+    stage only reads the cache (its own connection, without touching LRU
+    times); the writer stores the misses. The model (get_model() unless
+    given) loads here, while the first feeds download.
+    """
+    model = model or get_model()
+    cache = EmbeddingCache(cache_path, MODEL_NAME) if cache_path is not None else None
+    pending: List[_Item] = []
+    waiting = 0  # Texts in pending
+
+    def flush() -> None:
+        nonlocal waiting
+        texts = [text for item in pending for text in item.texts]
+        if texts:
+            start = time.perf_counter()
+            found = [cache.get(text, touch=False) if cache is not None else None for text in texts]
+            misses = [i for i, vector in enumerate(found) if vector is None]
+            if misses:
+                encoded = model.encode([texts[i] for i in misses], batch_size=batch_size)
+                for i, vector in zip(misses, encoded):
+                    found[i] = vector
+            vectors = np.stack(found).astype(np.float32, copy=False)
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += len(texts)
+            missed = set(misses)
+            offset = 0
+            for item in pending:
+                item.vectors = vectors[offset:offset + len(item.texts)]
+                item.encoded = [i for i in range(len(item.texts)) if offset + i in missed]
+                offset += len(item.texts)
+        for item in pending:
+            _put(outbox, item, stop)
+        pending.clear()
+        waiting = 0
+
+    try:
+        while True:
+            try:
+                item = inbox.get_nowait() if pending else _get(inbox, stop)
+            except queue.Empty:
+                flush()
+                continue
+            if item is _DONE:
+                flush()
+                return
+
+            if item.result is not None:
+                item.texts = [
+                    entry_text(article['title'], article.get('content')) for article in item.result.articles
+                ]
+            pending.append(item)
+            waiting += len(item.texts)
+            if waiting >= batch_size:
+                flush()
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def _stage_thread(
+    name: str,
+    target: Callable[..., None],
+    args: tuple,
+    outbox: queue.Queue,
+    stop: threading.Event,
+    errors: List[BaseException]
+) -> threading.Thread:
+    """Start a stage on its own thread; unless the pipeline stops, its output ends with _DONE."""
+    def run() -> None:
+        try:
+            target(*args)
+        except _Stopped:
+            return
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+            return
+        try:
+            _put(outbox, _DONE, stop)
+        except _Stopped:
+            pass
+
+    thread = threading.Thread(target=run, name=f"feedrr-{name}", daemon=True)
+    thread.start()
+    return thread
+
+
+def _drain(inbox: queue.Queue, stop: threading.Event, errors: List[BaseException]) -> Iterator[_Item]:
+    """Items from the last queue until _DONE, re-raising a failure from an earlier stage."""
+    while True:
+        try:
+            item = _get(inbox, stop)
+        except _Stopped:
+            raise errors[0] if errors else RuntimeError("pipeline stopped")
+        if item is _DONE:
+            return
+        yield item
+
+
+def run_pipelined(
+    session: Session,
+    config: Dict,
+    data_dir: Path,
+    sources: List[Source],
+    scheduler: HostScheduler,
+    model: Optional[Any] = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    skip_dedup: bool = False,
+    processor: Optional[ArticleProcessor] = None,
+    on_result: Optional[Callable[[Source, FetchResult, int], None]] = None
+) -> PipelineResult:
+    """
+    Fetch sources, embed their new articles and tag/deduplicate them, all at once.
+
+    The calling thread is the single database writer. Fetching and embedding
+    run on their own threads and hand work over through bounded queues.
+
+    Args:
+        session: Database session (used only by the calling thread)
+        config: Parsed config.yaml
+        data_dir: Data directory (embedding cache and matrix live here)
+        sources: Sources to fetch
+        scheduler: HostScheduler set up for the sources, as for ``feedrr fetch``
+        model: Encoder with the sentence-transformers encode() API (default: get_model())
+        queue_size: Items allowed to wait between two stages
+        skip_dedup: Tag only, as ``feedrr process --skip-dedup``
+        processor: Long-lived processor to reuse (left open); by default
+            one is built for the run and closed afterwards
+        on_result: Called with (source, result, new article count) per fetched
+            feed; deferred sources are not reported
+
+    Returns:
+        Counters and per-stage busy time
+    """
+    fetcher_config = config.get('fetcher', {})
+    min_poll = fetcher_config.get('min_poll_interval', DEFAULT_MIN_POLL_INTERVAL)
+    max_poll = fetcher_config.get('max_poll_interval', DEFAULT_MAX_POLL_INTERVAL)
+    batch_size = config.get('llm', {}).get('batch_size', 32)
+    by_url = {source.feed_url: source for source in sources}
+
+    result = PipelineResult()
+    stats = result.stages
+    fetched: queue.Queue = queue.Queue(maxsize=queue_size)
+    embedded: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    start = time.perf_counter()
+
+    threads = [
+        _stage_thread('fetch', fetch_stage, (scheduler, list(by_url), fetched, stop, stats['fetch']),
+                      fetched, stop, errors),
+        _stage_thread('embed', embed_stage, (model, batch_size, fetched, embedded, stop, stats['embed'],
+                                             data_dir / CACHE_FILE), embedded, stop, errors),
+    ]
+
+    writer = stats['write']
+    owns_processor = processor is None
+    untagged = 0
+
+    def process() -> None:
+        nonlocal untagged
+        batch = processor.process(get_articles_without_topics(session))
+        _add(result, batch)
+        untagged = 0
+
+    try:
+        if owns_processor:
+            # Building the processor's indexes overlaps with the first downloads
+            processor = ArticleProcessor(session, config, data_dir, skip_dedup=skip_dedup)
+        result.retagged = processor.retag().articles
+
+        for item in _drain(embedded, stop, errors):
+            busy = time.perf_counter()
+            source = by_url[item.url]
+            if item.result is None:
+                result.deferred += 1
+                continue
+
+            new_count = 0
+            if item.result.ok:
+                new_count = save_articles(session, source, item.result.articles)
+                update_source_schedule(source, item.result.published_dates, new_count,
+                                       min_interval=min_poll, max_interval=max_poll)
+                session.commit()
+                # Tagging finds these in the cache instead of running the model
+                for i in item.encoded:
+                    processor.cache.put(item.texts[i], item.vectors[i])
+            result.fetched += 1
+            result.new += new_count
+            untagged += new_count
+            writer.items += 1
+
+            # Tag a full batch, or whatever is there when nothing else is queued
+            if untagged and (untagged >= batch_size or embedded.empty()):
+                process()
+            writer.busy_seconds += time.perf_counter() - busy
+            if on_result:
+                on_result(source, item.result, new_count)
+
+        # Also picks up articles an earlier, interrupted run left untagged
+        busy = time.perf_counter()
+        process()
+        writer.busy_seconds += time.perf_counter() - busy
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        if owns_processor and processor is not None:
+            processor.close()
+
+    result.wall_seconds = time.perf_counter() - start
+    return result
+
+
+def _add(result: PipelineResult, batch: ProcessResult) -> None:
+    result.processed += batch.processed
+    result.duplicates += batch.duplicates
+    result.prefiltered += batch.prefiltered
@@ -0,0 +1,224 @@
+"""Batched article processing: prefilter, embed, tag and cluster."""
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..instrumentation import record_batch
+from ..storage.models import Article
+from ..storage.db import (
+    assign_topic_to_article,
+    backfill_signatures,
+    copy_article_topics,
+    find_signature_duplicate,
+    load_signature_index,
+)
+from .cache import CACHE_FILE, EmbeddingCache, DEFAULT_MAX_ENTRIES, encode_batch_with_cache
+from .clusters import backfill_clusters, update_clusters
+from .dedup import EmbeddingIndex, article_text, mark_as_duplicate, serialize_embedding
+from .matrix import EmbeddingMatrix
+from .retag import RetagResult, retag_changed_topics
+from .topics import (
+    DEFAULT_THRESHOLD,
+    DEFAULT_TOP_K,
+    MODEL_NAME,
+    assign_topics_batch,
+    get_model,
+)
+
+
+@dataclass
+class ProcessResult:
+    """Counters for one processing run."""
+
+    processed: int = 0
+    duplicates: int = 0
+    prefiltered: int = 0
+
+
+class ArticleProcessor:
+    """
+    Tags and deduplicates articles in batches.
+
+    Holds the state that is expensive to build (embedding cache, SimHash index,
+    memory-mapped embedding index), so one instance can process several
+    batches or runs. Each batch is encoded with a single model call and scored
+    against all topics with a single matrix product.
+    """
+
+    def __init__(self, session: Session, config: Dict, data_dir: Path, skip_dedup: bool = False):
+        llm = config.get('llm', {})
+        tagging = config.get('tagging', {})
+
+        self.session = session
+        self.skip_dedup = skip_dedup
+        self.topic_definitions = config['topics']
+        self.batch_size = llm.get('batch_size', 32)
+        self.dedup_threshold = llm.get('dedup_threshold', 0.85)
+        self.max_distance = llm.get('prefilter_max_distance', 3)
+        self.topic_threshold = tagging.get('threshold', DEFAULT_THRESHOLD)
+        self.top_k = tagging.get('top_k', DEFAULT_TOP_K)
+
+        # Identical title+content (syndicated copies, re-fetched rows) costs a
+        # cache lookup instead of a forward pass
+        self.cache = EmbeddingCache(
+            data_dir / CACHE_FILE,
+            MODEL_NAME,
+            max_entries=llm.get('embedding_cache_size', DEFAULT_MAX_ENTRIES)
+        )
+        # Stored embeddings are scanned through a memory-mapped mirror
+        self.embedding_matrix = EmbeddingMatrix(data_dir, MODEL_NAME)
+        self.prepare()
+
+    def prepare(self) -> None:
+        """Refresh indexes from the database before a run."""
+        # Prefilter: SimHash signatures resolve near-exact copies without the model
+        backfill_signatures(self.session)
+        self.signature_index = load_signature_index(self.session)
+
+        backfill_clusters(self.session)
+        self.embedding_matrix.sync(self.session)
+        self.embedding_index = EmbeddingIndex(self.embedding_matrix.ids, self.embedding_matrix.vectors)
+
+    def retag(self) -> RetagResult:
+        """Re-score stored embeddings for topics whose definition changed."""
+        return retag_changed_topics(
+            self.session,
+            self.topic_definitions,
+            self.embedding_matrix,
+            self.cache,
+            self.topic_threshold,
+            self.top_k
+        )
+
+    def process(
+        self,
+        articles: List[Article],
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> ProcessResult:
+        """
+        Tag, deduplicate and cluster articles.
+
+        Args:
+            articles: Articles to process, oldest first
+            progress: Optional callback receiving (processed, total)
+
+        Returns:
+            Counters for the run
+        """
+        # Articles saved since the last run (a long-lived processor) become prefilter candidates
+        load_signature_index(self.session, self.signature_index)
+
+        result = ProcessResult()
+        processed_ids: List[int] = []
+        neighbour_pairs: List[Tuple[int, int]] = []
+        new_embeddings: Dict[int, np.ndarray] = {}
+
+        for start in range(0, len(articles), self.batch_size):
+            batch = articles[start:start + self.batch_size]
+            self._process_batch(batch, result, neighbour_pairs, new_embeddings)
+            processed_ids.extend(article.id for article in batch)
+            result.processed += len(batch)
+            if progress:
+                progress(result.processed, len(articles))
+
+        # Merge clusters and pick each cluster's canonical article
+        if not self.skip_dedup:
+            update_clusters(self.session, processed_ids, neighbour_pairs)
+        if new_embeddings:
+            self.embedding_matrix.append(
+                new_embeddings.keys(), np.stack(list(new_embeddings.values()))
+            )
+            self.embedding_index = EmbeddingIndex(
+                self.embedding_matrix.ids, self.embedding_matrix.vectors
+            )
+        self.cache.commit()
+        return result
+
+    def _process_batch(
+        self,
+        batch: List[Article],
+        result: ProcessResult,
+        neighbour_pairs: List[Tuple[int, int]],
+        new_embeddings: Dict[int, np.ndarray]
+    ) -> None:
+        to_embed = []
+        deferred = []
+        for article in batch:
+            original = None
+            if not self.skip_dedup and not article.is_duplicate:
+                original = find_signature_duplicate(
+                    self.session, self.signature_index, article, self.max_distance
+                )
+
+            if original is not None and original in to_embed:
+                # Copy of an article in this batch: wait until the original is tagged
+                deferred.append((article, original))
+            elif original is not None and original.topics:
+                self._resolve_prefiltered(article, original, result, neighbour_pairs)
+            else:
+                to_embed.append(article)
+
+        if to_embed:
+            self._embed_and_tag(to_embed, result, neighbour_pairs, new_embeddings)
+
+        for article, original in deferred:
+            self._resolve_prefiltered(article, original, result, neighbour_pairs)
+
+    def _resolve_prefiltered(
+        self,
+        article: Article,
+        original: Article,
+        result: ProcessResult,
+        neighbour_pairs: List[Tuple[int, int]]
+    ) -> None:
+        # Obvious duplicate: reuse the original's topics, skip the model
+        mark_as_duplicate(article, original)
+        copy_article_topics(self.session, original, article)
+        neighbour_pairs.append((article.id, original.id))
+        result.duplicates += 1
+        result.prefiltered += 1
+
+    def _embed_and_tag(
+        self,
+        to_embed: List[Article],
+        result: ProcessResult,
+        neighbour_pairs: List[Tuple[int, int]],
+        new_embeddings: Dict[int, np.ndarray]
+    ) -> None:
+        start = time.perf_counter()
+        misses = self.cache.misses
+        embeddings = encode_batch_with_cache(
+            get_model(), [article_text(article) for article in to_embed], self.cache, self.batch_size
+        )
+        record_batch(len(to_embed), self.cache.misses - misses, time.perf_counter() - start)
+        topic_matches = assign_topics_batch(
+            embeddings, self.topic_definitions, self.cache, self.topic_threshold, self.top_k
+        )
+
+        for article, embedding, matches in zip(to_embed, embeddings, topic_matches):
+            for rank, (slug, score) in enumerate(matches, start=1):
+                assign_topic_to_article(self.session, article, slug, score, rank)
+
+            article.embedding = serialize_embedding(embedding)
+            new_embeddings[article.id] = embedding
+
+            if not self.skip_dedup:
+                # Link to every stored article above the threshold, not just the first
+                neighbours = self.embedding_index.neighbours(
+                    embedding, self.dedup_threshold, exclude_id=article.id
+                )
+                neighbour_pairs.extend((article.id, other_id) for other_id in neighbours)
+                self.embedding_index.add(article.id, embedding)
+                if neighbours:
+                    result.duplicates += 1
+
+        self.session.commit()
+
+    def close(self) -> None:
+        """Flush and close the embedding cache."""
+        self.cache.close()
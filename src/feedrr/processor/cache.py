@@ -0,0 +1,221 @@
+"""Content-addressed on-disk cache for text embeddings."""
+
+import hashlib
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+# Default upper bound on the number of cached vectors (~1.5KB each for MiniLM)
+DEFAULT_MAX_ENTRIES = 50000
+
+# Cache database, in the data directory
+CACHE_FILE = "embedding_cache.db"
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different copies share a cache key."""
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def content_key(text: str, model_id: str) -> bytes:
+    """
+    Build the cache key for a piece of text.
+
+    The key is a SHA-256 digest over the model id and the normalized text, so
+    vectors from different models never collide.
+    """
+    digest = hashlib.sha256()
+    digest.update(model_id.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_text(text).encode('utf-8'))
+    return digest.digest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache keyed by content hash.
+
+    Vectors are stored as raw float32 bytes. When the cache grows beyond
+    ``max_entries`` the least recently used rows are evicted.
+    """
+
+    def __init__(self, path: Path, model_id: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key BLOB PRIMARY KEY,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "EmbeddingCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, text: str, touch: bool = True) -> Optional[np.ndarray]:
+        """
+        Return the cached vector for text, or None on a miss.
+
+        Args:
+            text: Text to look up
+            touch: Mark a hit as recently used. This is a write, so readers
+                sharing the file with another writing connection pass False.
+        """
+        key = content_key(text, self.model_id)
+        row = self._conn.execute(
+            "SELECT dim, vector FROM embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        if touch:
+            self._conn.execute(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        self.hits += 1
+        dim, vector = row
+        return np.frombuffer(vector, dtype=np.float32, count=dim).copy()
+
+    def put(self, text: str, embedding: np.ndarray) -> None:
+        """Store the vector for text, evicting old entries if over capacity."""
+        key = content_key(text, self.model_id)
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        cursor = self._conn.execute(
+            "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_used) VALUES (?, ?, ?, ?)",
+            (key, int(vector.shape[0]), vector.tobytes(), time.time())
+        )
+        # Replacing an existing key also reports one row, so the running count can
+        # drift upwards; it is re-read from the table before evicting
+        self._count += cursor.rowcount
+        if self._count > self.max_entries:
+            self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop least recently used entries down to 90% of capacity.
+
+        Evicting a slice rather than a single row keeps eviction off the hot path
+        for subsequent inserts.
+
+        Returns:
+            Number of entries removed
+        """
+        target = int(self.max_entries * 0.9)
+        excess = self._count - target
+        if excess <= 0:
+            return 0
+
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            " SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (excess,)
+        )
+        self._count -= excess
+        return excess
+
+    def commit(self) -> None:
+        """Flush pending writes to disk."""
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Commit and close the underlying database."""
+        self._conn.commit()
+        self._conn.close()
+
+
+def encode_with_cache(
+    model: "SentenceTransformer",
+    text: str,
+    cache: Optional[EmbeddingCache] = None
+) -> np.ndarray:
+    """
+    Encode text with the model, consulting the cache first when one is given.
+
+    Args:
+        model: SentenceTransformer model
+        text: Text to embed
+        cache: Optional embedding cache
+
+    Returns:
+        Numpy array embedding
+    """
+    if cache is not None:
+        cached = cache.get(text)
+        if cached is not None:
+            return cached
+
+    embedding = model.encode(text)
+
+    if cache is not None:
+        cache.put(text, embedding)
+    return embedding
+
+
+def encode_batch_with_cache(
+    model: "SentenceTransformer",
+    texts: List[str],
+    cache: Optional[EmbeddingCache] = None,
+    batch_size: int = 32
+) -> np.ndarray:
+    """
+    Encode many texts, running the model once over all cache misses.
+
+    Args:
+        model: SentenceTransformer model
+        texts: Texts to embed
+        cache: Optional embedding cache
+        batch_size: Batch size passed to model.encode
+
+    Returns:
+        (N x D) float32 array, rows aligned with texts
+    """
+    vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+    misses = []
+    for i, text in enumerate(texts):
+        cached = cache.get(text) if cache is not None else None
+        if cached is not None:
+            vectors[i] = cached
+        else:
+            misses.append(i)
+
+    if misses:
+        encoded = model.encode([texts[i] for i in misses], batch_size=batch_size)
+        for i, embedding in zip(misses, encoded):
+            vectors[i] = np.asarray(embedding, dtype=np.float32)
+            if cache is not None:
+                cache.put(texts[i], embedding)
+
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack(vectors).astype(np.float32, copy=False)
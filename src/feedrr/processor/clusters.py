@@ -0,0 +1,197 @@
+"""Story clustering of near-duplicate articles using union-find."""
+
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..storage.models import Article, StoryCluster
+
+
+# SQLite limits bound parameters per statement; stay well below it
+_CHUNK_SIZE = 500
+
+
+class UnionFind:
+    """Disjoint-set forest with path compression and union by size."""
+
+    def __init__(self) -> None:
+        self._parent: Dict[Hashable, Hashable] = {}
+        self._size: Dict[Hashable, int] = {}
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._parent
+
+    def add(self, item: Hashable) -> None:
+        """Add an item as its own singleton set (no-op if present)."""
+        if item not in self._parent:
+            self._parent[item] = item
+            self._size[item] = 1
+
+    def find(self, item: Hashable) -> Hashable:
+        """Return the representative of the set containing item."""
+        self.add(item)
+        root = item
+        while self._parent[root] != root:
+            root = self._parent[root]
+        # Path compression
+        while self._parent[item] != root:
+            self._parent[item], item = root, self._parent[item]
+        return root
+
+    def union(self, a: Hashable, b: Hashable) -> Hashable:
+        """Merge the sets containing a and b, returning the new representative."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+        return root_a
+
+    def groups(self) -> List[List[Hashable]]:
+        """Return all sets as lists of their members."""
+        groups: Dict[Hashable, List[Hashable]] = {}
+        for item in self._parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return list(groups.values())
+
+
+def canonical_sort_key(article: Article) -> Tuple[datetime, int]:
+    """
+    Ordering used to pick a cluster's canonical article.
+
+    The earliest published article wins (falling back to fetch time), with the
+    lowest id breaking ties, so the choice never depends on processing order.
+    """
+    date = article.published_date or article.fetched_date or datetime.max
+    if date.tzinfo is not None:
+        date = date.replace(tzinfo=None) - date.utcoffset()
+    return (date, article.id)
+
+
+def _chunks(items: List, size: int = _CHUNK_SIZE) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def update_clusters(
+    session: Session,
+    article_ids: Iterable[int],
+    pairs: Iterable[Tuple[int, int]]
+) -> Set[int]:
+    """
+    Merge articles and their above-threshold neighbours into story clusters.
+
+    Every article in article_ids ends up in a cluster. Each (a, b) pair links
+    two articles; clusters already stored for either side are merged, keeping
+    the lowest cluster id.
+
+    Args:
+        session: Database session
+        article_ids: Newly processed article ids
+        pairs: Neighbour links between articles
+
+    Returns:
+        Ids of the clusters that were created or changed
+    """
+    forest = UnionFind()
+    for article_id in article_ids:
+        forest.add(article_id)
+    for a, b in pairs:
+        forest.union(a, b)
+
+    member_ids = [item for group in forest.groups() for item in group]
+    current: Dict[int, int] = {}
+    for chunk in _chunks(member_ids):
+        for article_id, cluster_id in session.query(Article.id, Article.cluster_id).filter(
+            Article.id.in_(chunk)
+        ):
+            current[article_id] = cluster_id
+
+    touched: Set[int] = set()
+    for group in forest.groups():
+        existing = sorted({current[i] for i in group if current.get(i) is not None})
+        if existing:
+            target, merged = existing[0], existing[1:]
+        else:
+            cluster = StoryCluster()
+            session.add(cluster)
+            session.flush()
+            target, merged = cluster.id, []
+
+        if merged:
+            session.query(Article).filter(Article.cluster_id.in_(merged)).update(
+                {Article.cluster_id: target}, synchronize_session=False
+            )
+            session.query(StoryCluster).filter(StoryCluster.id.in_(merged)).delete(
+                synchronize_session=False
+            )
+
+        unassigned = [i for i in group if current.get(i) != target]
+        for chunk in _chunks(unassigned):
+            session.query(Article).filter(Article.id.in_(chunk)).update(
+                {Article.cluster_id: target}, synchronize_session=False
+            )
+        touched.add(target)
+
+    session.expire_all()
+    refresh_clusters(session, touched)
+    session.commit()
+    return touched
+
+
+def refresh_clusters(session: Session, cluster_ids: Iterable[int]) -> None:
+    """
+    Recompute size, canonical article and duplicate flags for clusters.
+
+    The canonical article is chosen by canonical_sort_key; every other member
+    is marked as a duplicate of it.
+    """
+    cluster_ids = list(cluster_ids)
+    members: Dict[int, List[Article]] = {}
+    for chunk in _chunks(cluster_ids):
+        for article in session.query(Article).filter(Article.cluster_id.in_(chunk)):
+            members.setdefault(article.cluster_id, []).append(article)
+
+    now = datetime.utcnow()
+    for chunk in _chunks(cluster_ids):
+        for cluster in session.query(StoryCluster).filter(StoryCluster.id.in_(chunk)):
+            articles = members.get(cluster.id, [])
+            if not articles:
+                session.delete(cluster)
+                continue
+
+            canonical = min(articles, key=canonical_sort_key)
+            cluster.canonical_article_id = canonical.id
+            cluster.size = len(articles)
+            cluster.updated_at = now
+
+            for article in articles:
+                if article.id == canonical.id:
+                    article.is_duplicate = False
+                    article.duplicate_of_id = None
+                else:
+                    article.is_duplicate = True
+                    article.duplicate_of_id = canonical.id
+
+
+def backfill_clusters(session: Session) -> int:
+    """
+    Put processed articles from before clustering existed into clusters.
+
+    Existing duplicate_of links become cluster edges.
+
+    Returns number of articles assigned.
+    """
+    rows = session.query(Article.id, Article.duplicate_of_id).filter(
+        Article.cluster_id == None,
+        Article.topics.any()
+    ).all()
+    if not rows:
+        return 0
+
+    pairs = [(article_id, original_id) for article_id, original_id in rows if original_id]
+    update_clusters(session, [article_id for article_id, _ in rows], pairs)
+    return len(rows)
@@ -1,10 +1,14 @@
 """Content deduplication using embeddings."""
 
-from typing import List, Optional
+from typing import List, Optional, TYPE_CHECKING
 import numpy as np
 import pickle
-from sentence_transformers import SentenceTransformer
+from sqlalchemy.orm import Session
 from ..storage.models import Article
+from .cache import EmbeddingCache, encode_with_cache
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 
 def serialize_embedding(embedding: np.ndarray) -> bytes:
@@ -22,27 +26,41 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
 
 
-def generate_article_embedding(model: SentenceTransformer, article: Article) -> np.ndarray:
+def entry_text(title: str, content: Optional[str]) -> str:
+    """Text used to embed an article (title + content)."""
+    return f"{title} {content or ''}"
+
+
+def article_text(article: Article) -> str:
+    """Text used to embed a stored article (see entry_text)."""
+    return entry_text(article.title, article.content)
+
+
+def generate_article_embedding(
+    model: "SentenceTransformer",
+    article: Article,
+    cache: Optional[EmbeddingCache] = None
+) -> np.ndarray:
     """
     Generate embedding for an article based on title and content.
 
     Args:
         model: SentenceTransformer model
         article: Article object
+        cache: Optional embedding cache checked before running the model
 
     Returns:
         Numpy array embedding
     """
-    # Combine title and content for embedding
-    text = f"{article.title} {article.content or ''}"
-    return model.encode(text)
+    return encode_with_cache(model, article_text(article), cache)
 
 
 def find_duplicate(
-    model: SentenceTransformer,
+    model: "SentenceTransformer",
     new_article: Article,
     existing_articles: List[Article],
-    threshold: float = 0.85
+    threshold: float = 0.85,
+    cache: Optional[EmbeddingCache] = None
 ) -> Optional[Article]:
     """
     Find if new article is a duplicate of any existing articles.
@@ -52,12 +70,13 @@ def find_duplicate(
         new_article: Newly fetched article
         existing_articles: Articles from database to compare against
         threshold: Similarity threshold (0.85 = 85% similar)
+        cache: Optional embedding cache checked before running the model
 
     Returns:
         Original article if duplicate found, None otherwise
     """
     # Generate embedding for new article
-    new_embedding = generate_article_embedding(model, new_article)
+    new_embedding = generate_article_embedding(model, new_article, cache)
 
     # Compare with existing articles
     for existing in existing_articles:
@@ -77,6 +96,106 @@ def find_duplicate(
     return None
 
 
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so dot products are cosine similarities."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class EmbeddingIndex:
+    """
+    Matrix of normalized article embeddings for vectorized neighbour search.
+
+    Each query is a single matrix-vector product over all stored embeddings
+    instead of a Python loop over deserialized rows. Embeddings added after
+    loading go into a preallocated buffer that doubles when full, so adding
+    n articles costs O(n) copying rather than restacking them per query.
+    """
+
+    # Rows allocated for added embeddings the first time one is added
+    INITIAL_CAPACITY = 256
+
+    def __init__(self, ids: Optional[np.ndarray] = None, matrix: Optional[np.ndarray] = None):
+        self.ids = np.asarray(ids if ids is not None else [], dtype=np.int64)
+        self.matrix = matrix if matrix is not None else np.zeros((0, 0), dtype=np.float32)
+        self._pending_ids = np.zeros(0, dtype=np.int64)
+        self._pending = np.zeros((0, 0), dtype=np.float32)
+        self._pending_count = 0
+
+    @classmethod
+    def from_session(cls, session: Session) -> "EmbeddingIndex":
+        """Load every stored article embedding in one query."""
+        ids = []
+        vectors = []
+        rows = session.query(Article.id, Article.embedding).filter(Article.embedding.isnot(None))
+        for article_id, blob in rows:
+            try:
+                vectors.append(np.asarray(deserialize_embedding(blob), dtype=np.float32))
+            except Exception:
+                continue  # Skip if embedding deserialization fails
+            ids.append(article_id)
+
+        if not vectors:
+            return cls()
+        return cls(np.array(ids, dtype=np.int64), normalize_rows(np.stack(vectors)))
+
+    def __len__(self) -> int:
+        return len(self.ids) + self._pending_count
+
+    def add(self, article_id: int, embedding: np.ndarray) -> None:
+        """Add an embedding; it is searchable immediately."""
+        vector = normalize_rows(embedding).ravel()
+        if self._pending_count == len(self._pending_ids):
+            capacity = max(self.INITIAL_CAPACITY, 2 * self._pending_count)
+            pending = np.zeros((capacity, len(vector)), dtype=np.float32)
+            pending_ids = np.zeros(capacity, dtype=np.int64)
+            if self._pending_count:
+                pending[:self._pending_count] = self._pending
+                pending_ids[:self._pending_count] = self._pending_ids
+            self._pending, self._pending_ids = pending, pending_ids
+        self._pending[self._pending_count] = vector
+        self._pending_ids[self._pending_count] = article_id
+        self._pending_count += 1
+
+    def neighbours(
+        self,
+        embedding: np.ndarray,
+        threshold: float = 0.85,
+        exclude_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Find all stored articles with cosine similarity >= threshold.
+
+        Args:
+            embedding: Query embedding
+            threshold: Similarity threshold (0.85 = 85% similar)
+            exclude_id: Article id to leave out (usually the query article)
+
+        Returns:
+            Matching article ids, most similar first
+        """
+        query = normalize_rows(embedding).ravel()
+        hit_ids = []
+        hit_scores = []
+        count = self._pending_count
+        for ids, matrix in ((self.ids, self.matrix), (self._pending_ids[:count], self._pending[:count])):
+            if not len(ids):
+                continue
+            scores = matrix @ query
+            hits = np.flatnonzero(scores >= threshold)
+            hit_ids.append(ids[hits])
+            hit_scores.append(scores[hits])
+        if not hit_ids:
+            return []
+
+        ids = np.concatenate(hit_ids)
+        scores = np.concatenate(hit_scores)
+        order = np.argsort(-scores, kind='stable')
+        return [int(ids[i]) for i in order if ids[i] != exclude_id]
+
+
 def mark_as_duplicate(article: Article, original: Article) -> None:
     """
     Mark an article as a duplicate of another.
@@ -0,0 +1,193 @@
+"""Append-only, memory-mapped mirror of article embeddings.
+
+SQLite remains the source of truth (``Article.embedding``). This module keeps a
+raw float32 copy of the L2-normalized vectors under ``data/`` so dedup and topic
+scoring can map the whole archive with ``np.memmap`` instead of deserializing
+every row on each run. Pages are only read when a scan touches them.
+
+Files:
+- ``embeddings.f32``: row-major float32 matrix, one normalized vector per row
+- ``embeddings.ids``: int64 ``Article.id`` for each row
+- ``embeddings.json``: metadata (model id, dimension, committed row count,
+  ids of rows whose stored embedding could not be read)
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..storage.models import Article
+from .dedup import deserialize_embedding, normalize_rows
+
+
+# Bump when the on-disk layout changes
+FORMAT_VERSION = 1
+
+
+class EmbeddingMatrix:
+    """
+    Memory-mapped embedding matrix with an article-id sidecar.
+
+    Only rows counted in the metadata file are visible, so a crash halfway
+    through an append never exposes a partial row.
+    """
+
+    def __init__(self, directory: Path, model_id: str, name: str = "embeddings"):
+        self.directory = Path(directory)
+        self.model_id = model_id
+        self.vectors_path = self.directory / f"{name}.f32"
+        self.ids_path = self.directory / f"{name}.ids"
+        self.meta_path = self.directory / f"{name}.json"
+        self.dim: Optional[int] = None
+        self.rows = 0
+        # Articles whose stored embedding failed to deserialize
+        self.skipped: Set[int] = set()
+        self._load_meta()
+
+    def _load_meta(self) -> None:
+        if not self.meta_path.exists():
+            return
+        try:
+            meta = json.loads(self.meta_path.read_text())
+        except (OSError, ValueError):
+            return
+        if meta.get('version') != FORMAT_VERSION or meta.get('model') != self.model_id:
+            return
+        self.dim = meta.get('dim')
+        self.rows = meta.get('rows', 0)
+        self.skipped = set(meta.get('skipped', []))
+
+    def _write_meta(self) -> None:
+        meta = {
+            'version': FORMAT_VERSION,
+            'model': self.model_id,
+            'dim': self.dim,
+            'rows': self.rows,
+            'skipped': sorted(self.skipped),
+        }
+        tmp_path = self.meta_path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self.meta_path)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Read-only (rows x dim) memmap of normalized vectors."""
+        if not self.rows:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(self.rows, self.dim))
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Read-only memmap of article ids, aligned with vectors."""
+        if not self.rows:
+            return np.zeros(0, dtype=np.int64)
+        return np.memmap(self.ids_path, dtype=np.int64, mode='r', shape=(self.rows,))
+
+    def append(self, ids: Iterable[int], vectors: np.ndarray) -> int:
+        """
+        Append embeddings for articles not already mirrored.
+
+        Args:
+            ids: Article ids
+            vectors: (N x D) embeddings, normalized on write
+
+        Returns:
+            Number of rows appended
+        """
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if not len(ids):
+            return 0
+        vectors = normalize_rows(np.atleast_2d(vectors))
+
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} != matrix dimension {self.dim}")
+
+        fresh = ~np.isin(ids, self.ids)
+        ids, vectors = ids[fresh], vectors[fresh]
+        if not len(ids):
+            return 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._append_bytes(self.vectors_path, self.rows * self.dim * 4, vectors)
+        self._append_bytes(self.ids_path, self.rows * 8, ids)
+
+        self.rows += len(ids)
+        self._write_meta()
+        return len(ids)
+
+    @staticmethod
+    def _append_bytes(path: Path, committed_size: int, array: np.ndarray) -> None:
+        with open(path, 'ab') as f:
+            # Drop any uncommitted tail left by an interrupted append
+            f.truncate(committed_size)
+            f.write(np.ascontiguousarray(array).tobytes())
+
+    def clear(self) -> None:
+        """Remove all rows."""
+        for path in (self.vectors_path, self.ids_path, self.meta_path):
+            if path.exists():
+                path.unlink()
+        self.dim = None
+        self.rows = 0
+        self.skipped = set()
+
+    def sync(self, session: Session, batch_size: int = 1000) -> int:
+        """
+        Make the mirror match the embeddings stored in the database.
+
+        Comparing the count and the highest id keeps the common case cheap.
+        Missing rows are appended; if the mirror holds rows whose embedding is
+        gone from the database (rows were compacted away) it is rebuilt. Rows
+        whose embedding cannot be deserialized are logged and remembered, so
+        they are not read again on every sync.
+
+        Returns:
+            Number of rows written
+        """
+        embedded = session.query(Article.id).filter(Article.embedding.isnot(None))
+        stored, newest = session.query(func.count(Article.id), func.max(Article.id)).filter(
+            Article.embedding.isnot(None)
+        ).one()
+        mirrored = set(self.ids.tolist())
+        known = mirrored | self.skipped
+        if stored == len(known) and newest == max(known, default=None):
+            return 0
+
+        stored_ids = {article_id for (article_id,) in embedded}
+        if not mirrored <= stored_ids:
+            self.clear()
+            mirrored = set()
+        self.skipped &= stored_ids
+        missing = sorted(stored_ids - mirrored - self.skipped)
+
+        written = 0
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start:start + batch_size]
+            ids = []
+            vectors = []
+            for article_id, blob in session.query(Article.id, Article.embedding).filter(
+                Article.id.in_(chunk)
+            ):
+                try:
+                    vectors.append(np.asarray(deserialize_embedding(blob), dtype=np.float32))
+                except Exception as e:
+                    print(f"Skipping embedding of article {article_id}: {e}")
+                    self.skipped.add(article_id)
+                    continue
+                ids.append(article_id)
+            if vectors:
+                written += self.append(ids, np.stack(vectors))
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._write_meta()
+        return written
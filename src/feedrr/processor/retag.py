@@ -0,0 +1,230 @@
+"""Incremental re-tagging when topic definitions change.
+
+Each topic row stores a hash of its definition (keywords, effective threshold
+and top_k). When config.yaml changes a topic, stored article embeddings are
+re-scored against the topic matrix in one vectorized pass - the model only
+encodes the edited topic's keywords, never the articles - and the resulting
+``article_topics`` rows (with their scores and ranks) are diff-applied.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.orm import Session, aliased
+
+from ..storage.models import Article, ArticleTopic, Topic
+from ..storage.db import load_topics_from_config
+from .cache import EmbeddingCache
+from .matrix import EmbeddingMatrix
+from .topics import (
+    DEFAULT_THRESHOLD,
+    DEFAULT_TOP_K,
+    FALLBACK_TOPIC,
+    get_topic_matrix,
+    get_topic_thresholds,
+    score_topics_batch,
+    topic_definition_hash,
+)
+
+
+@dataclass
+class RetagResult:
+    """Summary of a re-tagging pass."""
+
+    changed_topics: List[str] = field(default_factory=list)
+    articles: int = 0
+    added: int = 0
+    removed: int = 0
+
+
+def topic_version(topic: Dict, default_threshold: float = DEFAULT_THRESHOLD, top_k: int = DEFAULT_TOP_K) -> str:
+    """Hash of everything that decides which articles a topic is assigned to."""
+    threshold = topic.get('threshold')
+    if threshold is None:
+        threshold = default_threshold
+    return topic_definition_hash({**topic, 'threshold': threshold, 'top_k': top_k})
+
+
+def find_changed_topics(
+    session: Session,
+    topic_definitions: List[Dict],
+    default_threshold: float = DEFAULT_THRESHOLD,
+    top_k: int = DEFAULT_TOP_K
+) -> List[str]:
+    """Slugs of configured topics whose stored hash is missing or out of date."""
+    stored = {topic.slug: topic.definition_hash for topic in session.query(Topic)}
+    return [
+        topic['slug'] for topic in topic_definitions
+        if stored.get(topic['slug']) != topic_version(topic, default_threshold, top_k)
+    ]
+
+
+def _get_or_create_fallback(session: Session) -> Topic:
+    topic = session.query(Topic).filter_by(slug=FALLBACK_TOPIC).first()
+    if not topic:
+        topic = Topic(name='General', slug=FALLBACK_TOPIC)
+        session.add(topic)
+        session.flush()
+    return topic
+
+
+def score_stored_embeddings(
+    matrix: EmbeddingMatrix,
+    topic_definitions: List[Dict],
+    topic_ids: Dict[str, int],
+    fallback_id: int,
+    cache: Optional[EmbeddingCache] = None,
+    default_threshold: float = DEFAULT_THRESHOLD,
+    top_k: int = DEFAULT_TOP_K,
+    chunk_size: int = 4096
+) -> Dict[int, Dict[int, Tuple[Optional[float], int]]]:
+    """
+    Score every mirrored embedding against the current topics.
+
+    The memory-mapped matrix is scanned in chunks, so memory stays bounded by
+    chunk_size rows regardless of archive size.
+
+    Returns:
+        Dict of article id to {topic id: (score, rank)} it should carry
+    """
+    slugs, topic_matrix = get_topic_matrix(topic_definitions, cache=cache)
+    thresholds = get_topic_thresholds(topic_definitions, slugs, default_threshold)
+    vectors, ids = matrix.vectors, matrix.ids
+
+    desired: Dict[int, Dict[int, Tuple[Optional[float], int]]] = {}
+    for start in range(0, len(ids), chunk_size):
+        chunk_ids = ids[start:start + chunk_size].tolist()
+        matches = score_topics_batch(vectors[start:start + chunk_size], topic_matrix, slugs, thresholds, top_k)
+        for article_id, article_matches in zip(chunk_ids, matches):
+            desired[article_id] = {
+                topic_ids[slug]: (score, rank)
+                for rank, (slug, score) in enumerate(article_matches, start=1)
+            } or {fallback_id: (None, 1)}
+    return desired
+
+
+def has_unscored_rows(session: Session, matrix: EmbeddingMatrix, topic_ids: Set[int]) -> bool:
+    """
+    True if re-scoring would fill in a missing score for one of topic_ids.
+
+    Only rows the rewrite in retag_changed_topics can reach count: articles
+    mirrored in the matrix, and prefiltered duplicates of such articles.
+    Rows for removed topics or for articles without a mirrored embedding
+    stay unscored and must not trigger a full pass on every run.
+    """
+    original = aliased(Article)
+    rows = session.query(ArticleTopic.article_id, Article.embedding == None, Article.duplicate_of_id).join(
+        Article, Article.id == ArticleTopic.article_id
+    ).outerjoin(
+        original, original.id == Article.duplicate_of_id
+    ).filter(
+        ArticleTopic.score == None,
+        ArticleTopic.topic_id.in_(topic_ids),
+        or_(Article.embedding != None, original.embedding != None)
+    ).yield_per(1000)
+
+    mirrored: Optional[Set[int]] = None
+    for article_id, follows_original, original_id in rows:
+        if mirrored is None:
+            mirrored = set(matrix.ids.tolist())
+        if article_id in mirrored or (follows_original and original_id in mirrored):
+            return True
+    return False
+
+
+def retag_changed_topics(
+    session: Session,
+    topic_definitions: List[Dict],
+    matrix: EmbeddingMatrix,
+    cache: Optional[EmbeddingCache] = None,
+    default_threshold: float = DEFAULT_THRESHOLD,
+    top_k: int = DEFAULT_TOP_K
+) -> RetagResult:
+    """
+    Re-score stored embeddings if any topic definition changed.
+
+    Also runs once for databases whose rows were tagged before scores were
+    stored, so ranking queries cover the whole archive.
+
+    All topics are scored, not only the edited one, because top_k makes an
+    article's topics depend on each other; only the edited topics' keywords
+    are re-encoded (the rest come from the embedding cache). Only rows for
+    configured topics and the fallback topic are touched. Prefiltered
+    duplicates have no embedding of their own and follow their original.
+
+    Args:
+        session: Database session
+        topic_definitions: Topics from config.yaml
+        matrix: Synced embedding matrix
+        cache: Optional embedding cache for topic keyword texts
+        default_threshold: Threshold for topics without their own
+        top_k: Maximum topics per article
+
+    Returns:
+        Summary of changed topics and applied row changes
+    """
+    load_topics_from_config(session, topic_definitions)
+    result = RetagResult(
+        changed_topics=find_changed_topics(session, topic_definitions, default_threshold, top_k)
+    )
+    fallback_id = _get_or_create_fallback(session).id
+    topics = {topic.slug: topic for topic in session.query(Topic)}
+    topic_ids = {slug: topic.id for slug, topic in topics.items()}
+    configured = {topic_ids[topic['slug']] for topic in topic_definitions}
+    managed = configured | {fallback_id}
+
+    # Rows tagged before scores were stored are scored once as well
+    if not result.changed_topics and not has_unscored_rows(session, matrix, configured):
+        return result
+
+    current: Dict[int, Dict[int, Tuple[int, Optional[float], Optional[int]]]] = {}
+    for row_id, article_id, topic_id, score, rank in session.query(
+        ArticleTopic.id, ArticleTopic.article_id, ArticleTopic.topic_id, ArticleTopic.score, ArticleTopic.rank
+    ):
+        current.setdefault(article_id, {})[topic_id] = (row_id, score, rank)
+
+    desired = score_stored_embeddings(
+        matrix, topic_definitions, topic_ids, fallback_id, cache, default_threshold, top_k
+    )
+    for article_id, original_id in session.query(Article.id, Article.duplicate_of_id).filter(
+        Article.embedding == None,
+        Article.duplicate_of_id != None
+    ):
+        if original_id in desired:
+            desired[article_id] = desired[original_id]
+
+    to_delete: List[int] = []
+    to_insert: List[Dict] = []
+    to_update: List[Dict] = []
+    for article_id, wanted in desired.items():
+        if article_id not in current:
+            continue  # Untagged articles are left to the normal processing run
+        assigned = current[article_id]
+        stale = [row_id for topic_id, (row_id, _score, _rank) in assigned.items()
+                 if topic_id in managed and topic_id not in wanted]
+        fresh = [topic_id for topic_id in wanted if topic_id not in assigned]
+        if stale or fresh:
+            result.articles += 1
+        to_delete.extend(stale)
+        for topic_id, (score, rank) in wanted.items():
+            row = {'score': score, 'rank': rank}
+            if topic_id not in assigned:
+                to_insert.append({'article_id': article_id, 'topic_id': topic_id, **row})
+            elif assigned[topic_id][1:] != (score, rank):
+                to_update.append({'id': assigned[topic_id][0], **row})
+
+    for start in range(0, len(to_delete), 500):
+        session.execute(delete(ArticleTopic).where(ArticleTopic.id.in_(to_delete[start:start + 500])))
+    if to_insert:
+        session.execute(insert(ArticleTopic), to_insert)
+    if to_update:
+        session.execute(update(ArticleTopic), to_update)
+    result.removed = len(to_delete)
+    result.added = len(to_insert)
+
+    for topic in topic_definitions:
+        topics[topic['slug']].definition_hash = topic_version(topic, default_threshold, top_k)
+    session.commit()
+    session.expire_all()
+    return result
@@ -0,0 +1,169 @@
+"""Semantic article search over the memory-mapped embedding matrix.
+
+The query is embedded once (or found in the embedding cache, in which case
+the model is never loaded) and scored against every stored article with one
+matrix-vector product over ``data/embeddings.f32``. Nothing is read from
+the articles table until the best candidates are known: filters (time range,
+source, topic, duplicates) are checked for the top candidates by primary
+key, widening the candidate set if too few pass. A filter so selective that
+even MAX_CANDIDATES candidates are not enough is instead run as one query
+over the articles table, and the matrix is ranked within its result.
+
+Articles show up once they have been processed (the matrix is appended to
+by each processing run); compacted articles have no embedding and are not
+searchable this way.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Query, Session, selectinload
+
+from ..storage.models import Article, ArticleTopic, Source, Topic
+from ..storage.search import SearchHit
+from .cache import EmbeddingCache
+from .dedup import normalize_rows
+from .matrix import EmbeddingMatrix
+from .topics import get_model
+
+
+# Candidates checked against the filters per requested result, at first
+OVERFETCH = 4
+
+# Most candidates checked by primary key before filtering the whole table instead
+MAX_CANDIDATES = 2048
+
+# Ids per primary-key IN (...) lookup
+ID_BATCH_SIZE = 500
+
+# Characters of article text shown with each hit
+SNIPPET_CHARS = 160
+
+
+@dataclass
+class SearchFilters:
+    """Restrictions on semantic search results (None = no restriction)."""
+
+    since: Optional[datetime] = None  # Published (else fetched) at or after
+    until: Optional[datetime] = None  # Published (else fetched) before
+    source: Optional[str] = None  # Source name
+    topic: Optional[str] = None  # Topic slug or name
+    include_duplicates: bool = False
+
+
+def encode_query(query: str, model: Optional[Any] = None, cache: Optional[EmbeddingCache] = None) -> np.ndarray:
+    """
+    Normalized embedding of a query, from the cache when possible.
+
+    The model (get_model() unless given) is only loaded on a cache miss.
+    """
+    vector = cache.get(query) if cache is not None else None
+    if vector is None:
+        vector = np.asarray((model or get_model()).encode(query), dtype=np.float32)
+        if cache is not None:
+            cache.put(query, vector)
+    return normalize_rows(vector).ravel()
+
+
+def filter_query(session: Session, filters: SearchFilters) -> Query:
+    """Query for the ids of all articles matching filters."""
+    date = func.coalesce(Article.published_date, Article.fetched_date)
+    query = session.query(Article.id)
+    if not filters.include_duplicates:
+        query = query.filter(Article.is_duplicate == False)
+    if filters.since is not None:
+        query = query.filter(date >= filters.since)
+    if filters.until is not None:
+        query = query.filter(date < filters.until)
+    if filters.source is not None:
+        query = query.join(Source).filter(Source.name == filters.source)
+    if filters.topic is not None:
+        query = query.join(ArticleTopic, ArticleTopic.article_id == Article.id).join(Topic).filter(
+            or_(Topic.slug == filters.topic, Topic.name == filters.topic)
+        )
+    return query
+
+
+def passing_ids(session: Session, article_ids: Iterable[int], filters: SearchFilters) -> Set[int]:
+    """The subset of article_ids matching filters, looked up by primary key."""
+    article_ids = list(article_ids)
+    query = filter_query(session, filters)
+    passing: Set[int] = set()
+    for start in range(0, len(article_ids), ID_BATCH_SIZE):
+        chunk = query.filter(Article.id.in_(article_ids[start:start + ID_BATCH_SIZE]))
+        passing.update(article_id for (article_id,) in chunk)
+    return passing
+
+
+def top_rows(scores: np.ndarray, count: int) -> np.ndarray:
+    """Indexes of the count highest scores, highest first."""
+    if count < len(scores):
+        top = np.argpartition(-scores, count - 1)[:count]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def semantic_search(
+    session: Session,
+    matrix: EmbeddingMatrix,
+    query_vector: np.ndarray,
+    limit: int = 20,
+    filters: Optional[SearchFilters] = None
+) -> List[SearchHit]:
+    """
+    Articles most similar to query_vector, best first.
+
+    Args:
+        session: Database session
+        matrix: Embedding matrix to scan
+        query_vector: Normalized query embedding (see encode_query)
+        limit: Maximum number of hits
+        filters: Restrictions on the results (default: hide duplicates only)
+
+    Returns:
+        Hits scored by cosine similarity (higher is better)
+    """
+    filters = filters or SearchFilters()
+    rows = len(matrix)
+    if not rows or limit <= 0:
+        return []
+
+    scores = np.asarray(matrix.vectors @ query_vector)
+    ids = matrix.ids
+
+    ranked: List[int] = []  # Matrix rows that passed the filters, best first
+    checked = 0
+    wanted = min(rows, limit * OVERFETCH)
+    while len(ranked) < limit and checked < rows:
+        if wanted > MAX_CANDIDATES:
+            # Too selective to find by widening: filter the whole table once, rank within it
+            allowed = np.fromiter((article_id for (article_id,) in filter_query(session, filters)), dtype=np.int64)
+            masked = np.where(np.isin(ids, allowed), scores, -np.inf)
+            ranked = [int(row) for row in top_rows(masked, limit) if masked[row] > -np.inf]
+            break
+        # Earlier rounds checked a prefix of this ordering
+        candidates = top_rows(scores, wanted)[checked:]
+        passing = passing_ids(session, (int(article_id) for article_id in ids[candidates]), filters)
+        ranked.extend(int(row) for row in candidates if int(ids[row]) in passing)
+        checked = wanted
+        wanted = min(rows, wanted * OVERFETCH)
+
+    ranked = ranked[:limit]
+    articles = {
+        article.id: article
+        for article in session.query(Article).options(selectinload(Article.source)).filter(
+            Article.id.in_([int(ids[row]) for row in ranked])
+        )
+    }
+    hits = []
+    for row in ranked:
+        article = articles.get(int(ids[row]))
+        if article is None:
+            continue  # Deleted since the matrix was written
+        snippet = (article.content or '')[:SNIPPET_CHARS]
+        hits.append(SearchHit(article, snippet, float(scores[row])))
+    return hits
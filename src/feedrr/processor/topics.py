@@ -1,19 +1,43 @@
 """Simple topic tagging using keyword similarity."""
 
-from typing import List, Dict
-from sentence_transformers import SentenceTransformer
+import hashlib
+import json
+import threading
+from typing import List, Dict, Optional, Tuple, TYPE_CHECKING
 import numpy as np
 
+from .cache import EmbeddingCache, encode_with_cache, encode_batch_with_cache
 
-# Global model instance (lazy loaded)
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+# Model used for topic tagging and deduplication embeddings
+MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+# Defaults for topic matching (overridable under `tagging:` in config.yaml)
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_TOP_K = 2
+FALLBACK_TOPIC = 'general'
+
+# Global model instance (lazy loaded; the pipelined build loads it from a worker thread)
 _model = None
+_model_lock = threading.Lock()
 
+# Topic matrices keyed by a hash of the topic definitions
+_topic_matrices: Dict[str, Tuple[List[str], np.ndarray]] = {}
 
-def get_model() -> SentenceTransformer:
+
+def get_model() -> "SentenceTransformer":
     """Get or load the sentence transformer model."""
     global _model
     if _model is None:
-        _model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        with _model_lock:
+            if _model is None:
+                # Imported here so torch is only loaded when a model is actually needed
+                from sentence_transformers import SentenceTransformer
+
+                _model = SentenceTransformer(MODEL_NAME)
     return _model
 
 
@@ -22,13 +46,18 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
 
-def assign_topics(article_text: str, topic_definitions: List[Dict]) -> List[str]:
+def assign_topics(
+    article_text: str,
+    topic_definitions: List[Dict],
+    cache: Optional[EmbeddingCache] = None
+) -> List[str]:
     """
     Assign topics to an article based on keyword similarity.
 
     Args:
         article_text: Article title + content
         topic_definitions: List of dicts with 'name', 'slug', 'keywords'
+        cache: Optional embedding cache checked before running the model
 
     Returns:
         List of topic slugs that match
@@ -39,7 +68,7 @@ def assign_topics(article_text: str, topic_definitions: List[Dict]) -> List[str]
     model = get_model()
 
     # Generate embedding for article
-    article_embedding = model.encode(article_text)
+    article_embedding = encode_with_cache(model, article_text, cache)
 
     # Calculate similarity for each topic
     matches = []
@@ -50,7 +79,7 @@ def assign_topics(article_text: str, topic_definitions: List[Dict]) -> List[str]
             continue
 
         # Generate embedding for keywords
-        keywords_embedding = model.encode(keywords_text)
+        keywords_embedding = encode_with_cache(model, keywords_text, cache)
 
         # Calculate similarity
         similarity = cosine_similarity(article_embedding, keywords_embedding)
@@ -67,3 +96,147 @@ def assign_topics(article_text: str, topic_definitions: List[Dict]) -> List[str]
         return [slug for slug, _ in matches[:2]]
     else:
         return ['general']
+
+
+def topic_definition_hash(topic: Dict) -> str:
+    """Stable hash of the parts of a topic definition that affect scoring."""
+    payload = json.dumps(
+        {
+            'slug': topic['slug'],
+            'keywords': topic.get('keywords', []),
+            'threshold': topic.get('threshold'),
+            'top_k': topic.get('top_k'),
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_topic_matrix(
+    topic_definitions: List[Dict],
+    model: Optional["SentenceTransformer"] = None,
+    cache: Optional[EmbeddingCache] = None
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Get the (T x D) matrix of normalized topic keyword embeddings.
+
+    Topics without keywords are skipped. The matrix is cached in-process per
+    set of definitions, and keyword texts go through the embedding cache, so
+    only edited topics are ever re-encoded.
+
+    Returns:
+        Tuple of (topic slugs, matrix) with rows aligned to slugs
+    """
+    topics = [topic for topic in topic_definitions if topic.get('keywords')]
+    key = hashlib.sha256(
+        ''.join(topic_definition_hash(topic) for topic in topics).encode('utf-8')
+    ).hexdigest()
+    if key in _topic_matrices:
+        return _topic_matrices[key]
+
+    if model is None:
+        model = get_model()
+
+    slugs = [topic['slug'] for topic in topics]
+    texts = [' '.join(topic['keywords']) for topic in topics]
+    matrix = encode_batch_with_cache(model, texts, cache)
+    if len(slugs):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+
+    _topic_matrices[key] = (slugs, matrix)
+    return slugs, matrix
+
+
+def get_topic_thresholds(
+    topic_definitions: List[Dict],
+    slugs: List[str],
+    default_threshold: float = DEFAULT_THRESHOLD
+) -> np.ndarray:
+    """Per-topic thresholds aligned with slugs (topic `threshold` or the default)."""
+    by_slug = {topic['slug']: topic.get('threshold') for topic in topic_definitions}
+    return np.array(
+        [by_slug.get(slug) if by_slug.get(slug) is not None else default_threshold for slug in slugs],
+        dtype=np.float32
+    )
+
+
+def score_topics_batch(
+    article_matrix: np.ndarray,
+    topic_matrix: np.ndarray,
+    slugs: List[str],
+    thresholds: np.ndarray,
+    top_k: int = DEFAULT_TOP_K
+) -> List[List[Tuple[str, float]]]:
+    """
+    Score every article against every topic in one matrix product.
+
+    Args:
+        article_matrix: (N x D) article embeddings (normalized or not)
+        topic_matrix: (T x D) normalized topic embeddings
+        slugs: Topic slugs aligned with topic_matrix rows
+        thresholds: (T,) minimum similarity per topic (strictly greater)
+        top_k: Maximum topics per article
+
+    Returns:
+        For each article, matching (slug, score) pairs, best first
+    """
+    article_matrix = np.atleast_2d(np.asarray(article_matrix, dtype=np.float32))
+    if not len(slugs) or not len(article_matrix):
+        return [[] for _ in range(len(article_matrix))]
+
+    norms = np.linalg.norm(article_matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    scores = (article_matrix / norms) @ topic_matrix.T
+    # Apply thresholds before the top-k cut, so a topic below its own
+    # threshold cannot crowd out one that passes
+    scores[scores <= thresholds] = -np.inf
+
+    k = min(top_k, len(slugs))
+    if k < len(slugs):
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.tile(np.arange(len(slugs)), (len(scores), 1))
+
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    passed = np.isfinite(top_scores)
+
+    results = []
+    for row_topics, row_scores, row_passed in zip(top, top_scores, passed):
+        results.append([
+            (slugs[t], float(score))
+            for t, score, ok in zip(row_topics, row_scores, row_passed) if ok
+        ])
+    return results
+
+
+def assign_topics_batch(
+    article_embeddings: np.ndarray,
+    topic_definitions: List[Dict],
+    cache: Optional[EmbeddingCache] = None,
+    default_threshold: float = DEFAULT_THRESHOLD,
+    top_k: int = DEFAULT_TOP_K
+) -> List[List[Tuple[str, Optional[float]]]]:
+    """
+    Assign topics to many articles from their embeddings.
+
+    Args:
+        article_embeddings: (N x D) article embeddings
+        topic_definitions: List of dicts with 'name', 'slug', 'keywords' and
+            an optional per-topic 'threshold'
+        cache: Optional embedding cache for topic keyword texts
+        default_threshold: Threshold for topics without their own
+        top_k: Maximum topics per article
+
+    Returns:
+        For each article, (slug, score) pairs best first; articles with no
+        match get [('general', None)]
+    """
+    slugs, topic_matrix = get_topic_matrix(topic_definitions, cache=cache)
+    thresholds = get_topic_thresholds(topic_definitions, slugs, default_threshold)
+    results = score_topics_batch(article_embeddings, topic_matrix, slugs, thresholds, top_k)
+    return [matches or [(FALLBACK_TOPIC, None)] for matches in results]
@@ -0,0 +1,291 @@
+"""Warm-start snapshots of derived state for fresh machines (CI runners).
+
+The database and host state are committed with the site, but everything
+derived from them is rebuilt on a clean runner: the sentence-transformers
+model is downloaded again, every topic keyword and article is looked up in an
+empty embedding cache, and the memory-mapped embedding matrix is re-read
+from SQLite. A snapshot packs that state into one tar file that CI can cache
+between runs:
+
+- ``manifest.json``: snapshot version, feedrr version, model id, matrix
+  format version and a SHA-256 per file
+- ``data/embedding_cache.db``: the embedding cache (consistent copy)
+- ``data/embeddings.*``: the embedding matrix mirror
+- ``model/models--…``: the model's Hugging Face cache folder, when present
+
+``import_snapshot`` refuses snapshots of another layout version or model,
+skips a matrix written in another matrix format (it is rebuilt from the
+database as usual), verifies every checksum before moving anything into
+place, and leaves existing files alone unless asked to overwrite them.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional
+
+from . import __version__
+from .processor.matrix import FORMAT_VERSION as MATRIX_FORMAT_VERSION
+from .processor.topics import MODEL_NAME
+
+
+# Bump when the archive layout changes
+SNAPSHOT_VERSION = 1
+
+CACHE_FILE = "embedding_cache.db"
+MATRIX_FILES = ("embeddings.f32", "embeddings.ids", "embeddings.json")
+
+# tarfile extraction filters arrived in Python 3.11.4; older versions check members by hand
+HAS_DATA_FILTER = hasattr(tarfile, 'data_filter')
+
+
+class SnapshotError(ValueError):
+    """The snapshot is unreadable or does not fit this installation."""
+
+
+def model_cache_dir() -> Optional[Path]:
+    """Hugging Face hub cache directory, or None if huggingface_hub is not installed."""
+    try:
+        from huggingface_hub import constants
+    except ImportError:
+        return None
+    return Path(constants.HF_HUB_CACHE)
+
+
+def model_folder_name(model_id: str = MODEL_NAME) -> str:
+    """Folder of a model inside the hub cache (``models--org--name``)."""
+    return "models--" + model_id.replace('/', '--')
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_snapshot(output: Path, data_dir: Path, model_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Write a snapshot of data_dir's derived state (and the cached model) to output.
+
+    Args:
+        output: Tar file to write (replaced atomically)
+        data_dir: Data directory holding the embedding cache and matrix
+        model_dir: Hub cache directory (default: model_cache_dir())
+
+    Returns:
+        The manifest written into the archive
+    """
+    output = Path(output)
+    data_dir = Path(data_dir)
+    model_dir = model_dir if model_dir is not None else model_cache_dir()
+
+    with tempfile.TemporaryDirectory() as staging:
+        members: Dict[str, Path] = {}
+
+        # The cache may be open elsewhere; the backup API copies a consistent state
+        cache_path = data_dir / CACHE_FILE
+        if cache_path.exists():
+            copy_path = Path(staging) / CACHE_FILE
+            source = sqlite3.connect(str(cache_path))
+            target = sqlite3.connect(str(copy_path))
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            members[f"data/{CACHE_FILE}"] = copy_path
+
+        for name in MATRIX_FILES:
+            if (data_dir / name).exists():
+                members[f"data/{name}"] = data_dir / name
+
+        model_path = model_dir / model_folder_name() if model_dir is not None else None
+        links: List[Path] = []
+        if model_path is not None and model_path.is_dir():
+            for path in sorted(model_path.rglob('*')):
+                arcname = f"model/{path.relative_to(model_dir).as_posix()}"
+                if path.is_symlink():
+                    links.append(path)  # Hub snapshots link into blobs/
+                elif path.is_file():
+                    members[arcname] = path
+
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'feedrr': __version__,
+            'model': MODEL_NAME,
+            'matrix_format': MATRIX_FORMAT_VERSION,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'files': {
+                arcname: {'size': path.stat().st_size, 'sha256': _sha256(path)}
+                for arcname, path in members.items()
+            },
+        }
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp_output = output.with_name(output.name + '.tmp')
+        with tarfile.open(tmp_output, 'w') as archive:
+            data = json.dumps(manifest, indent=2).encode('utf-8')
+            info = tarfile.TarInfo('manifest.json')
+            info.size = len(data)
+            info.mtime = int(datetime.now(timezone.utc).timestamp())
+            archive.addfile(info, io.BytesIO(data))
+            for arcname, path in members.items():
+                archive.add(path, arcname=arcname, recursive=False)
+            for path in links:
+                archive.add(path, arcname=f"model/{path.relative_to(model_dir).as_posix()}", recursive=False)
+        os.replace(tmp_output, output)
+
+    return manifest
+
+
+def check_member(member: tarfile.TarInfo) -> None:
+    """
+    Refuse a member that would land outside the extraction directory.
+
+    Used where tarfile has no ``data`` filter: absolute paths, ``..``
+    components, links pointing out of the archive and special files are
+    rejected.
+
+    Raises:
+        SnapshotError: If the member is unsafe to extract
+    """
+    name = PurePosixPath(member.name)
+    if name.is_absolute() or '..' in name.parts:
+        raise SnapshotError(f"unsafe path in snapshot: {member.name}")
+    if member.issym() or member.islnk():
+        link = PurePosixPath(member.linkname)
+        # Symlinks are relative to their folder, hard links to the archive root
+        target = (name.parent / link) if member.issym() else link
+        depth = 0
+        for part in target.parts:
+            depth += -1 if part == '..' else part not in ('.', '/')
+            if link.is_absolute() or depth < 0:
+                raise SnapshotError(f"link escapes snapshot: {member.name} -> {member.linkname}")
+    elif not (member.isfile() or member.isdir()):
+        raise SnapshotError(f"unsupported file type in snapshot: {member.name}")
+
+
+def read_manifest(archive: tarfile.TarFile) -> Dict[str, Any]:
+    """Manifest of an open snapshot archive."""
+    try:
+        member = archive.getmember('manifest.json')
+        return json.loads(archive.extractfile(member).read())
+    except (KeyError, AttributeError, ValueError) as e:
+        raise SnapshotError(f"not a feedrr snapshot (no readable manifest): {e}")
+
+
+def check_manifest(manifest: Dict[str, Any]) -> None:
+    """Raise SnapshotError unless the snapshot fits this feedrr and model."""
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"snapshot version {manifest.get('version')} is not supported (expected {SNAPSHOT_VERSION})"
+        )
+    if manifest.get('model') != MODEL_NAME:
+        raise SnapshotError(f"snapshot was built for model {manifest.get('model')!r}, not {MODEL_NAME!r}")
+
+
+def import_snapshot(
+    archive_path: Path,
+    data_dir: Path,
+    model_dir: Optional[Path] = None,
+    overwrite: bool = False
+) -> Dict[str, List[str]]:
+    """
+    Restore a snapshot written by export_snapshot.
+
+    Args:
+        archive_path: Snapshot tar file
+        data_dir: Data directory to restore the cache and matrix into
+        model_dir: Hub cache directory (default: model_cache_dir())
+        overwrite: Replace files that already exist
+
+    Returns:
+        {'restored': [...], 'skipped': [...]} archive names (the model counts
+        as one entry, ``model``)
+
+    Raises:
+        SnapshotError: The archive is not a snapshot, does not fit this
+            installation or fails its checksums
+    """
+    data_dir = Path(data_dir)
+    model_dir = model_dir if model_dir is not None else model_cache_dir()
+    restored: List[str] = []
+    skipped: List[str] = []
+
+    try:
+        archive = tarfile.open(archive_path, 'r:')
+    except tarfile.TarError:
+        raise SnapshotError(f"cannot read {archive_path}: not a tar archive")
+    except OSError as e:
+        raise SnapshotError(f"cannot read {archive_path}: {e}")
+
+    with archive, tempfile.TemporaryDirectory() as staging:
+        manifest = read_manifest(archive)
+        check_manifest(manifest)
+        files = manifest.get('files', {})
+
+        matrix_ok = manifest.get('matrix_format') == MATRIX_FORMAT_VERSION
+        wanted = []
+        for member in archive.getmembers():
+            name = member.name
+            if name.startswith('model/'):
+                if model_dir is not None:
+                    wanted.append(member)
+            elif name in files:
+                if name.startswith('data/embeddings.') and not matrix_ok:
+                    skipped.append(name)  # Rebuilt from the database by EmbeddingMatrix.sync
+                else:
+                    wanted.append(member)
+            elif name != 'manifest.json':
+                raise SnapshotError(f"unexpected file in snapshot: {name}")
+
+        try:
+            if HAS_DATA_FILTER:
+                archive.extractall(staging, members=wanted, filter='data')
+            else:
+                for member in wanted:
+                    check_member(member)
+                archive.extractall(staging, members=wanted)
+        except (OSError, tarfile.TarError) as e:
+            raise SnapshotError(f"cannot extract snapshot: {e}")
+
+        staged = Path(staging)
+        for name, expected in files.items():
+            path = staged / name
+            if path.exists() and _sha256(path) != expected['sha256']:
+                raise SnapshotError(f"checksum mismatch for {name}")
+
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            path = staged / name
+            if not name.startswith('data/') or not path.exists():
+                continue
+            target = data_dir / Path(name).name
+            if target.exists() and not overwrite:
+                skipped.append(name)
+                continue
+            shutil.move(str(path), str(target))
+            restored.append(name)
+
+        model_path = staged / 'model' / model_folder_name()
+        if model_dir is not None and model_path.is_dir():
+            target = model_dir / model_folder_name()
+            if target.exists() and not overwrite:
+                skipped.append('model')
+            else:
+                if target.exists():
+                    shutil.rmtree(target)
+                model_dir.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(model_path), str(target))
+                restored.append('model')
+
+    return {'restored': restored, 'skipped': skipped}
@@ -1,11 +1,17 @@
 """Simple database operations for MVP."""
 
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from .models import Source, Article, Topic, ArticleTopic, get_session
+from .signatures import canonicalize_url, compute_simhash, SignatureIndex
+
+
+# URLs per IN (...) lookup; each batch is bound twice, under SQLite's 999-variable limit
+URL_BATCH_SIZE = 400
 
 
 def load_sources_from_config(session: Session, sources_config: List[dict]) -> None:
@@ -38,27 +44,101 @@ def get_enabled_sources(session: Session) -> List[Source]:
     return session.query(Source).filter_by(enabled=True).all()
 
 
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored datetimes are naive UTC; the fetcher returns aware UTC."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def get_due_sources(session: Session, now: Optional[datetime] = None) -> List[Source]:
+    """Get enabled sources whose next fetch is due at or before now (never-fetched sources included)."""
+    now = now or datetime.utcnow()
+    return session.query(Source).filter(
+        Source.enabled == True,
+        or_(Source.next_due_at == None, Source.next_due_at <= now)
+    ).all()
+
+
+def get_recent_urls(session: Session, sources: List[Source], limit: int = 500) -> Dict[int, Set[str]]:
+    """
+    Raw and canonical URLs of each source's most recent articles, in one query.
+
+    Args:
+        session: Database session
+        sources: Sources to load URLs for
+        limit: Articles per source
+
+    Returns:
+        Source id -> set of URLs (every requested source has an entry)
+    """
+    known: Dict[int, Set[str]] = {source.id: set() for source in sources}
+    if not known:
+        return known
+    ranked = session.query(
+        Article.source_id,
+        Article.url,
+        Article.canonical_url,
+        func.row_number().over(partition_by=Article.source_id, order_by=Article.id.desc()).label('recency')
+    ).filter(Article.source_id.in_(list(known))).subquery()
+    rows = session.query(ranked.c.source_id, ranked.c.url, ranked.c.canonical_url).filter(ranked.c.recency <= limit)
+    for source_id, url, canonical_url in rows:
+        known[source_id].add(url)
+        if canonical_url:
+            known[source_id].add(canonical_url)
+    return known
+
+
+def _stored_urls(session: Session, urls: Set[str]) -> Set[str]:
+    """Which of the given URLs are stored, as a raw or canonical URL (batched IN queries)."""
+    found: Set[str] = set()
+    pending = list(urls)
+    for start in range(0, len(pending), URL_BATCH_SIZE):
+        batch = pending[start:start + URL_BATCH_SIZE]
+        rows = session.query(Article.url, Article.canonical_url).filter(
+            or_(Article.url.in_(batch), Article.canonical_url.in_(batch))
+        )
+        for url, canonical_url in rows:
+            found.add(url)
+            if canonical_url:
+                found.add(canonical_url)
+    return found
+
+
 def save_articles(session: Session, source: Source, articles_data: List[dict]) -> int:
     """
     Save articles to database.
 
+    Articles are matched on both the raw and the canonical URL, so tracking
+    parameters, http/https and AMP variants of a stored article are skipped.
+    Existing URLs are looked up in batches rather than per entry.
+
     Returns number of new articles saved (duplicates skipped).
     """
     saved_count = 0
+    candidates = [(article_data, canonicalize_url(article_data['url'])) for article_data in articles_data]
 
-    for article_data in articles_data:
-        # Check if article already exists (by URL)
-        existing = session.query(Article).filter_by(url=article_data['url']).first()
-        if existing:
-            continue  # Skip duplicates
+    # Check every URL against the database at once instead of one query per entry
+    seen_urls = _stored_urls(session, {url for data, canonical in candidates for url in (data['url'], canonical)})
+
+    for article_data, canonical_url in candidates:
+        url = article_data['url']
+
+        # Skip stored articles and repeats within this batch
+        if url in seen_urls or canonical_url in seen_urls:
+            continue
+
+        seen_urls.update((url, canonical_url))
 
         # Create new article
         article = Article(
-            url=article_data['url'],
+            url=url,
+            canonical_url=canonical_url,
             title=article_data['title'],
             content=article_data.get('content'),
             image_url=article_data.get('image_url'),
-            published_date=article_data.get('published_date'),
+            published_date=_naive_utc(article_data.get('published_date')),
+            simhash=compute_simhash(article_data['title'], article_data.get('content')),
             source_id=source.id
         )
         session.add(article)
@@ -107,16 +187,118 @@ def load_topics_from_config(session: Session, topics_config: List[dict]) -> None
 
 
 def get_articles_without_topics(session: Session) -> List[Article]:
-    """Get articles that haven't been tagged yet."""
+    """Get articles that haven't been tagged yet, oldest first."""
     # Get articles that have no topic assignments
     articles = session.query(Article).outerjoin(ArticleTopic).filter(
         ArticleTopic.id == None
-    ).all()
+    ).order_by(Article.id).all()
     return articles
 
 
-def assign_topic_to_article(session: Session, article: Article, topic_slug: str) -> None:
-    """Assign a topic to an article."""
+def backfill_signatures(session: Session) -> int:
+    """
+    Compute canonical URLs and SimHash signatures for rows saved before they existed.
+
+    Returns number of articles updated.
+    """
+    articles = session.query(Article).filter(Article.canonical_url == None).all()
+
+    for article in articles:
+        article.canonical_url = canonicalize_url(article.url)
+        article.simhash = compute_simhash(article.title, article.content)
+
+    session.commit()
+    return len(articles)
+
+
+def load_signature_index(session: Session, index: Optional[SignatureIndex] = None) -> SignatureIndex:
+    """
+    Build a SimHash index over all non-duplicate articles in one query.
+
+    Args:
+        session: Database session
+        index: Existing index to extend with articles saved since it was
+            built (ids above index.last_id) instead of starting over
+
+    Returns:
+        The new or extended index
+    """
+    if index is None:
+        index = SignatureIndex()
+    rows = session.query(Article.id, Article.simhash).filter(
+        Article.id > index.last_id,
+        Article.simhash != None,
+        Article.is_duplicate == False
+    ).order_by(Article.id)
+    for article_id, signature in rows:
+        index.add(article_id, signature)
+    return index
+
+
+def find_signature_duplicate(
+    session: Session,
+    index: SignatureIndex,
+    article: Article,
+    max_distance: int = 3
+) -> Optional[Article]:
+    """
+    Find an earlier article whose SimHash is within max_distance bits.
+
+    Matches that are themselves duplicates resolve to their original.
+
+    Returns:
+        Original article, or None if the article has no signature or no match
+    """
+    if article.simhash is None:
+        return None
+
+    original_id = index.find(article.simhash, max_distance, before_id=article.id)
+    if original_id is None:
+        return None
+
+    original = session.get(Article, original_id)
+    if original is not None and original.is_duplicate and original.duplicate_of is not None:
+        original = original.duplicate_of
+    return original
+
+
+def copy_article_topics(session: Session, source_article: Article, target_article: Article) -> int:
+    """
+    Copy topic assignments from one article to another.
+
+    Used when a duplicate is resolved without running the model.
+
+    Returns number of topics copied.
+    """
+    rows = list(source_article.topics)
+    for row in rows:
+        session.add(ArticleTopic(
+            article_id=target_article.id,
+            topic_id=row.topic_id,
+            score=row.score,
+            rank=row.rank
+        ))
+    session.commit()
+    return len(rows)
+
+
+def assign_topic_to_article(
+    session: Session,
+    article: Article,
+    topic_slug: str,
+    score: Optional[float] = None,
+    rank: Optional[int] = None
+) -> None:
+    """
+    Assign a topic to an article.
+
+    Args:
+        session: Database session
+        article: Article to tag
+        topic_slug: Topic slug ('general' is created on demand)
+        score: Similarity between article and topic, if known
+        rank: Position among the article's topics (1 = best match)
+    """
     # Get topic by slug
     topic = session.query(Topic).filter_by(slug=topic_slug).first()
     if not topic:
@@ -137,7 +319,43 @@ def assign_topic_to_article(session: Session, article: Article, topic_slug: str)
     if not existing:
         article_topic = ArticleTopic(
             article_id=article.id,
-            topic_id=topic.id
+            topic_id=topic.id,
+            score=score,
+            rank=rank
         )
         session.add(article_topic)
         session.commit()
+    elif score is not None:
+        existing.score = score
+        existing.rank = rank
+        session.commit()
+
+
+def get_top_articles_for_topic(
+    session: Session,
+    topic_slug: str,
+    limit: int = 20,
+    min_score: Optional[float] = None
+) -> List[Article]:
+    """
+    Get the best-matching non-duplicate articles for a topic.
+
+    Served by the (topic_id, score DESC) index, so no embeddings are loaded
+    and no other tagged articles are scanned.
+
+    Args:
+        session: Database session
+        topic_slug: Topic slug
+        limit: Maximum number of articles
+        min_score: Only include assignments scoring at least this much
+
+    Returns:
+        Articles ordered by score, best first
+    """
+    query = session.query(Article).join(ArticleTopic).join(Topic).filter(
+        Topic.slug == topic_slug,
+        Article.is_duplicate == False
+    )
+    if min_score is not None:
+        query = query.filter(ArticleTopic.score >= min_score)
+    return query.order_by(ArticleTopic.score.desc().nullslast(), Article.id).limit(limit).all()
@@ -1,7 +1,10 @@
 """Simple database models for feedrr MVP."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, LargeBinary, create_engine
+from typing import Dict
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, Boolean, ForeignKey, Index, LargeBinary, create_engine, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import relationship, declarative_base, Session
 
 Base = declarative_base()
@@ -21,6 +24,11 @@ class Source(Base):
     last_fetched = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Adaptive fetch frequency (see fetcher.frequency)
+    post_interval = Column(Float)  # Smoothed seconds between entries
+    last_new_item_at = Column(DateTime)  # Last fetch that found new articles
+    next_due_at = Column(DateTime, index=True)  # NULL = due now
+
     # Relationship
     articles = relationship("Article", back_populates="source")
 
@@ -35,6 +43,7 @@ class Article(Base):
 
     id = Column(Integer, primary_key=True)
     url = Column(String(1000), unique=True, nullable=False)
+    canonical_url = Column(String(1000), index=True)  # Normalized URL for uniqueness checks
     title = Column(String(500), nullable=False)
     content = Column(Text)
     image_url = Column(String(1000))
@@ -43,19 +52,40 @@ class Article(Base):
     source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
 
     # Deduplication fields
+    simhash = Column(Integer, index=True)  # 64-bit SimHash of normalized title + content
     embedding = Column(LargeBinary)  # Serialized numpy array
     is_duplicate = Column(Boolean, default=False)
     duplicate_of_id = Column(Integer, ForeignKey("articles.id"), nullable=True)
+    cluster_id = Column(Integer, ForeignKey("story_clusters.id"), nullable=True, index=True)
 
     # Relationships
     source = relationship("Source", back_populates="articles")
     topics = relationship("ArticleTopic", back_populates="article")
     duplicate_of = relationship("Article", remote_side=[id], backref="duplicates")
+    cluster = relationship("StoryCluster", back_populates="articles")
 
     def __repr__(self) -> str:
         return f"<Article(title='{self.title[:50]}...')>"
 
 
+class StoryCluster(Base):
+    """Group of articles covering the same story."""
+
+    __tablename__ = "story_clusters"
+
+    id = Column(Integer, primary_key=True)
+    canonical_article_id = Column(Integer)  # Representative article shown on the site
+    size = Column(Integer, default=1)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationship
+    articles = relationship("Article", back_populates="cluster")
+
+    def __repr__(self) -> str:
+        return f"<StoryCluster(id={self.id}, size={self.size})>"
+
+
 class Topic(Base):
     """Topic/category for articles."""
 
@@ -64,6 +94,7 @@ class Topic(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String(100), unique=True, nullable=False)
     slug = Column(String(100), unique=True, nullable=False)
+    definition_hash = Column(String(64))  # Hash of the config definition articles were tagged with
 
     # Relationship
     articles = relationship("ArticleTopic", back_populates="topic")
@@ -80,22 +111,122 @@ class ArticleTopic(Base):
     id = Column(Integer, primary_key=True)
     article_id = Column(Integer, ForeignKey("articles.id"), nullable=False)
     topic_id = Column(Integer, ForeignKey("topics.id"), nullable=False)
+    score = Column(Float)  # Cosine similarity to the topic (NULL for the 'general' fallback)
+    rank = Column(Integer)  # 1 = the article's best-matching topic
 
     # Relationships
     article = relationship("Article", back_populates="topics")
     topic = relationship("Topic", back_populates="articles")
 
     def __repr__(self) -> str:
-        return f"<ArticleTopic(article_id={self.article_id}, topic_id={self.topic_id})>"
+        return f"<ArticleTopic(article_id={self.article_id}, topic_id={self.topic_id}, score={self.score})>"
+
+
+# "Top articles for topic X" and score-filtered topic pages are index range scans
+Index("ix_article_topics_topic_score", ArticleTopic.topic_id, ArticleTopic.score.desc())
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """
+    Bring an existing database up to the current schema.
+
+    Creates missing tables, adds missing (nullable) columns with
+    ALTER TABLE and creates missing indexes. Databases created by older
+    versions keep working without a separate migration step.
+    """
+    Base.metadata.create_all(engine)
+
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(engine.dialect)
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                ))
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    create_search_index(engine)
+
+
+# Full-text index over article titles and text. External content: FTS5 reads
+# the text from `articles` instead of keeping a second copy, and the triggers
+# keep it in step with every insert, update (including compaction) and delete.
+SEARCH_TABLE = "articles_fts"
+
+_SEARCH_TRIGGERS = {
+    "articles_fts_insert": (
+        "AFTER INSERT ON articles BEGIN "
+        "INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END"
+    ),
+    "articles_fts_delete": (
+        "AFTER DELETE ON articles BEGIN "
+        "INSERT INTO articles_fts(articles_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); END"
+    ),
+    "articles_fts_update": (
+        "AFTER UPDATE OF title, content ON articles BEGIN "
+        "INSERT INTO articles_fts(articles_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); "
+        "INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END"
+    ),
+}
+
+
+def create_search_index(engine: Engine) -> bool:
+    """
+    Create the FTS5 article index and its triggers if missing.
+
+    A newly created index is filled from the existing articles once.
+
+    Returns:
+        False if this SQLite build has no FTS5 (search is then unavailable)
+    """
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': SEARCH_TABLE}
+        ).first()
+        if not exists:
+            try:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(title, content, "
+                    "content='articles', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')"
+                ))
+            except OperationalError:
+                return False
+            conn.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
+        for name, body in _SEARCH_TRIGGERS.items():
+            conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+    return True
 
 
 def create_database(db_path: str) -> None:
     """Create database tables."""
     engine = create_engine(f"sqlite:///{db_path}")
-    Base.metadata.create_all(engine)
+    upgrade_schema(engine)
+
+
+# Engines by database path, so a long-running process connects and upgrades once
+_engines: Dict[str, Engine] = {}
+
+
+def get_engine(db_path: str) -> Engine:
+    """Engine for a database, created (and its schema upgraded) on first use."""
+    engine = _engines.get(db_path)
+    if engine is None:
+        engine = create_engine(f"sqlite:///{db_path}")
+        upgrade_schema(engine)
+        _engines[db_path] = engine
+    return engine
 
 
 def get_session(db_path: str) -> Session:
     """Get database session."""
-    engine = create_engine(f"sqlite:///{db_path}")
-    return Session(engine)
+    return Session(get_engine(db_path))
@@ -0,0 +1,166 @@
+"""Retention for the article store: archive cold content, then compact the database.
+
+Every article keeps its full text and a pickled embedding forever, although
+the site only ever shows the newest few hundred and dedup only needs recent
+vectors. ``feedrr compact`` moves the bulky columns of cold articles out of
+the hot database:
+
+- cold = older than the retention window (published date, else fetch date)
+  and not among the ``keep`` newest articles, so the site never loses content
+- each cold article is appended to ``data/archive/articles-YYYY-MM.jsonl.gz``
+  (one JSON object per line, by month of its date) with its text, source
+  and topics
+- ``content`` and ``embedding`` are then cleared; url, title, SimHash, topics
+  and cluster stay, so known-URL checks, the prefilter and story clusters
+  keep working
+
+The archive is written and closed before the database is touched. A run
+interrupted between the two steps archives the same articles again next
+time; readers should treat ``id`` as the key.
+"""
+
+import gzip
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload
+
+from .models import Article, ArticleTopic
+
+
+# Days an article keeps its content and embedding in the hot database
+DEFAULT_RETENTION_DAYS = 90
+
+# Newest articles never archived, whatever their age (the site's default size)
+DEFAULT_KEEP = 500
+
+# Articles loaded (and cleared) per query
+BATCH_SIZE = 500
+
+
+@dataclass
+class ArchiveResult:
+    """Articles moved to the archive and the files they went to."""
+
+    articles: int = 0
+    files: List[Path] = field(default_factory=list)
+
+
+def _article_date(article: Article) -> datetime:
+    return article.published_date or article.fetched_date
+
+
+def cold_article_ids(session: Session, cutoff: datetime, keep: int = DEFAULT_KEEP) -> List[int]:
+    """
+    Ids of articles dated before cutoff that still hold content or an embedding.
+
+    The keep newest articles (in site order) are never returned.
+    """
+    newest = session.query(Article.id).order_by(
+        Article.published_date.desc().nullslast(),
+        Article.fetched_date.desc()
+    ).limit(keep)
+    query = session.query(Article.id).filter(
+        func.coalesce(Article.published_date, Article.fetched_date) < cutoff,
+        or_(Article.content != None, Article.embedding != None),
+    )
+    if keep > 0:
+        query = query.filter(~Article.id.in_(newest.scalar_subquery()))
+    return [article_id for (article_id,) in query.order_by(Article.id)]
+
+
+def archive_record(article: Article) -> Dict[str, Any]:
+    """JSON-serializable archive entry for an article."""
+    return {
+        'id': article.id,
+        'url': article.url,
+        'title': article.title,
+        'content': article.content,
+        'image_url': article.image_url,
+        'published_date': article.published_date.isoformat() if article.published_date else None,
+        'fetched_date': article.fetched_date.isoformat() if article.fetched_date else None,
+        'source': article.source.name if article.source else None,
+        'cluster_id': article.cluster_id,
+        'is_duplicate': bool(article.is_duplicate),
+        'topics': [link.topic.slug for link in article.topics],
+    }
+
+
+def archive_articles(
+    session: Session,
+    archive_dir: Path,
+    days: int = DEFAULT_RETENTION_DAYS,
+    keep: int = DEFAULT_KEEP,
+    now: Optional[datetime] = None,
+    dry_run: bool = False
+) -> ArchiveResult:
+    """
+    Append cold articles to the monthly archive files and clear their content and embedding.
+
+    Args:
+        session: Database session
+        archive_dir: Directory for the ``articles-YYYY-MM.jsonl.gz`` files
+        days: Retention window; older articles are cold
+        keep: Newest articles kept whatever their age
+        now: Reference time (default: utcnow)
+        dry_run: Only count the cold articles
+
+    Returns:
+        Number of archived articles and the files written to
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    ids = cold_article_ids(session, cutoff, keep)
+    result = ArchiveResult(articles=len(ids))
+    if dry_run or not ids:
+        return result
+
+    # Write (and close) every archive file before clearing anything
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    files: Dict[str, IO[str]] = {}
+    try:
+        for start in range(0, len(ids), BATCH_SIZE):
+            chunk = ids[start:start + BATCH_SIZE]
+            articles = session.query(Article).options(
+                selectinload(Article.source),
+                selectinload(Article.topics).selectinload(ArticleTopic.topic),
+            ).filter(Article.id.in_(chunk)).order_by(Article.id)
+            for article in articles:
+                name = f"articles-{_article_date(article):%Y-%m}.jsonl.gz"
+                if name not in files:
+                    # Appending adds a gzip member; readers see one continuous stream
+                    files[name] = gzip.open(archive_dir / name, 'at', encoding='utf-8')
+                files[name].write(json.dumps(archive_record(article), ensure_ascii=False) + "\n")
+    finally:
+        for f in files.values():
+            f.close()
+    result.files = sorted(archive_dir / name for name in files)
+
+    for start in range(0, len(ids), BATCH_SIZE):
+        session.query(Article).filter(Article.id.in_(ids[start:start + BATCH_SIZE])).update(
+            {Article.content: None, Article.embedding: None}, synchronize_session=False
+        )
+    session.commit()
+    return result
+
+
+def iter_archive(archive_dir: Path) -> Iterator[Dict[str, Any]]:
+    """Archived article records, oldest month first."""
+    for path in sorted(Path(archive_dir).glob("articles-*.jsonl.gz")):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def vacuum(engine: Engine) -> None:
+    """Rewrite the database file without free pages, then refresh planner statistics."""
+    # VACUUM cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+        conn.exec_driver_sql("ANALYZE")
@@ -0,0 +1,92 @@
+"""Full-text article search over the FTS5 index (see models.create_search_index)."""
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session, selectinload
+
+from .models import Article, SEARCH_TABLE
+
+
+# Title matches count this many times more than body matches (bm25 column weights)
+TITLE_WEIGHT = 5.0
+
+# Tokens of the snippet shown around the best match
+SNIPPET_TOKENS = 12
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    """
+    One search result: the article, a snippet and its score.
+
+    Full-text hits carry a bm25 score (lower is better), semantic hits a
+    cosine similarity (higher is better).
+    """
+
+    article: Article
+    snippet: str
+    score: float
+
+
+def match_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every word must match (FTS5 operators and punctuation in the input are
+    ignored) and the last word also matches as a prefix, so results show up
+    while a word is still being typed.
+
+    Returns:
+        The expression, or '' if the query has no words
+    """
+    words = WORD_RE.findall(query)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_articles(
+    session: Session,
+    query: str,
+    limit: int = 20,
+    include_duplicates: bool = False
+) -> List[SearchHit]:
+    """
+    Find articles matching query, best match first.
+
+    Args:
+        session: Database session
+        query: Free-text query
+        limit: Maximum number of hits
+        include_duplicates: Also return articles marked as duplicates
+
+    Returns:
+        Hits ranked by bm25, titles weighted by TITLE_WEIGHT
+    """
+    expression = match_query(query)
+    if not expression:
+        return []
+
+    duplicates = "" if include_duplicates else "AND a.is_duplicate = 0"
+    rows = session.execute(text(
+        f"SELECT a.id, snippet({SEARCH_TABLE}, -1, '[', ']', '…', {SNIPPET_TOKENS}), "
+        f"bm25({SEARCH_TABLE}, {TITLE_WEIGHT}, 1.0) AS score "
+        f"FROM {SEARCH_TABLE} JOIN articles a ON a.id = {SEARCH_TABLE}.rowid "
+        f"WHERE {SEARCH_TABLE} MATCH :query {duplicates} "
+        "ORDER BY score LIMIT :limit"
+    ), {'query': expression, 'limit': limit}).all()
+
+    articles = {
+        article.id: article
+        for article in session.query(Article).options(selectinload(Article.source)).filter(
+            Article.id.in_([row[0] for row in rows])
+        )
+    }
+    return [SearchHit(articles[article_id], snippet, score) for article_id, snippet, score in rows]
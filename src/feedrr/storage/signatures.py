@@ -0,0 +1,200 @@
+"""Cheap duplicate prefilter: URL canonicalization and SimHash signatures.
+
+Everything here is pure Python so it can run at save time and ahead of the
+embedding model without loading numpy or torch. It depends on nothing else in
+feedrr, so storage (canonical_url and simhash columns), the fetcher and the
+processor can all use it.
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Query parameters that only carry tracking/session information
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+    'ref', 'ref_src', 'cmpid', 'ocid', 'smid', 'smtyp', 'ito', '_ga', 'spm',
+    'outputtype', 'amp',
+}
+TRACKING_PREFIXES = ('utm_', 'at_', 'pk_', 'mtm_')
+
+# Signatures are 64-bit and split into four 16-bit bands for candidate lookup.
+# By pigeonhole, two signatures within 3 bits of each other share a band.
+SIGNATURE_BITS = 64
+BAND_BITS = 16
+BAND_COUNT = SIGNATURE_BITS // BAND_BITS
+MAX_SUPPORTED_DISTANCE = BAND_COUNT - 1
+
+# Texts shorter than this many tokens are too small for a reliable signature
+MIN_SIGNATURE_TOKENS = 8
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_ENTITY_RE = re.compile(r'&[#\w]+;')
+_TOKEN_RE = re.compile(r'\w+')
+_AMP_PATH_RE = re.compile(r'(/amp)+/?$|^/amp(?=/)')
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce an article URL to a canonical form for uniqueness checks.
+
+    Normalizes scheme (http/https), host case, ``www.``/``amp.`` prefixes,
+    default ports, AMP path segments, trailing slashes, fragments and
+    tracking query parameters. Remaining query parameters are sorted.
+
+    Args:
+        url: Article URL as found in the feed
+
+    Returns:
+        Canonical URL string (original string if it cannot be parsed)
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+
+    if not parts.netloc:
+        return url
+
+    host = (parts.hostname or '').lower()
+    for prefix in ('www.', 'amp.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = _AMP_PATH_RE.sub('', parts.path) or '/'
+    if path.endswith('.amp'):
+        path = path[:-len('.amp')]
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercase text, strip HTML and split into word tokens."""
+    text = _ENTITY_RE.sub(' ', _TAG_RE.sub(' ', text))
+    return _TOKEN_RE.findall(text.lower())
+
+
+def compute_simhash(title: str, content: Optional[str] = None) -> Optional[int]:
+    """
+    Compute a 64-bit SimHash over normalized title + content.
+
+    Features are word trigrams (shingles), so reordered boilerplate and small
+    edits move only a few bits.
+
+    Args:
+        title: Article title
+        content: Article content (HTML allowed)
+
+    Returns:
+        Signed 64-bit signature (fits an SQLite INTEGER), or None when the
+        text is too short to fingerprint reliably
+    """
+    tokens = normalize_tokens(f"{title or ''} {content or ''}")
+    if len(tokens) < MIN_SIGNATURE_TOKENS:
+        return None
+
+    weights = [0] * SIGNATURE_BITS
+    shingles: Dict[str, int] = {}
+    for i in range(len(tokens) - 2):
+        shingle = ' '.join(tokens[i:i + 3])
+        shingles[shingle] = shingles.get(shingle, 0) + 1
+
+    for shingle, count in shingles.items():
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+        for bit in range(SIGNATURE_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    signature = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            signature |= 1 << bit
+
+    return to_signed64(signature)
+
+
+def to_signed64(value: int) -> int:
+    """Convert an unsigned 64-bit value to the signed range SQLite stores."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two 64-bit signatures."""
+    return ((a ^ b) & ((1 << 64) - 1)).bit_count()
+
+
+def _bands(signature: int) -> List[Tuple[int, int]]:
+    unsigned = signature & ((1 << 64) - 1)
+    mask = (1 << BAND_BITS) - 1
+    return [(band, unsigned >> (band * BAND_BITS) & mask) for band in range(BAND_COUNT)]
+
+
+class SignatureIndex:
+    """
+    In-memory SimHash index with banded candidate lookup.
+
+    Lookups touch only the handful of signatures that share a 16-bit band with
+    the query instead of scanning every stored signature.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        self._size = 0
+        self.last_id = 0  # Highest article id added
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, article_id: int, signature: int) -> None:
+        """Add an article signature to the index."""
+        for band in _bands(signature):
+            self._buckets.setdefault(band, []).append((article_id, signature))
+        self._size += 1
+        self.last_id = max(self.last_id, article_id)
+
+    def find(
+        self,
+        signature: int,
+        max_distance: int = 3,
+        before_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Find the closest indexed article within max_distance bits.
+
+        Args:
+            signature: Query signature
+            max_distance: Maximum Hamming distance (at most 3)
+            before_id: Only consider articles with a smaller id, so the
+                earliest copy of a story is always the one matched
+
+        Returns:
+            Matching article id (closest, then lowest id), or None
+        """
+        if max_distance > MAX_SUPPORTED_DISTANCE:
+            raise ValueError(f"max_distance must be <= {MAX_SUPPORTED_DISTANCE}")
+
+        best: Optional[Tuple[int, int]] = None
+        for band in _bands(signature):
+            for article_id, candidate in self._buckets.get(band, ()):
+                if before_id is not None and article_id >= before_id:
+                    continue
+                distance = hamming_distance(signature, candidate)
+                if distance <= max_distance and (best is None or (distance, article_id) < best):
+                    best = (distance, article_id)
+
+        return best[1] if best else None
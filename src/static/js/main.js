@@ -25,8 +25,11 @@
 (function() {
     const categoryFilter = document.getElementById('category-filter');
     const topicFilter = document.getElementById('topic-filter');
+    const searchInput = document.getElementById('search-input');
     const filterStatus = document.querySelector('.filter-status');
     const articles = document.querySelectorAll('.article');
+    let searchMatches = null;  // Set of matching article ids, null when not searching
+    let searchSeq = 0;
 
     function applyFilters() {
         const selectedCategory = categoryFilter.value;
@@ -44,8 +47,11 @@
             // Check topic filter
             const topicMatch = selectedTopic === 'all' || articleTopics.includes(selectedTopic);
 
-            // Show article only if it matches both filters
-            if (categoryMatch && topicMatch) {
+            // Check search results
+            const searchMatch = searchMatches === null || searchMatches.has(Number(article.dataset.id));
+
+            // Show article only if it matches every filter
+            if (categoryMatch && topicMatch && searchMatch) {
                 article.style.display = '';
                 visibleCount++;
             } else {
@@ -58,7 +64,7 @@
     }
 
     function updateFilterStatus(category, topic, count) {
-        if (category === 'all' && topic === 'all') {
+        if (category === 'all' && topic === 'all' && searchMatches === null) {
             filterStatus.textContent = '';
             filterStatus.classList.remove('active');
         } else {
@@ -69,14 +75,31 @@
             if (topic !== 'all') {
                 parts.push(topic);
             }
+            if (searchMatches !== null) {
+                parts.push(`matching "${searchInput.value.trim()}"`);
+            }
             filterStatus.textContent = `Showing ${count} ${parts.join(' • ')} article${count !== 1 ? 's' : ''}`;
             filterStatus.classList.add('active');
         }
     }
 
+    function applySearch() {
+        // Only the latest query may update the list; earlier ones can resolve later
+        const seq = ++searchSeq;
+        window.feedrrSearch.query(searchInput.value).then(matches => {
+            if (seq === searchSeq) {
+                searchMatches = matches;
+                applyFilters();
+            }
+        }).catch(error => {
+            console.error('Search unavailable:', error);
+        });
+    }
+
     // Handle filter changes
     categoryFilter.addEventListener('change', applyFilters);
     topicFilter.addEventListener('change', applyFilters);
+    searchInput.addEventListener('input', applySearch);
 })();
 
 // Article expansion is now controlled by view mode, not individual clicks
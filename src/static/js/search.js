@@ -0,0 +1,86 @@
+// Client-side search over the prebuilt sharded index in search/ (see generator/search_index.py)
+window.feedrrSearch = (function() {
+    const INDEX_VERSION = 1;
+    const SHARD_PREFIX = 2;
+    const shards = new Map();  // shard -> Promise of {term: delta-encoded ids}
+    let meta = null;
+
+    function tokenize(text) {
+        const normalized = text.toLowerCase().normalize('NFKD').replace(/[\u0300-\u036f]/g, '');
+        return (normalized.match(/[a-z0-9]+/g) || []).filter(token => token.length >= SHARD_PREFIX);
+    }
+
+    function loadJson(url) {
+        return fetch(url).then(response => {
+            if (!response.ok) {
+                throw new Error(`${url}: ${response.status}`);
+            }
+            return response.json();
+        });
+    }
+
+    function loadMeta() {
+        if (!meta) {
+            meta = loadJson('search/meta.json').then(data => {
+                if (data.version !== INDEX_VERSION) {
+                    throw new Error(`search index version ${data.version} is not supported`);
+                }
+                data.shardSet = new Set(data.shards);
+                return data;
+            });
+        }
+        return meta;
+    }
+
+    function loadShard(key) {
+        if (!shards.has(key)) {
+            shards.set(key, loadJson(`search/terms-${key}.json`));
+        }
+        return shards.get(key);
+    }
+
+    function decode(deltas) {
+        const ids = [];
+        let id = 0;
+        for (const delta of deltas) {
+            id += delta;
+            ids.push(id);
+        }
+        return ids;
+    }
+
+    // Article ids containing term (every term starting with it if prefix)
+    async function lookup(index, term, prefix) {
+        const key = term.slice(0, SHARD_PREFIX);
+        if (!index.shardSet.has(key)) {
+            return new Set();
+        }
+        const shard = await loadShard(key);
+        if (!prefix) {
+            return new Set(shard[term] ? decode(shard[term]) : []);
+        }
+        const ids = new Set();
+        for (const candidate in shard) {
+            if (candidate.startsWith(term)) {
+                decode(shard[candidate]).forEach(id => ids.add(id));
+            }
+        }
+        return ids;
+    }
+
+    // Resolves to the Set of article ids matching every term, or null for an empty query
+    async function query(text) {
+        const terms = tokenize(text);
+        if (!terms.length) {
+            return null;
+        }
+        const index = await loadMeta();
+        const matches = await Promise.all(
+            terms.map((term, i) => lookup(index, term, i === terms.length - 1))
+        );
+        matches.sort((a, b) => a.size - b.size);
+        return new Set([...matches[0]].filter(id => matches.every(ids => ids.has(id))));
+    }
+
+    return { query: query, tokenize: tokenize };
+})();
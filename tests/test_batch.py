@@ -0,0 +1,128 @@
+"""Tests for batched article processing."""
+
+import pytest
+import numpy as np
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.storage.models import Base, Source, Article
+from feedrr.storage.db import save_articles, load_topics_from_config
+from feedrr.processor.batch import ArticleProcessor
+
+
+TOPICS = [
+    {"name": "Technology", "slug": "tech", "keywords": ["software", "code"]},
+    {"name": "Sports", "slug": "sports", "keywords": ["match", "team"]},
+]
+
+VOCAB = ["software", "code", "match", "team", "release", "final"]
+
+
+class KeywordEncoder:
+    """Deterministic encoder: one dimension per vocabulary word plus one for the rest."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            words = text.lower().split()
+            other = sum(1 for word in words if word not in VOCAB)
+            vectors.append([float(words.count(word)) for word in VOCAB] + [float(other)])
+        return np.array(vectors, dtype=np.float32)
+
+
+@pytest.fixture
+def db_session():
+    """Create an in-memory database with topics and a source."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    load_topics_from_config(session, TOPICS)
+    session.add(Source(name="Test Source", feed_url="https://example.com/feed.xml"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def encoder():
+    """Patch the model loader with the keyword encoder."""
+    model = KeywordEncoder()
+    with patch('feedrr.processor.batch.get_model', return_value=model), \
+            patch('feedrr.processor.topics.get_model', return_value=model), \
+            patch.dict('feedrr.processor.topics._topic_matrices', clear=True):
+        yield model
+
+
+def make_processor(session, tmp_path, **overrides):
+    config = {"topics": TOPICS, "llm": {"batch_size": 8}, "tagging": {"threshold": 0.3}}
+    config["llm"].update(overrides)
+    return ArticleProcessor(session, config, tmp_path)
+
+
+def test_process_tags_and_clusters(db_session, encoder, tmp_path):
+    """Test tagging, prefiltered duplicates and clustering in one batch."""
+    source = db_session.query(Source).one()
+    body = "software code release software code release for the new compiler today"
+    save_articles(db_session, source, [
+        {'url': 'https://a.example.com/1', 'title': 'Release', 'content': body},
+        {'url': 'https://b.example.com/1', 'title': 'Release', 'content': body},
+        {'url': 'https://c.example.com/1', 'title': 'Final', 'content': 'team match final'},
+    ])
+    articles = db_session.query(Article).order_by(Article.id).all()
+
+    processor = make_processor(db_session, tmp_path)
+    result = processor.process(articles)
+    processor.close()
+
+    assert result.processed == 3
+    assert result.prefiltered == 1
+    # The syndicated copy never reaches the model
+    assert sum(text.startswith('Release') for call in encoder.calls for text in call) == 1
+
+    original, copy, sports = articles
+    assert [t.topic.slug for t in original.topics] == ["tech"]
+    assert [t.topic.slug for t in copy.topics] == ["tech"]
+    assert [t.topic.slug for t in sports.topics] == ["sports"]
+    assert copy.is_duplicate and copy.duplicate_of_id == original.id
+    assert original.cluster_id == copy.cluster_id != sports.cluster_id
+
+    assert len(processor.embedding_matrix) == 2
+
+
+def test_process_general_fallback(db_session, encoder, tmp_path):
+    """Test that articles matching no topic are tagged general."""
+    source = db_session.query(Source).one()
+    save_articles(db_session, source, [
+        {'url': 'https://a.example.com/2', 'title': 'Weather', 'content': 'rain tomorrow'},
+    ])
+    article = db_session.query(Article).one()
+
+    processor = make_processor(db_session, tmp_path)
+    processor.process([article])
+    processor.close()
+
+    assert [t.topic.slug for t in article.topics] == ["general"]
+
+
+def test_process_skip_dedup(db_session, encoder, tmp_path):
+    """Test that skip_dedup still tags and stores embeddings but does not cluster."""
+    source = db_session.query(Source).one()
+    body = "software code release software code release for the new compiler today"
+    save_articles(db_session, source, [
+        {'url': 'https://a.example.com/3', 'title': 'Release', 'content': body},
+        {'url': 'https://b.example.com/3', 'title': 'Release', 'content': body},
+    ])
+    articles = db_session.query(Article).order_by(Article.id).all()
+
+    processor = ArticleProcessor(db_session, {"topics": TOPICS}, tmp_path, skip_dedup=True)
+    result = processor.process(articles)
+    processor.close()
+
+    assert result.duplicates == 0
+    assert all(article.embedding is not None for article in articles)
+    assert all(article.cluster_id is None for article in articles)
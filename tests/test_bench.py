@@ -0,0 +1,95 @@
+"""Tests for the benchmark corpus generator and runner."""
+
+import json
+import numpy as np
+
+from feedrr.bench.corpus import CorpusSpec, generate_corpus, load_corpus
+from feedrr.bench.encoder import StubEncoder
+from feedrr.bench.runner import compare_results, run_benchmark, write_results
+from feedrr.fetcher.rss import parse_feed
+
+
+TOPICS = [
+    {"name": "Technology", "slug": "tech", "keywords": ["software", "code"]},
+    {"name": "Sports", "slug": "sports", "keywords": ["match", "team"]},
+]
+
+
+def test_corpus_is_deterministic(tmp_path):
+    """Test that the same spec and seed produce identical files."""
+    spec = CorpusSpec(sources=3, entries=10, seed=7)
+    first = generate_corpus(tmp_path / "a", spec)
+    second = generate_corpus(tmp_path / "b", spec)
+    other = generate_corpus(tmp_path / "c", CorpusSpec(sources=3, entries=10, seed=8))
+
+    assert [first.feed_bytes(f) for f in first.feeds] == [second.feed_bytes(f) for f in second.feeds]
+    assert first.feed_bytes(first.feeds[0]) != other.feed_bytes(other.feeds[0])
+
+
+def test_corpus_feeds_parse(tmp_path):
+    """Test that generated RSS and Atom feeds parse into articles."""
+    corpus = generate_corpus(tmp_path, CorpusSpec(sources=4, entries=5, atom_fraction=0.5, seed=3))
+
+    formats = {feed.format for feed in corpus.feeds}
+    assert formats == {'rss', 'atom'}
+    for feed in corpus.feeds:
+        articles = parse_feed(corpus.feed_bytes(feed))
+        assert len(articles) == 5
+        assert all(article['url'] and article['published_date'] for article in articles)
+
+
+def test_corpus_duplicate_rates(tmp_path):
+    """Test that duplicates are planted at roughly the requested rates."""
+    corpus = generate_corpus(tmp_path, CorpusSpec(sources=10, entries=100, duplicate_rate=0.2,
+                                                  near_duplicate_rate=0.1))
+
+    assert 150 <= corpus.duplicates <= 250
+    assert 60 <= corpus.near_duplicates <= 140
+    assert load_corpus(tmp_path).duplicates == corpus.duplicates
+
+
+def test_stub_encoder():
+    """Test the stub encoder's shapes and similarity behaviour."""
+    encoder = StubEncoder(dim=32)
+
+    single = encoder.encode("software code release")
+    batch = encoder.encode(["software code release", "software code", "team match"])
+
+    assert single.shape == (32,)
+    assert batch.shape == (3, 32)
+    np.testing.assert_allclose(single, batch[0])
+    assert batch[0] @ batch[1] > batch[0] @ batch[2]
+    assert encoder.encode([]).shape == (0, 32)
+
+
+def test_run_benchmark(tmp_path):
+    """Test a tiny end-to-end benchmark run with the stub encoder."""
+    spec = CorpusSpec(sources=3, entries=8, duplicate_rate=0.3, near_duplicate_rate=0.0)
+
+    result = run_benchmark(spec, tmp_path, encoder=StubEncoder(), config={"topics": TOPICS}, label="tiny")
+
+    assert result['label'] == "tiny"
+    assert list(result['stages']) == ["parse", "save", "process", "generate", "build"]
+    assert result['stages']['parse']['items'] == 24
+    assert result['stages']['process']['items'] == result['stages']['save']['items']
+    assert result['stages']['save']['queries'] > 0
+    assert result['detected_duplicates'] >= 1
+    assert (tmp_path / "site" / "index.html").exists()
+
+    path = write_results([result], tmp_path / "results")
+    assert json.loads(path.read_text())['runs'][0]['label'] == "tiny"
+
+
+def test_compare_results():
+    """Test comparing stage timings of runs with matching labels."""
+    baseline = {'runs': [{'label': '1k', 'stages': {'parse': {'wall_seconds': 2.0}}}]}
+    current = {'runs': [
+        {'label': '1k', 'stages': {'parse': {'wall_seconds': 1.0}, 'save': {'wall_seconds': 1.0}}},
+        {'label': '10k', 'stages': {'parse': {'wall_seconds': 5.0}}},
+    ]}
+
+    rows = compare_results(baseline, current)
+
+    assert rows == [{
+        'label': '1k', 'stage': 'parse', 'baseline_seconds': 2.0, 'current_seconds': 1.0, 'change': -0.5
+    }]
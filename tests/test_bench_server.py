@@ -0,0 +1,92 @@
+"""Tests for the local fake feed server."""
+
+import time
+import pytest
+import requests
+
+from feedrr.bench.corpus import CorpusSpec, generate_corpus
+from feedrr.bench.runner import run_fetch_benchmark
+from feedrr.bench.server import FeedServer, ServerBehaviour
+from feedrr.fetcher.rss import fetch_feed
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A small generated corpus."""
+    return generate_corpus(tmp_path, CorpusSpec(sources=3, entries=4))
+
+
+@pytest.fixture
+def server(corpus):
+    """A feed server over the corpus."""
+    with FeedServer(corpus.directory) as feed_server:
+        yield feed_server
+
+
+def test_fetch_feed_from_server(server, corpus):
+    """Test that the RSS fetcher reads feeds from the local server."""
+    articles = fetch_feed(server.feed_url(corpus.feeds[0].path))
+
+    assert len(articles) == 4
+    assert server.requests[-1].status == 200
+
+
+def test_conditional_get(server, corpus):
+    """Test ETag and Last-Modified revalidation."""
+    url = server.feed_url(corpus.feeds[0].path)
+    first = requests.get(url)
+
+    by_etag = requests.get(url, headers={'If-None-Match': first.headers['ETag']})
+    by_date = requests.get(url, headers={'If-Modified-Since': first.headers['Last-Modified']})
+
+    assert by_etag.status_code == 304
+    assert by_date.status_code == 304
+    assert server.requests[-1].conditional
+
+
+def test_gzip_and_redirects(server, corpus):
+    """Test gzip encoding and redirect chains."""
+    plain = requests.get(server.feed_url(corpus.feeds[0].path, gzip=0))
+    redirected = requests.get(server.feed_url(corpus.feeds[0].path, redirect=2))
+
+    assert 'Content-Encoding' not in plain.headers
+    assert redirected.headers['Content-Encoding'] == 'gzip'
+    assert redirected.content == plain.content
+    assert [r.status_code for r in redirected.history] == [302, 302]
+
+
+def test_error_statuses(server, corpus):
+    """Test forced statuses, Retry-After and flaky paths."""
+    limited = requests.get(server.feed_url(corpus.feeds[0].path, status=429, retry_after=7))
+    flaky = [requests.get(server.feed_url(corpus.feeds[1].path, fail_every=2)).status_code
+             for _ in range(4)]
+    missing = requests.get(server.feed_url("feeds/missing.xml"))
+
+    assert limited.status_code == 429
+    assert limited.headers['Retry-After'] == "7"
+    assert flaky == [200, 503, 200, 503]
+    assert missing.status_code == 404
+
+
+def test_latency_and_huge_feed(server):
+    """Test injected latency and generated huge feeds."""
+    start = time.perf_counter()
+    response = requests.get(server.feed_url("huge.xml", entries=500, latency=0.2))
+
+    assert time.perf_counter() - start >= 0.2
+    assert response.content.count(b"<item>") == 500
+
+
+def test_error_rate_and_fetch_benchmark(corpus):
+    """Test server-wide error rate and the fetch benchmark result."""
+    with FeedServer(corpus.directory, ServerBehaviour(error_rate=1.0, error_status=500)) as failing:
+        assert requests.get(failing.feed_url(corpus.feeds[0].path)).status_code == 500
+
+    with FeedServer(corpus.directory) as feed_server:
+        result = run_fetch_benchmark(feed_server.feed_urls(corpus))
+
+    assert result['feeds'] == 3
+    assert result['errors'] == 0
+    assert result['articles'] == 12
+    assert result['bytes'] > 0
+    assert result['latency']['p50'] is not None
@@ -0,0 +1,69 @@
+"""Tests for the command-line interface."""
+
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+
+HEAVY_MODULES = ["torch", "sentence_transformers", "numpy", "feedparser", "jinja2"]
+
+
+def run_cli_in_subprocess(args, data_dir):
+    """
+    Invoke the CLI in a fresh interpreter and report which heavy modules it loaded.
+
+    A subprocess is used because other tests import the ML stack into this process.
+    """
+    script = textwrap.dedent(f"""
+        import sys
+        from pathlib import Path
+        import feedrr.cli as cli
+
+        cli.get_data_dir = lambda: Path({str(data_dir)!r})
+        try:
+            cli.main({args!r}, standalone_mode=False)
+        except SystemExit:
+            pass
+        loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+        print("LOADED:" + ",".join(loaded))
+    """)
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    line = next(text for text in reversed(result.stdout.splitlines()) if text.startswith("LOADED:"))
+    return [m for m in line[len("LOADED:"):].split(",") if m]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Create a data directory with an empty database."""
+    from feedrr.storage.models import create_database
+
+    create_database(str(tmp_path / "feedrr.db"))
+    return tmp_path
+
+
+def test_help_does_not_import_heavy_modules(data_dir):
+    """Test that `feedrr --help` starts without loading torch or other heavy deps."""
+    loaded = run_cli_in_subprocess(["--help"], data_dir)
+    assert "torch" not in loaded
+    assert loaded == []
+
+
+def test_stats_does_not_import_heavy_modules(data_dir):
+    """Test that `feedrr stats` starts without loading torch or other heavy deps."""
+    loaded = run_cli_in_subprocess(["stats"], data_dir)
+    assert "torch" not in loaded
+    assert loaded == []
+
+
+def test_search_does_not_import_heavy_modules(data_dir):
+    """Test that full-text `feedrr search` runs without loading torch or other heavy deps."""
+    loaded = run_cli_in_subprocess(["search", "anything"], data_dir)
+    assert loaded == []
@@ -0,0 +1,145 @@
+"""Tests for story clustering."""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.storage.models import Base, Source, Article, Topic, ArticleTopic, StoryCluster
+from feedrr.processor.clusters import (
+    UnionFind,
+    update_clusters,
+    backfill_clusters,
+)
+from feedrr.generator.site import get_cluster_members
+
+
+@pytest.fixture
+def db_session():
+    """Create an in-memory database for testing."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_articles(db_session):
+    """Factory creating articles with given published days."""
+    source = Source(name="Test Source", feed_url="https://example.com/feed.xml")
+    db_session.add(source)
+    db_session.commit()
+
+    def factory(*days):
+        articles = []
+        for i, day in enumerate(days):
+            article = Article(
+                url=f"https://example.com/{len(db_session.query(Article).all())}-{i}",
+                title=f"Article {i}",
+                published_date=datetime(2024, 1, day) if day else None,
+                source_id=source.id
+            )
+            db_session.add(article)
+            db_session.commit()
+            articles.append(article)
+        return articles
+
+    return factory
+
+
+def test_union_find_groups():
+    """Test basic union-find operations."""
+    forest = UnionFind()
+    forest.union(1, 2)
+    forest.union(3, 4)
+    forest.union(2, 3)
+    forest.add(5)
+
+    assert forest.find(1) == forest.find(4)
+    assert forest.find(5) != forest.find(1)
+    assert sorted(sorted(group) for group in forest.groups()) == [[1, 2, 3, 4], [5]]
+
+
+def test_update_clusters_chain_forms_single_cluster(db_session, make_articles):
+    """Test that A~B and B~C put all three articles in one cluster."""
+    a, b, c = make_articles(3, 2, 5)
+
+    update_clusters(db_session, [a.id, b.id, c.id], [(a.id, b.id), (b.id, c.id)])
+
+    assert a.cluster_id == b.cluster_id == c.cluster_id
+    cluster = db_session.get(StoryCluster, a.cluster_id)
+    assert cluster.size == 3
+    # Earliest published article is canonical regardless of processing order
+    assert cluster.canonical_article_id == b.id
+    assert b.is_duplicate is False
+    assert a.is_duplicate is True and a.duplicate_of_id == b.id
+    assert c.is_duplicate is True and c.duplicate_of_id == b.id
+
+
+def test_update_clusters_singletons(db_session, make_articles):
+    """Test that articles without neighbours get their own cluster."""
+    a, b = make_articles(1, 2)
+
+    update_clusters(db_session, [a.id, b.id], [])
+
+    assert a.cluster_id is not None
+    assert a.cluster_id != b.cluster_id
+    assert not a.is_duplicate and not b.is_duplicate
+
+
+def test_update_clusters_merges_existing_clusters(db_session, make_articles):
+    """Test that a new article bridging two clusters merges them."""
+    a, b, c, d = make_articles(4, 5, 1, 6)
+    update_clusters(db_session, [a.id, b.id], [(a.id, b.id)])
+    update_clusters(db_session, [c.id], [])
+    first, second = a.cluster_id, c.cluster_id
+
+    new, = make_articles(7)
+    update_clusters(db_session, [new.id], [(new.id, b.id), (new.id, c.id)])
+
+    assert a.cluster_id == b.cluster_id == c.cluster_id == new.cluster_id == min(first, second)
+    assert db_session.query(StoryCluster).count() == 1
+    assert db_session.get(StoryCluster, a.cluster_id).canonical_article_id == c.id
+    assert d.cluster_id is None
+
+
+def test_canonical_ties_use_lowest_id(db_session, make_articles):
+    """Test that articles without dates fall back to the lowest id."""
+    a, b = make_articles(None, None)
+    a.fetched_date = b.fetched_date = datetime(2024, 1, 1)
+    db_session.commit()
+
+    update_clusters(db_session, [b.id, a.id], [(b.id, a.id)])
+
+    assert db_session.get(StoryCluster, a.cluster_id).canonical_article_id == a.id
+
+
+def test_backfill_clusters_uses_duplicate_links(db_session, make_articles):
+    """Test that legacy duplicate_of links become clusters."""
+    original, duplicate, untagged = make_articles(1, 2, 3)
+    topic = Topic(name="Tech", slug="tech")
+    db_session.add(topic)
+    db_session.commit()
+    for article in (original, duplicate):
+        db_session.add(ArticleTopic(article_id=article.id, topic_id=topic.id))
+    duplicate.is_duplicate = True
+    duplicate.duplicate_of_id = original.id
+    db_session.commit()
+
+    assert backfill_clusters(db_session) == 2
+    assert original.cluster_id == duplicate.cluster_id
+    assert untagged.cluster_id is None
+    assert backfill_clusters(db_session) == 0
+
+
+def test_get_cluster_members(db_session, make_articles):
+    """Test loading cluster members for the site in one query."""
+    a, b, c = make_articles(1, 2, 3)
+    update_clusters(db_session, [a.id, b.id, c.id], [(a.id, b.id)])
+
+    members = get_cluster_members(db_session, [a.cluster_id, c.cluster_id])
+
+    assert [m['id'] for m in members[a.cluster_id]] == [a.id, b.id]
+    assert members[a.cluster_id][0]['name'] == "Test Source"
+    assert [m['id'] for m in members[c.cluster_id]] == [c.id]
@@ -0,0 +1,147 @@
+"""Tests for the long-running daemon loop."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import numpy as np
+import yaml
+from unittest.mock import patch
+
+from feedrr.daemon import Daemon, MIN_INTERVAL
+from feedrr.storage.db import load_topics_from_config
+from feedrr.storage.models import Article, Source, create_database, get_session
+
+
+TOPICS = [
+    {"name": "Technology", "slug": "tech", "keywords": ["software", "code"]},
+    {"name": "Sports", "slug": "sports", "keywords": ["match", "team"]},
+]
+
+
+class WordEncoder:
+    """Encoder counting a few words, enough to tag articles."""
+
+    def encode(self, texts, batch_size=32):
+        words = ["software", "code", "match", "team"]
+        return np.array([[text.lower().split().count(word) + 0.1 for word in words] for text in texts],
+                        dtype=np.float32)
+
+
+@pytest.fixture
+def encoder():
+    model = WordEncoder()
+    with patch('feedrr.processor.batch.get_model', return_value=model), \
+            patch('feedrr.processor.topics.get_model', return_value=model), \
+            patch.dict('feedrr.processor.topics._topic_matrices', clear=True):
+        yield model
+
+
+@pytest.fixture
+def daemon(tmp_path, encoder):
+    """Daemon over a database with one source that is not due for an hour."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump({"topics": TOPICS}))
+    create_database(str(tmp_path / "feedrr.db"))
+    session = get_session(str(tmp_path / "feedrr.db"))
+    load_topics_from_config(session, TOPICS)
+    session.add(Source(name="Later", feed_url="https://later.example.com/feed.xml",
+                       next_due_at=datetime.utcnow() + timedelta(hours=1)))
+    session.commit()
+    session.close()
+
+    lines = []
+    runner = Daemon(config_path, tmp_path, tmp_path / "site", interval=0.01, model=encoder, log=lines.append)
+    runner.lines = lines
+    yield runner
+    runner.close()
+
+
+def test_cycle_regenerates_only_on_changes(daemon, tmp_path):
+    """Test that the first cycle renders and a cycle with nothing new does not."""
+    first = daemon.cycle()
+    assert first.sources == 0
+    assert first.generated
+    assert (tmp_path / "site" / "index.html").exists()
+
+    assert not daemon.cycle().generated
+
+
+def test_cycle_tags_untagged_articles(daemon, tmp_path):
+    """Test that articles left untagged are processed by the next cycle."""
+    session = get_session(str(tmp_path / "feedrr.db"))
+    source = session.query(Source).one()
+    session.add(Article(url="https://later.example.com/1", title="Software", content="code code",
+                        source_id=source.id))
+    session.commit()
+    session.close()
+
+    result = daemon.cycle()
+
+    assert result.pipeline.processed == 1
+
+
+def test_next_wait_bounds(daemon):
+    """Test that the sleep follows the next due source within [MIN_INTERVAL, interval]."""
+    daemon.interval = 7200
+    wait = daemon.next_wait()
+    assert 3500 < wait <= 3600
+
+    daemon.interval = 10
+    assert daemon.next_wait() == 10
+
+    daemon.interval = 7200
+    daemon.session.query(Source).update({Source.next_due_at: datetime.utcnow()})
+    daemon.session.commit()
+    assert daemon.next_wait() == MIN_INTERVAL
+
+
+def test_run_until_stopped(daemon):
+    """Test that a rebuild request forces a cycle and a stop request ends the loop."""
+    daemon.request_rebuild()
+    original_cycle = daemon.cycle
+    forced = []
+
+    def cycle(force=False):
+        forced.append(force)
+        if len(forced) == 3:
+            daemon.request_stop()
+        return original_cycle()  # Forcing would fetch the (unreachable) source
+
+    daemon.cycle = cycle
+
+    assert daemon.run() == 3
+    assert forced == [True, False, False]
+    assert daemon.lines[0].startswith("Cycle 1: 0 sources")
+    assert daemon.processor is None
+
+
+def test_run_survives_failed_cycle(daemon):
+    """Test that a cycle raising is logged and the next cycle still runs."""
+    original_cycle = daemon.cycle
+    calls = []
+
+    def cycle(force=False):
+        calls.append(force)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return original_cycle()
+
+    daemon.cycle = cycle
+
+    assert daemon.run(max_cycles=2) == 2
+    assert len(calls) == 2
+    assert daemon.lines[0].startswith("Cycle 1 failed:")
+    assert "RuntimeError: database is locked" in daemon.lines[0]
+    assert any(line.startswith("Cycle 2: 0 sources") for line in daemon.lines)
+
+
+def test_run_stops_on_keyboard_interrupt(daemon):
+    """Test that KeyboardInterrupt is not swallowed like other cycle errors."""
+    def cycle(force=False):
+        raise KeyboardInterrupt
+
+    daemon.cycle = cycle
+
+    with pytest.raises(KeyboardInterrupt):
+        daemon.run(max_cycles=3)
+    assert daemon.processor is None
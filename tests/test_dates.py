@@ -0,0 +1,77 @@
+"""Tests for feed date normalization."""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from feedrr.fetcher.dates import DateNormalizer, normalize_date, parse_iso8601, parse_rfc822
+from feedrr.fetcher.rss import parse_feed
+
+
+UTC_NOON = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("value", [
+    "Mon, 01 Jan 2024 12:00:00 GMT",
+    "Mon, 01 Jan 2024 07:00:00 EST",
+    "01 Jan 2024 14:00:00 +0200",
+    "2024-01-01T12:00:00Z",
+    "2024-01-01T13:00:00+01:00",
+    "2024-01-01 12:00:00",
+    "January 1, 2024 12:00 PM UTC",
+])
+def test_normalize_date_formats(value):
+    """Test that common feed date formats become the same aware UTC datetime."""
+    result = normalize_date(value)
+
+    assert result == UTC_NOON
+    assert result.tzinfo == timezone.utc
+
+
+def test_normalize_date_invalid():
+    """Test that unparseable dates return None."""
+    assert normalize_date("not a date") is None
+    assert normalize_date("Tue, 31 Feb 2024 10:00:00 GMT") is None
+    assert normalize_date(None) is None
+    assert normalize_date("") is None
+
+
+def test_fast_parsers_reject_other_formats():
+    """Test that each fast path only accepts its own format."""
+    assert parse_rfc822("2024-01-01T12:00:00Z") is None
+    assert parse_iso8601("Mon, 01 Jan 2024 12:00:00 GMT") is None
+
+
+def test_struct_is_used_first():
+    """Test that feedparser's pre-parsed struct wins over the string."""
+    normalizer = DateNormalizer()
+    parsed = time.strptime("2024-01-01 12:00:00", "%Y-%m-%d %H:%M:%S")
+
+    assert normalizer.normalize("garbage", parsed) == UTC_NOON
+    assert normalizer.hits['struct'] == 1
+
+
+def test_normalizer_learns_feed_format():
+    """Test that the parser that worked moves to the front for the next entry."""
+    normalizer = DateNormalizer()
+
+    for minute in range(5):
+        normalizer.normalize(f"2024-01-01T12:{minute:02d}:00Z")
+
+    assert normalizer.order[0] == 'iso8601'
+    assert normalizer.hits['iso8601'] == 5
+    assert normalizer.hits['fuzzy'] == 0
+
+
+def test_parse_feed_dates_are_utc():
+    """Test that parse_feed returns aware UTC dates."""
+    data = b"""<?xml version="1.0"?><rss version="2.0"><channel>
+        <item><title>A</title><link>https://example.com/a</link>
+        <pubDate>Mon, 01 Jan 2024 14:00:00 +0200</pubDate></item>
+    </channel></rss>"""
+
+    articles = parse_feed(data)
+
+    assert articles[0]['published_date'] == UTC_NOON
+    assert articles[0]['published_date'].utcoffset().total_seconds() == 0
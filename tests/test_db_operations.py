@@ -1,6 +1,7 @@
 """Tests for database operations."""
 
 import pytest
+from datetime import datetime, timedelta, timezone
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
@@ -8,9 +9,14 @@ from feedrr.storage.models import Base, Source, Article
 from feedrr.storage.db import (
     load_sources_from_config,
     get_enabled_sources,
+    get_due_sources,
+    get_recent_urls,
     save_articles,
     get_article_count,
-    get_source_count
+    get_source_count,
+    backfill_signatures,
+    load_signature_index,
+    find_signature_duplicate
 )
 
 
@@ -160,6 +166,80 @@ def test_save_articles_updates_last_fetched(db_session):
     assert source.last_fetched is not None
 
 
+def test_save_articles_batches_url_lookups(db_session):
+    """Test that existing URLs are checked in one query, not one per entry."""
+    from sqlalchemy import event
+
+    source = Source(name='Test', feed_url='https://example.com/feed.xml')
+    db_session.add(source)
+    db_session.commit()
+    save_articles(db_session, source, [{'url': f'https://example.com/{n}', 'title': f'A{n}'} for n in range(5)])
+
+    statements = []
+    engine = db_session.get_bind()
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        count = save_articles(db_session, source, [
+            {'url': f'https://example.com/{n}?utm_source=rss', 'title': f'A{n}'} for n in range(50)
+        ])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert count == 45
+    assert sum(1 for s in statements if s.lstrip().startswith('SELECT') and 'FROM articles' in s) == 1
+
+
+def test_get_recent_urls(db_session):
+    """Test loading each source's most recent raw and canonical URLs."""
+    first = Source(name='First', feed_url='https://example.com/1.xml')
+    second = Source(name='Second', feed_url='https://example.com/2.xml')
+    empty = Source(name='Empty', feed_url='https://example.com/3.xml')
+    db_session.add_all([first, second, empty])
+    db_session.commit()
+    save_articles(db_session, first, [{'url': f'https://www.first.example/{n}', 'title': 'A'} for n in range(5)])
+    save_articles(db_session, second, [{'url': 'https://second.example/a', 'title': 'B'}])
+
+    known = get_recent_urls(db_session, [first, second, empty], limit=2)
+
+    assert known[first.id] == {
+        'https://www.first.example/4', 'https://first.example/4',
+        'https://www.first.example/3', 'https://first.example/3',
+    }
+    assert known[second.id] == {'https://second.example/a'}
+    assert known[empty.id] == set()
+
+
+def test_save_articles_stores_naive_utc(db_session):
+    """Test that aware published dates are stored as naive UTC."""
+    source = Source(name='Test', feed_url='https://example.com/feed.xml')
+    db_session.add(source)
+    db_session.commit()
+
+    published = datetime(2024, 1, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+    save_articles(db_session, source, [{'url': 'https://example.com/1', 'title': 'A', 'published_date': published}])
+
+    assert db_session.query(Article).one().published_date == datetime(2024, 1, 1, 12, 0)
+
+
+def test_get_due_sources(db_session):
+    """Test that only enabled sources that are due (or never scheduled) are returned."""
+    now = datetime(2024, 6, 1, 12, 0)
+    db_session.add_all([
+        Source(name='New', feed_url='https://example.com/new.xml'),
+        Source(name='Due', feed_url='https://example.com/due.xml', next_due_at=now - timedelta(minutes=1)),
+        Source(name='Later', feed_url='https://example.com/later.xml', next_due_at=now + timedelta(hours=1)),
+        Source(name='Off', feed_url='https://example.com/off.xml', enabled=False),
+    ])
+    db_session.commit()
+
+    assert sorted(s.name for s in get_due_sources(db_session, now)) == ['Due', 'New']
+    assert len(get_due_sources(db_session, now + timedelta(hours=2))) == 3
+
+
 def test_get_article_count(db_session):
     """Test getting article count."""
     source = Source(name='Test', feed_url='https://example.com/feed.xml')
@@ -186,3 +266,92 @@ def test_get_source_count(db_session):
     db_session.commit()
 
     assert get_source_count(db_session) == 2
+
+
+def test_save_articles_skips_canonical_url_variants(db_session):
+    """Test that tracking/scheme/AMP variants of a stored URL are skipped."""
+    source = Source(name='Test', feed_url='https://example.com/feed.xml')
+    db_session.add(source)
+    db_session.commit()
+
+    save_articles(db_session, source, [{'url': 'https://example.com/story', 'title': 'Story'}])
+
+    variants = [
+        {'url': 'http://example.com/story?utm_source=rss', 'title': 'Story'},
+        {'url': 'https://www.example.com/story/amp', 'title': 'Story'},
+    ]
+    count = save_articles(db_session, source, variants)
+
+    assert count == 0
+    article = db_session.query(Article).one()
+    assert article.canonical_url == 'https://example.com/story'
+
+
+def test_save_articles_skips_variants_within_batch(db_session):
+    """Test that canonical duplicates within one feed are saved once."""
+    source = Source(name='Test', feed_url='https://example.com/feed.xml')
+    db_session.add(source)
+    db_session.commit()
+
+    articles_data = [
+        {'url': 'https://example.com/story', 'title': 'Story'},
+        {'url': 'https://example.com/story?utm_medium=feed', 'title': 'Story'},
+    ]
+
+    assert save_articles(db_session, source, articles_data) == 1
+
+
+def test_save_articles_computes_simhash(db_session):
+    """Test that articles with enough text get a SimHash signature."""
+    source = Source(name='Test', feed_url='https://example.com/feed.xml')
+    db_session.add(source)
+    db_session.commit()
+
+    save_articles(db_session, source, [{
+        'url': 'https://example.com/story',
+        'title': 'Big news today',
+        'content': 'A long enough body of text to compute a stable signature from'
+    }])
+
+    article = db_session.query(Article).one()
+    assert article.simhash is not None
+
+
+def test_backfill_signatures(db_session):
+    """Test that rows saved before the prefilter existed are backfilled."""
+    source = Source(name='Test', feed_url='https://example.com/feed.xml')
+    db_session.add(source)
+    db_session.commit()
+
+    article = Article(
+        url='http://www.example.com/old?utm_source=x',
+        title='Old article',
+        content='Content that was stored before signatures were computed at all',
+        source_id=source.id
+    )
+    db_session.add(article)
+    db_session.commit()
+
+    assert backfill_signatures(db_session) == 1
+    assert article.canonical_url == 'https://example.com/old'
+    assert article.simhash is not None
+    assert backfill_signatures(db_session) == 0
+
+
+def test_find_signature_duplicate_resolves_original(db_session):
+    """Test that signature matches resolve to the earliest non-duplicate copy."""
+    source = Source(name='Test', feed_url='https://example.com/feed.xml')
+    db_session.add(source)
+    db_session.commit()
+
+    content = 'The same syndicated wire story text appears across several outlets today'
+    save_articles(db_session, source, [
+        {'url': 'https://a.example.com/1', 'title': 'Wire story', 'content': content},
+        {'url': 'https://b.example.com/2', 'title': 'Wire story', 'content': content},
+    ])
+    first, second = db_session.query(Article).order_by(Article.id).all()
+
+    index = load_signature_index(db_session)
+
+    assert find_signature_duplicate(db_session, index, second) == first
+    assert find_signature_duplicate(db_session, index, first) is None
@@ -8,8 +8,10 @@ from feedrr.storage.models import Base, Source, Article, Topic, ArticleTopic
 from feedrr.storage.db import (
     load_topics_from_config,
     get_articles_without_topics,
-    assign_topic_to_article
+    assign_topic_to_article,
+    get_top_articles_for_topic
 )
+from feedrr.generator.site import get_article_topics
 
 
 @pytest.fixture
@@ -236,3 +238,53 @@ def test_assign_multiple_topics(db_session, sample_source):
     topic_ids = {at.topic_id for at in article_topics}
     assert topic1.id in topic_ids
     assert topic2.id in topic_ids
+
+
+def test_assign_topic_stores_score_and_rank(db_session, sample_source):
+    """Test that the similarity score and rank are persisted."""
+    article = Article(url="https://example.com/1", title="Test Article", source_id=sample_source.id)
+    db_session.add_all([article, Topic(name="Tech", slug="tech")])
+    db_session.commit()
+
+    assign_topic_to_article(db_session, article, "tech", score=0.42, rank=1)
+    assign_topic_to_article(db_session, article, "tech", score=0.5, rank=1)
+
+    article_topic = db_session.query(ArticleTopic).one()
+    assert article_topic.score == pytest.approx(0.5)
+    assert article_topic.rank == 1
+
+
+def test_get_top_articles_for_topic(db_session, sample_source):
+    """Test ranking articles by stored score with an optional minimum."""
+    db_session.add(Topic(name="Tech", slug="tech"))
+    articles = [
+        Article(url=f"https://example.com/{i}", title=f"Article {i}", source_id=sample_source.id)
+        for i in range(4)
+    ]
+    articles[3].is_duplicate = True
+    db_session.add_all(articles)
+    db_session.commit()
+    for article, score in zip(articles, [0.4, 0.9, 0.6, 0.95]):
+        assign_topic_to_article(db_session, article, "tech", score=score, rank=1)
+
+    top = get_top_articles_for_topic(db_session, "tech", limit=2)
+    assert [a.title for a in top] == ["Article 1", "Article 2"]
+
+    confident = get_top_articles_for_topic(db_session, "tech", min_score=0.5)
+    assert [a.title for a in confident] == ["Article 1", "Article 2"]
+
+
+def test_get_article_topics_filters_by_score(db_session, sample_source):
+    """Test loading topic names for many articles with a score filter."""
+    first = Article(url="https://example.com/1", title="First", source_id=sample_source.id)
+    second = Article(url="https://example.com/2", title="Second", source_id=sample_source.id)
+    db_session.add_all([first, second, Topic(name="Tech", slug="tech"), Topic(name="Science", slug="science")])
+    db_session.commit()
+    assign_topic_to_article(db_session, first, "science", score=0.8, rank=1)
+    assign_topic_to_article(db_session, first, "tech", score=0.31, rank=2)
+    assign_topic_to_article(db_session, second, "general")
+
+    topics = get_article_topics(db_session, [first.id, second.id], min_score=0.35)
+
+    assert topics == {first.id: ["Science"], second.id: ["General"]}
+    assert get_article_topics(db_session, [first.id])[first.id] == ["Science", "Tech"]
@@ -12,6 +12,8 @@ from feedrr.processor.dedup import (
     generate_article_embedding,
     find_duplicate,
     mark_as_duplicate,
+    normalize_rows,
+    EmbeddingIndex,
 )
 from feedrr.storage.models import Article, Source
 
@@ -322,3 +324,67 @@ def test_integration_duplicate_workflow():
 
     assert article2.is_duplicate is True
     assert article2.duplicate_of_id == 1
+
+
+def test_embedding_index_neighbours():
+    """Test that all neighbours above threshold are returned, most similar first."""
+    index = EmbeddingIndex(
+        np.array([1, 2, 3]),
+        normalize_rows(np.array([[1.0, 0.0, 0.0], [0.9, 0.1, 0.0], [0.0, 1.0, 0.0]]))
+    )
+
+    neighbours = index.neighbours(np.array([1.0, 0.05, 0.0]), threshold=0.85)
+
+    assert neighbours == [1, 2]
+
+
+def test_embedding_index_add_and_exclude():
+    """Test that added embeddings are searchable and the query article is excluded."""
+    index = EmbeddingIndex()
+    assert index.neighbours(np.array([1.0, 0.0]), threshold=0.5) == []
+
+    index.add(7, np.array([2.0, 0.0]))
+    index.add(8, np.array([0.0, 3.0]))
+
+    assert len(index) == 2
+    assert index.neighbours(np.array([1.0, 0.0]), threshold=0.9) == [7]
+    assert index.neighbours(np.array([1.0, 0.0]), threshold=0.9, exclude_id=7) == []
+
+
+def test_embedding_index_add_grows_buffer():
+    """Test that adding past the buffer capacity keeps every embedding and ranks across both parts."""
+    index = EmbeddingIndex(np.array([1]), normalize_rows(np.array([[1.0, 0.0]])))
+    for n in range(EmbeddingIndex.INITIAL_CAPACITY + 5):
+        index.add(100 + n, np.array([0.0, 1.0]))
+    index.add(99, np.array([1.0, 0.2]))
+
+    assert len(index) == EmbeddingIndex.INITIAL_CAPACITY + 7
+    assert index.neighbours(np.array([1.0, 0.0]), threshold=0.9) == [1, 99]
+    assert len(index.neighbours(np.array([0.0, 1.0]), threshold=0.99)) == EmbeddingIndex.INITIAL_CAPACITY + 5
+
+
+def test_embedding_index_from_session():
+    """Test loading stored embeddings, skipping corrupted rows."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from feedrr.storage.models import Base
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    source = Source(name="S", feed_url="https://example.com/feed")
+    session.add(source)
+    session.commit()
+    session.add_all([
+        Article(url="https://e.com/1", title="A", source_id=source.id,
+                embedding=serialize_embedding(np.array([3.0, 4.0]))),
+        Article(url="https://e.com/2", title="B", source_id=source.id, embedding=b"corrupted"),
+        Article(url="https://e.com/3", title="C", source_id=source.id),
+    ])
+    session.commit()
+
+    index = EmbeddingIndex.from_session(session)
+
+    assert len(index) == 1
+    np.testing.assert_allclose(index.matrix[0], [0.6, 0.8], rtol=1e-6)
+    session.close()
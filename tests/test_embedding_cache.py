@@ -0,0 +1,107 @@
+"""Tests for the content-addressed embedding cache."""
+
+import pytest
+import numpy as np
+from unittest.mock import Mock
+
+from feedrr.processor.cache import (
+    EmbeddingCache,
+    content_key,
+    encode_with_cache,
+    normalize_text,
+)
+from feedrr.processor.dedup import generate_article_embedding
+from feedrr.storage.models import Article
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create an embedding cache in a temporary directory."""
+    cache = EmbeddingCache(tmp_path / "cache.db", "test-model")
+    yield cache
+    cache.close()
+
+
+def test_normalize_text_collapses_whitespace():
+    """Test that whitespace differences are normalized away."""
+    assert normalize_text("  Hello \n\t world  ") == "Hello world"
+
+
+def test_content_key_depends_on_model():
+    """Test that the same text under different models gets different keys."""
+    assert content_key("text", "model-a") != content_key("text", "model-b")
+    assert content_key("text", "model-a") == content_key(" text ", "model-a")
+
+
+def test_cache_miss_then_hit(cache):
+    """Test storing and retrieving a vector."""
+    assert cache.get("Some article") is None
+
+    cache.put("Some article", np.array([0.1, 0.2, 0.3]))
+    cached = cache.get("Some article")
+
+    assert cached.dtype == np.float32
+    np.testing.assert_allclose(cached, [0.1, 0.2, 0.3], rtol=1e-6)
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """Test that cached vectors survive reopening the cache file."""
+    with EmbeddingCache(tmp_path / "cache.db", "test-model") as cache:
+        cache.put("Persistent", np.array([1.0, 2.0]))
+
+    with EmbeddingCache(tmp_path / "cache.db", "test-model") as cache:
+        np.testing.assert_array_equal(cache.get("Persistent"), [1.0, 2.0])
+
+    with EmbeddingCache(tmp_path / "cache.db", "other-model") as cache:
+        assert cache.get("Persistent") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the cache stays within its size bound."""
+    with EmbeddingCache(tmp_path / "cache.db", "test-model", max_entries=10) as cache:
+        for i in range(10):
+            cache.put(f"text {i}", np.array([float(i)]))
+
+        # Touch the first entry so it is the most recently used
+        assert cache.get("text 0") is not None
+
+        cache.put("text 10", np.array([10.0]))
+
+        assert len(cache) <= 10
+        assert cache.get("text 0") is not None
+        assert cache.get("text 1") is None
+        assert cache.get("text 10") is not None
+
+
+def test_encode_with_cache_skips_model_on_hit(cache):
+    """Test that the model only runs once for identical text."""
+    model = Mock()
+    model.encode.return_value = np.array([0.5, 0.5])
+
+    first = encode_with_cache(model, "Same story", cache)
+    second = encode_with_cache(model, "Same  story", cache)
+
+    model.encode.assert_called_once_with("Same story")
+    np.testing.assert_array_equal(first, second)
+
+
+def test_generate_article_embedding_uses_cache(cache):
+    """Test that syndicated copies of an article reuse the cached embedding."""
+    model = Mock()
+    model.encode.return_value = np.array([0.1, 0.2, 0.3])
+
+    original = Mock(spec=Article)
+    original.title = "Breaking News"
+    original.content = "Same syndicated text"
+
+    copy = Mock(spec=Article)
+    copy.title = "Breaking News"
+    copy.content = "Same syndicated text"
+
+    generate_article_embedding(model, original, cache)
+    embedding = generate_article_embedding(model, copy, cache)
+
+    assert model.encode.call_count == 1
+    np.testing.assert_allclose(embedding, [0.1, 0.2, 0.3], rtol=1e-6)
@@ -0,0 +1,105 @@
+"""Tests for entry extraction."""
+
+import feedparser
+
+from feedrr.fetcher.extract import EntryExtractor, clean_content
+from feedrr.fetcher.rss import parse_feed
+from feedrr.fetcher.stream import iter_entries
+
+
+def test_clean_content_strips_markup():
+    """Test that tags, scripts, styles and comments are removed and whitespace collapsed."""
+    html = ('<div><p>Hello <b>wor</b>ld</p>\n<p>Second   para</p>'
+            '<script>var x = "<p>hidden</p>";</script><style>p { color: red }</style>'
+            '<!-- ad --><h2>H<sub>2</sub>O</h2> &amp; more</div>')
+
+    text, image = clean_content(html)
+
+    assert text == "Hello world Second para H2O &amp; more"
+    assert image is None
+
+
+def test_clean_content_plain_text():
+    """Test that text without markup only has its whitespace collapsed."""
+    assert clean_content("  plain\ttext\n here ") == ("plain text here", None)
+
+
+def test_clean_content_truncates_at_word_boundary():
+    """Test that long text is cut at a word boundary with an ellipsis."""
+    text, _ = clean_content("<p>" + "word " * 100 + "</p>", max_chars=30)
+
+    assert text == "word word word word word word…"
+
+
+def test_clean_content_bounds_raw_scan():
+    """Test that a huge body is cut off without leaving half a tag or an unclosed script."""
+    html = "<p>" + "word " * 20 + '<a href="' + "x" * 500 + '">'
+
+    text, _ = clean_content(html, max_chars=30)
+    assert text == "word word word word word word…"
+
+    text, _ = clean_content("<p>start</p><script>" + "x" * 500, max_chars=30)
+    assert text == "start…"
+
+
+def test_clean_content_first_image():
+    """Test that the first <img> is found, but only within the scan limit."""
+    html = '<p>Intro</p><IMG alt="" SRC="https://example.com/a.jpg"><img src="https://example.com/b.jpg">'
+
+    assert clean_content(html)[1] == "https://example.com/a.jpg"
+    assert clean_content("x" * 100 + html, image_scan_chars=50)[1] is None
+
+
+def test_extractor_detects_feed_fields():
+    """Test that only fields present in the feed's entries are probed."""
+    extractor = EntryExtractor()
+
+    extractor.from_entry(feedparser.FeedParserDict(link="https://example.com/1", title="One", summary="Text"))
+
+    assert extractor.content_fields == ['summary']
+    assert extractor.date_fields == []
+    assert extractor.image_fields == []
+
+    extractor.from_entry(feedparser.FeedParserDict(
+        link="https://example.com/2",
+        published="2024-01-01T12:00:00Z",
+        media_thumbnail=[{'url': "https://example.com/t.jpg"}]
+    ))
+
+    assert extractor.date_fields == [('published', 'published_parsed')]
+    assert extractor.image_fields == ['media_thumbnail']
+
+
+def test_extractor_field_precedence():
+    """Test content over summary, media fields over enclosures over images in the content."""
+    data = b"""<?xml version="1.0"?>
+    <rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"
+         xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>
+        <item><title>A</title><link>https://example.com/a</link>
+            <description>Summary</description>
+            <content:encoded><![CDATA[<p>Full <img src="https://example.com/body.jpg"></p>]]></content:encoded>
+            <enclosure url="https://example.com/enc.jpg" type="image/jpeg" length="1"/>
+            <media:thumbnail url="https://example.com/thumb.jpg"/>
+        </item>
+        <item><title>B</title><link>https://example.com/b</link>
+            <description><![CDATA[<p>Only <img src="https://example.com/b.jpg"></p>]]></description>
+            <enclosure url="https://example.com/b.mp3" type="audio/mpeg" length="1"/>
+        </item>
+    </channel></rss>"""
+
+    for articles in (parse_feed(data), list(iter_entries([data]))):
+        assert articles[0]['content'] == "Full"
+        assert articles[0]['image_url'] == "https://example.com/thumb.jpg"
+        assert articles[1]['content'] == "Only"
+        assert articles[1]['image_url'] == "https://example.com/b.jpg"
+
+
+def test_extractor_content_limit():
+    """Test that the extractor applies its content limit on both parse paths."""
+    data = b"""<?xml version="1.0"?><rss version="2.0"><channel>
+        <item><title>A</title><link>https://example.com/a</link>
+            <description>one two three four five six</description></item>
+    </channel></rss>"""
+
+    assert parse_feed(data, EntryExtractor(max_content_chars=10))[0]['content'] == "one two…"
+    assert list(iter_entries([data], extractor=EntryExtractor(max_content_chars=10)))[0]['content'] == "one two…"
@@ -0,0 +1,163 @@
+"""Tests for Atom and JSON Feed output."""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.generator.feeds import group_feeds, slugify, summary, write_feeds, write_if_changed
+from feedrr.generator.site import generate_site
+from feedrr.storage.db import load_topics_from_config
+from feedrr.storage.models import Article, ArticleTopic, Base, Source, Topic
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def article(n, topics=(), category=None, day=None, **fields):
+    return {
+        'id': n, 'url': f"https://example.com/{n}", 'title': f"Article {n}", 'content': f"Text {n}",
+        'image_url': None, 'published_at': datetime(2026, 1, day or n), 'source_name': "Example",
+        'source_category': category, 'topics': list(topics), **fields
+    }
+
+
+@pytest.fixture
+def articles():
+    return [
+        article(1, ["Technology"], "news"),
+        article(2, ["Technology", "Sports"], "Film & TV"),
+        article(3, [], "news"),
+        article(4, ["Sports"], None, day=3),
+    ]
+
+
+def test_slugify():
+    """Test that names become lowercase ASCII slugs."""
+    assert slugify("Film & TV") == "film-tv"
+    assert slugify("Café Société") == "cafe-societe"
+    assert slugify("!!!") == "untitled"
+
+
+def test_group_feeds(articles):
+    """Test that one pass yields the overall, topic and category feeds, newest first with ties by id."""
+    feeds = group_feeds(articles, {"Technology": "tech"})
+
+    assert [(feed.path, feed.title) for feed in feeds] == [
+        ("all", "feedrr"),
+        ("category/film-tv", "feedrr: Film & TV"),
+        ("category/news", "feedrr: news"),
+        ("topic/sports", "feedrr: Sports"),
+        ("topic/tech", "feedrr: Technology"),
+    ]
+    items = {feed.path: [item['id'] for item in feed.items] for feed in feeds}
+    assert items["all"] == [4, 3, 2, 1]
+    assert items["topic/tech"] == [2, 1]
+    assert items["topic/sports"] == [4, 2]
+    assert items["category/news"] == [3, 1]
+
+    assert [item['id'] for item in group_feeds(articles, limit=2)[0].items] == [4, 3]
+
+
+def test_summary():
+    """Test that long text is cut and missing text stays missing."""
+    assert summary({'content': None}) is None
+    assert summary({'content': "Short"}) == "Short"
+    assert summary({'content': "x" * 400}) == "x" * 300 + "…"
+
+
+def test_write_feeds(articles, tmp_path):
+    """Test that valid Atom and JSON Feed documents are written, escaped and linked to the site."""
+    articles[0]['title'] = "Q&A <live>"
+    articles[0]['image_url'] = "https://example.com/1.jpg"
+
+    result = write_feeds(articles, tmp_path, {"Technology": "tech"}, site_url="https://feeds.example.org/")
+
+    assert (result.files, result.written) == (10, 10)
+    root = ET.parse(tmp_path / "topic" / "tech.atom").getroot()
+    assert root.find(f"{ATOM}updated").text == "2026-01-02T00:00:00Z"
+    assert root.find(f"{ATOM}link[@rel='self']").get('href') == "https://feeds.example.org/feeds/topic/tech.atom"
+    entries = root.findall(f"{ATOM}entry")
+    assert [entry.find(f"{ATOM}id").text for entry in entries] == ["https://example.com/2", "https://example.com/1"]
+    assert entries[1].find(f"{ATOM}title").text == "Q&A <live>"
+
+    feed = json.loads((tmp_path / "topic" / "tech.json").read_text())
+    assert feed['version'] == "https://jsonfeed.org/version/1.1"
+    assert feed['feed_url'] == "https://feeds.example.org/feeds/topic/tech.json"
+    assert feed['items'][1] == {
+        'id': "https://example.com/1", 'url': "https://example.com/1", 'title': "Q&A <live>",
+        'content_text': "Text 1", 'date_published': "2026-01-01T00:00:00Z",
+        'authors': [{'name': "Example"}], 'tags': ["Technology"], 'image': "https://example.com/1.jpg"
+    }
+
+
+def test_write_feeds_without_site_url(tmp_path):
+    """Test that an empty feed without a site URL is still a valid document."""
+    write_feeds([], tmp_path)
+
+    root = ET.parse(tmp_path / "all.atom").getroot()
+    assert root.find(f"{ATOM}id").text == "urn:feedrr:all"
+    assert root.find(f"{ATOM}link") is None
+    assert json.loads((tmp_path / "all.json").read_text()) == {
+        'version': "https://jsonfeed.org/version/1.1", 'title': "feedrr", 'items': []
+    }
+
+
+def test_write_feeds_only_rewrites_changed_files(articles, tmp_path):
+    """Test that unchanged feeds keep their file, and stale feeds are left in place."""
+    write_feeds(articles, tmp_path)
+    stamp = 1_000_000_000
+    for path in tmp_path.rglob("*"):
+        if path.is_file():
+            os.utime(path, (stamp, stamp))
+
+    # A new sports article changes only the overall and sports feeds
+    articles.append(article(5, ["Sports"]))
+    result = write_feeds(articles, tmp_path)
+
+    changed = sorted(
+        str(path.relative_to(tmp_path)) for path in tmp_path.rglob("*")
+        if path.is_file() and path.stat().st_mtime != stamp
+    )
+    assert changed == ["all.atom", "all.json", "topic/sports.atom", "topic/sports.json"]
+    assert (result.files, result.written) == (10, 4)
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    write_feeds([article(5, ["Sports"])], tmp_path)
+    assert (tmp_path / "topic" / "technology.atom").exists()
+
+
+def test_write_if_changed(tmp_path):
+    """Test that identical content is not rewritten."""
+    path = tmp_path / "a" / "feed.json"
+
+    assert write_if_changed(path, iter(["{", "}"]))
+    assert not write_if_changed(path, iter(["{}"]))
+    assert write_if_changed(path, iter(["[]"]))
+    assert path.read_text() == "[]"
+
+
+def test_generate_site_writes_feeds(tmp_path):
+    """Test that generate_site writes feeds named by topic slug."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(Source(name="Example", feed_url="https://example.com/feed.xml", category="news"))
+    load_topics_from_config(session, [{"name": "Technology", "slug": "tech"}])
+    session.add(Article(url="https://example.com/1", title="Launch", content="A rocket launch today",
+                        source_id=1, published_date=datetime(2026, 1, 1)))
+    session.commit()
+    session.add(ArticleTopic(article_id=1, topic_id=session.query(Topic).one().id, score=0.5, rank=1))
+    session.commit()
+
+    generate_site(session, tmp_path)
+
+    assert (tmp_path / "feeds" / "all.atom").exists()
+    assert (tmp_path / "feeds" / "category" / "news.json").exists()
+    feed = json.loads((tmp_path / "feeds" / "topic" / "tech.json").read_text())
+    assert [item['title'] for item in feed['items']] == ["Launch"]
+    assert 'href="feeds/all.atom"' in (tmp_path / "index.html").read_text()
+    session.close()
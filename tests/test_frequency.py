@@ -0,0 +1,83 @@
+"""Tests for adaptive per-source fetch frequency."""
+
+from datetime import datetime, timedelta, timezone
+
+from feedrr.fetcher.frequency import observed_post_interval, poll_interval, update_source_schedule
+from feedrr.storage.models import Source
+
+
+NOW = datetime(2024, 6, 1, 12, 0)
+HOUR = 3600
+
+
+def entries(count, spacing, start=NOW):
+    """Dates of feed entries published every `spacing` seconds, newest first."""
+    return [start - timedelta(seconds=n * spacing) for n in range(count)]
+
+
+def test_observed_post_interval():
+    """Test the average spacing between dated entries."""
+    assert observed_post_interval(entries(5, HOUR), NOW) == HOUR
+    assert observed_post_interval(entries(1, HOUR), NOW) is None
+    assert observed_post_interval([None, None], NOW) is None
+
+
+def test_observed_post_interval_mixed_timezones():
+    """Test that aware dates are converted and future dates ignored."""
+    data = [
+        datetime(2024, 6, 1, 13, 0, tzinfo=timezone(timedelta(hours=2))),  # 11:00 UTC
+        datetime(2024, 6, 1, 9, 0),
+        NOW + timedelta(days=1),
+    ]
+    assert observed_post_interval(data, NOW) == 2 * HOUR
+
+
+def test_busy_source_is_polled_at_minimum():
+    """Test that a feed posting every few minutes is due again after min_interval."""
+    source = Source(name='Busy', feed_url='https://busy.example/feed')
+
+    update_source_schedule(source, entries(20, 300), new_count=5, now=NOW, min_interval=1800)
+
+    assert source.post_interval == 300
+    assert source.last_new_item_at == NOW
+    assert source.next_due_at == NOW + timedelta(seconds=1800)
+
+
+def test_slow_source_is_polled_less_often():
+    """Test that a daily feed is polled about twice a day."""
+    source = Source(name='Daily', feed_url='https://daily.example/feed')
+
+    update_source_schedule(source, entries(10, 24 * HOUR), new_count=1, now=NOW)
+
+    assert source.next_due_at == NOW + timedelta(hours=12)
+
+
+def test_silent_source_backs_off_to_max():
+    """Test that silence stretches the interval up to max_interval."""
+    source = Source(name='Quiet', feed_url='https://quiet.example/feed', post_interval=HOUR,
+                    last_new_item_at=NOW - timedelta(hours=10))
+
+    assert poll_interval(source, NOW, min_interval=1800, max_interval=86400) == 5 * HOUR
+    source.last_new_item_at = NOW - timedelta(days=30)
+    assert poll_interval(source, NOW, min_interval=1800, max_interval=86400) == 86400
+
+
+def test_post_interval_is_smoothed():
+    """Test that a new observation moves the average halfway."""
+    source = Source(name='Shift', feed_url='https://shift.example/feed', post_interval=4 * HOUR)
+
+    update_source_schedule(source, entries(5, 2 * HOUR), new_count=0, now=NOW)
+
+    assert source.post_interval == 3 * HOUR
+    assert source.last_new_item_at is None
+
+
+def test_unknown_source_is_due_after_minimum():
+    """Test that a feed without dates is polled at the minimum interval."""
+    source = Source(name='Undated', feed_url='https://undated.example/feed')
+
+    update_source_schedule(source, [None], new_count=1, now=NOW,
+                           min_interval=600)
+
+    assert source.post_interval is None
+    assert source.next_due_at == NOW + timedelta(seconds=600)
@@ -0,0 +1,120 @@
+"""Tests for run instrumentation."""
+
+import json
+from unittest.mock import patch
+from sqlalchemy import create_engine, text
+
+from feedrr.instrumentation import (
+    RunReport,
+    active_report,
+    profiled,
+    record_batch,
+    record_render,
+    record_source,
+)
+
+
+def test_stage_records_wall_cpu_and_queries():
+    """Test stage timing and SQLAlchemy query counting."""
+    engine = create_engine("sqlite:///:memory:")
+    report = RunReport("build")
+
+    with report.activate():
+        with report.stage("fetch"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        with report.stage("generate"):
+            pass
+
+    fetch, generate = report.stages
+    assert fetch['name'] == "fetch"
+    assert fetch['queries'] == 2
+    assert fetch['wall_seconds'] >= 0 and fetch['cpu_seconds'] >= 0
+    assert generate['queries'] == 0
+
+    # Hooks are removed once the report is no longer active
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 3"))
+    assert report.query_count == 2
+
+
+def test_record_helpers_without_active_report():
+    """Test that recording outside a run is a no-op."""
+    assert active_report() is None
+    record_source("https://example.com/feed", seconds=1.0)
+    record_batch(8, 8, 0.5)
+    record_render("index.html", 0.1)
+
+
+def test_record_source_merges_fields():
+    """Test that fetch and save measurements for a source are merged."""
+    report = RunReport("build")
+
+    with report.activate():
+        record_source("https://example.com/feed", bytes=2048, status=200)
+        record_source("https://example.com/feed", name="Example", seconds=0.4, new=3)
+        record_batch(32, 20, 1.5)
+        record_render("index.html", 0.2, bytes=100)
+
+    source, = report.to_dict()['sources']
+    assert source == {
+        'url': "https://example.com/feed", 'bytes': 2048, 'status': 200,
+        'name': "Example", 'seconds': 0.4, 'new': 3
+    }
+    assert report.batches == [{'size': 32, 'encoded': 20, 'seconds': 1.5}]
+    assert report.renders[0]['name'] == "index.html"
+
+
+def test_write_report_and_summary(tmp_path):
+    """Test the JSON report and rich summary table."""
+    report = RunReport("build")
+    with report.activate():
+        with report.stage("fetch"):
+            record_source("https://slow.example.com/feed", name="Slow", seconds=3.0, bytes=4096)
+            record_source("https://down.example.com/feed", name="Down", seconds=0.1, error="timeout")
+
+    path = report.write(tmp_path / "logs")
+
+    data = json.loads(path.read_text())
+    assert path.name.startswith("run-") and path.suffix == ".json"
+    assert data['command'] == "build"
+    assert [stage['name'] for stage in data['stages']] == ["fetch"]
+    assert [source['name'] for source in data['sources']] == ["Slow", "Down"]
+    assert report.summary_table().row_count == 4
+
+
+def test_profiled_cprofile(tmp_path):
+    """Test writing cProfile stats."""
+    import pstats
+
+    with profiled(tmp_path / "profile") as path:
+        sum(range(1000))
+
+    assert path == tmp_path / "profile.prof"
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_profiled_disabled():
+    """Test that profiling is skipped without an output path."""
+    with profiled(None) as path:
+        pass
+    assert path is None
+
+
+def test_fetch_feed_records_bytes():
+    """Test that the RSS fetcher reports download size and status."""
+    from unittest.mock import Mock
+    from feedrr.fetcher.rss import fetch_feed
+
+    mock_response = Mock()
+    mock_response.content = b"<rss version='2.0'><channel></channel></rss>"
+    mock_response.status_code = 200
+    report = RunReport("fetch")
+
+    with report.activate(), patch('feedrr.fetcher.rss.requests.get', return_value=mock_response):
+        fetch_feed("https://example.com/feed.xml")
+
+    source = report.sources["https://example.com/feed.xml"]
+    assert source['bytes'] == len(mock_response.content)
+    assert source['status'] == 200
@@ -0,0 +1,178 @@
+"""Tests for the memory-mapped embedding matrix."""
+
+import pytest
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.storage.models import Base, Source, Article
+from feedrr.processor.dedup import serialize_embedding, EmbeddingIndex
+from feedrr.processor.matrix import EmbeddingMatrix
+
+
+@pytest.fixture
+def db_session():
+    """Create an in-memory database for testing."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    yield session
+    session.close()
+
+
+def add_embedded_article(session, article_id, vector):
+    """Store an article with an embedding."""
+    if not session.query(Source).count():
+        session.add(Source(id=1, name="S", feed_url="https://example.com/feed"))
+    session.add(Article(
+        id=article_id,
+        url=f"https://example.com/{article_id}",
+        title=f"Article {article_id}",
+        source_id=1,
+        embedding=serialize_embedding(np.array(vector, dtype=np.float32))
+    ))
+    session.commit()
+
+
+def test_append_and_memmap(tmp_path):
+    """Test that appended rows are normalized and memory-mapped."""
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    assert len(matrix) == 0
+    assert matrix.vectors.shape == (0, 0)
+
+    matrix.append([1, 2], np.array([[3.0, 4.0], [0.0, 2.0]]))
+
+    assert isinstance(matrix.vectors, np.memmap)
+    np.testing.assert_allclose(matrix.vectors, [[0.6, 0.8], [0.0, 1.0]], rtol=1e-6)
+    assert matrix.ids.tolist() == [1, 2]
+
+
+def test_append_skips_mirrored_ids(tmp_path):
+    """Test that rows already in the mirror are not appended twice."""
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    matrix.append([1], np.array([[1.0, 0.0]]))
+
+    assert matrix.append([1, 2], np.array([[1.0, 0.0], [0.0, 1.0]])) == 1
+    assert matrix.ids.tolist() == [1, 2]
+
+
+def test_append_rejects_dimension_change(tmp_path):
+    """Test that vectors of a different dimension are rejected."""
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    matrix.append([1], np.array([[1.0, 0.0]]))
+
+    with pytest.raises(ValueError):
+        matrix.append([2], np.array([[1.0, 0.0, 0.0]]))
+
+
+def test_reopen_persists_rows(tmp_path):
+    """Test that a new instance maps previously appended rows."""
+    EmbeddingMatrix(tmp_path, "test-model").append([5], np.array([[0.0, 1.0]]))
+
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+
+    assert len(matrix) == 1
+    assert matrix.ids.tolist() == [5]
+
+
+def test_model_change_starts_fresh(tmp_path):
+    """Test that a mirror built by another model is ignored and overwritten."""
+    EmbeddingMatrix(tmp_path, "old-model").append([5], np.array([[0.0, 1.0]]))
+
+    matrix = EmbeddingMatrix(tmp_path, "new-model")
+    assert len(matrix) == 0
+
+    matrix.append([6], np.array([[1.0, 0.0, 0.0]]))
+    assert matrix.ids.tolist() == [6]
+    assert matrix.vectors.shape == (1, 3)
+
+
+def test_uncommitted_tail_is_ignored(tmp_path):
+    """Test that bytes written after the last committed row are discarded."""
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    matrix.append([1], np.array([[1.0, 0.0]]))
+    with open(matrix.vectors_path, 'ab') as f:
+        f.write(b'\x00' * 6)  # Simulate an interrupted append
+
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    matrix.append([2], np.array([[0.0, 1.0]]))
+
+    np.testing.assert_allclose(matrix.vectors, [[1.0, 0.0], [0.0, 1.0]])
+
+
+def test_sync_from_session(db_session, tmp_path):
+    """Test mirroring embeddings stored in the database."""
+    add_embedded_article(db_session, 1, [1.0, 0.0])
+    add_embedded_article(db_session, 2, [0.0, 1.0])
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+
+    assert matrix.sync(db_session) == 2
+    assert matrix.sync(db_session) == 0
+
+    add_embedded_article(db_session, 3, [1.0, 1.0])
+    assert matrix.sync(db_session) == 1
+    assert sorted(matrix.ids.tolist()) == [1, 2, 3]
+
+
+def test_sync_rebuilds_after_embeddings_removed(db_session, tmp_path):
+    """Test that the mirror is rebuilt when the database holds fewer embeddings."""
+    add_embedded_article(db_session, 1, [1.0, 0.0])
+    add_embedded_article(db_session, 2, [0.0, 1.0])
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    matrix.sync(db_session)
+
+    db_session.get(Article, 1).embedding = None
+    db_session.commit()
+    matrix.sync(db_session)
+
+    assert matrix.ids.tolist() == [2]
+
+
+def test_sync_notices_replaced_ids(db_session, tmp_path):
+    """Test that a compaction plus an insert is noticed even though the count is unchanged."""
+    add_embedded_article(db_session, 1, [1.0, 0.0])
+    add_embedded_article(db_session, 2, [0.0, 1.0])
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    matrix.sync(db_session)
+
+    db_session.get(Article, 1).embedding = None
+    db_session.commit()
+    add_embedded_article(db_session, 3, [1.0, 1.0])
+
+    assert matrix.sync(db_session) == 2
+    assert sorted(matrix.ids.tolist()) == [2, 3]
+
+
+def test_sync_remembers_unreadable_rows(db_session, tmp_path, capsys):
+    """Test that a row that fails to deserialize is logged once and not rescanned."""
+    add_embedded_article(db_session, 1, [1.0, 0.0])
+    add_embedded_article(db_session, 2, [0.0, 1.0])
+    db_session.get(Article, 2).embedding = b"not a pickle"
+    db_session.commit()
+
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    assert matrix.sync(db_session) == 1
+    assert "Skipping embedding of article 2" in capsys.readouterr().out
+
+    reopened = EmbeddingMatrix(tmp_path, "test-model")
+    assert reopened.skipped == {2}
+    assert reopened.sync(db_session) == 0
+    assert capsys.readouterr().out == ""
+
+    # Once the unreadable embedding is gone it is forgotten
+    db_session.get(Article, 2).embedding = None
+    db_session.commit()
+    add_embedded_article(db_session, 3, [1.0, 1.0])
+    assert reopened.sync(db_session) == 1
+    assert reopened.skipped == set()
+    assert sorted(reopened.ids.tolist()) == [1, 3]
+
+
+def test_embedding_index_over_memmap(tmp_path):
+    """Test neighbour search directly over the memory-mapped matrix."""
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    matrix.append([1, 2], np.array([[1.0, 0.0], [0.0, 1.0]]))
+
+    index = EmbeddingIndex(matrix.ids, matrix.vectors)
+
+    assert index.neighbours(np.array([0.9, 0.1]), threshold=0.9) == [1]
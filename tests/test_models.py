@@ -134,3 +134,30 @@ def test_unique_feed_url(db_session):
     # Should raise integrity error
     with pytest.raises(Exception):
         db_session.commit()
+
+
+def test_upgrade_schema_adds_missing_columns(tmp_path):
+    """Test that databases created by older versions gain new columns."""
+    from sqlalchemy import inspect, text
+    from feedrr.storage.models import upgrade_schema
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE articles (id INTEGER PRIMARY KEY, url VARCHAR(1000) NOT NULL, "
+            "title VARCHAR(500) NOT NULL, source_id INTEGER NOT NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO articles (id, url, title, source_id) VALUES (1, 'https://e.com/1', 'Old', 1)"
+        ))
+
+    upgrade_schema(engine)
+
+    columns = {column['name'] for column in inspect(engine).get_columns('articles')}
+    assert {'canonical_url', 'simhash', 'embedding'} <= columns
+
+    session = Session(engine)
+    article = session.get(Article, 1)
+    assert article.title == 'Old'
+    assert article.simhash is None
+    session.close()
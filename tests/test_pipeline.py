@@ -0,0 +1,179 @@
+"""Tests for the pipelined build."""
+
+import pytest
+import numpy as np
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.fetcher.rss import FetchResult
+from feedrr.pipeline import run_pipelined
+from feedrr.processor.cache import CACHE_FILE, EmbeddingCache
+from feedrr.processor.dedup import entry_text
+from feedrr.processor.topics import MODEL_NAME
+from feedrr.storage.db import load_topics_from_config
+from feedrr.storage.models import Article, Base, Source
+
+
+TOPICS = [
+    {"name": "Technology", "slug": "tech", "keywords": ["software", "code"]},
+    {"name": "Sports", "slug": "sports", "keywords": ["match", "team"]},
+]
+
+VOCAB = ["software", "code", "match", "team", "release", "final"]
+
+CONFIG = {"topics": TOPICS, "llm": {"batch_size": 4}, "tagging": {"threshold": 0.3}}
+
+
+class KeywordEncoder:
+    """Deterministic encoder: one dimension per vocabulary word plus one for the rest."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            words = text.lower().split()
+            other = sum(1 for word in words if word not in VOCAB)
+            vectors.append([float(words.count(word)) for word in VOCAB] + [float(other)])
+        return np.array(vectors, dtype=np.float32)
+
+
+class FakeScheduler:
+    """Scheduler answering from prepared results (None = deferred)."""
+
+    def __init__(self, results):
+        self.results = results
+
+    def run(self, urls):
+        for url in urls:
+            result = self.results[url]
+            if isinstance(result, Exception):
+                raise result
+            yield url, result
+
+
+def feed_result(url, articles):
+    return FetchResult(url=url, articles=articles, status=200, entries=len(articles),
+                       published_dates=[None] * len(articles))
+
+
+@pytest.fixture
+def db_session():
+    """Create an in-memory database with topics and three sources."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    load_topics_from_config(session, TOPICS)
+    for name in ("a", "b", "c"):
+        session.add(Source(name=name, feed_url=f"https://{name}.example.com/feed.xml"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def encoder():
+    """Patch the model loader with the keyword encoder."""
+    model = KeywordEncoder()
+    with patch('feedrr.processor.batch.get_model', return_value=model), \
+            patch('feedrr.processor.topics.get_model', return_value=model), \
+            patch.dict('feedrr.processor.topics._topic_matrices', clear=True):
+        yield model
+
+
+def articles_for(host, count, words):
+    return [
+        {'url': f"https://{host}.example.com/{n}", 'title': f"Story {host} {n}",
+         'content': f"{words} number {n} from {host}", 'image_url': None, 'published_date': None}
+        for n in range(count)
+    ]
+
+
+def test_run_pipelined_saves_and_tags(db_session, encoder, tmp_path):
+    """Test that fetched articles are saved, tagged and embedded once each."""
+    sources = db_session.query(Source).order_by(Source.id).all()
+    scheduler = FakeScheduler({
+        sources[0].feed_url: feed_result(sources[0].feed_url, articles_for("a", 5, "software code software code release")),
+        sources[1].feed_url: feed_result(sources[1].feed_url, articles_for("b", 3, "team match team match final")),
+        sources[2].feed_url: None,
+    })
+    reported = []
+
+    result = run_pipelined(db_session, CONFIG, tmp_path, sources, scheduler, model=encoder,
+                           on_result=lambda source, fetched, new: reported.append((source.name, new)))
+
+    assert result.fetched == 2
+    assert result.deferred == 1
+    assert result.new == 8
+    assert result.processed == 8
+    assert reported == [("a", 5), ("b", 3)]
+
+    articles = db_session.query(Article).all()
+    assert len(articles) == 8
+    assert all(article.topics for article in articles)
+    assert all(article.embedding is not None for article in articles)
+    tech = [a for a in articles if a.url.startswith("https://a.")]
+    assert all("tech" in [t.topic.slug for t in a.topics] for a in tech)
+
+    # Article texts went through the model once, in the embed stage
+    encoded = [text for call in encoder.calls for text in call if text.startswith("Story")]
+    assert len(encoded) == 8
+    assert sources[0].last_fetched is not None
+
+
+def test_run_pipelined_uses_embedding_cache(db_session, encoder, tmp_path):
+    """Test that cached texts skip the model and only newly encoded ones are stored."""
+    sources = db_session.query(Source).order_by(Source.id).all()
+    cached = articles_for("b", 3, "team match team match final")
+    texts = [entry_text(article['title'], article['content']) for article in cached]
+    with EmbeddingCache(tmp_path / CACHE_FILE, MODEL_NAME) as cache:
+        for text, vector in zip(texts, encoder.encode(texts)):
+            cache.put(text, vector)
+    encoder.calls.clear()
+    scheduler = FakeScheduler({
+        sources[0].feed_url: feed_result(sources[0].feed_url, articles_for("a", 2, "software code")),
+        sources[1].feed_url: feed_result(sources[1].feed_url, cached),
+        sources[2].feed_url: None,
+    })
+
+    with patch.object(EmbeddingCache, 'put', autospec=True, side_effect=EmbeddingCache.put) as put:
+        result = run_pipelined(db_session, CONFIG, tmp_path, sources, scheduler, model=encoder)
+
+    assert result.processed == 5
+    encoded = [text for call in encoder.calls for text in call if text.startswith("Story")]
+    assert sorted(encoded) == ["Story a 0 software code number 0 from a", "Story a 1 software code number 1 from a"]
+    stored = [call.args[1] for call in put.call_args_list if call.args[1].startswith("Story")]
+    assert sorted(stored) == sorted(encoded)
+    sport = db_session.query(Article).filter(Article.url.startswith("https://b.")).all()
+    assert all("sports" in [t.topic.slug for t in article.topics] for article in sport)
+
+
+def test_run_pipelined_backpressure(db_session, encoder, tmp_path):
+    """Test that tiny queues slow the stages down without deadlocking."""
+    sources = db_session.query(Source).order_by(Source.id).all()
+    scheduler = FakeScheduler({
+        source.feed_url: feed_result(source.feed_url, articles_for(source.name, 10, "software"))
+        for source in sources
+    })
+
+    result = run_pipelined(db_session, CONFIG, tmp_path, sources, scheduler, model=encoder, queue_size=1)
+
+    assert result.new == 30
+    assert result.processed == 30
+    assert result.stages['embed'].items == 30
+
+
+def test_run_pipelined_stage_failure(db_session, encoder, tmp_path):
+    """Test that a failure in the fetch stage stops the pipeline and is raised."""
+    sources = db_session.query(Source).order_by(Source.id).all()
+    scheduler = FakeScheduler({
+        sources[0].feed_url: feed_result(sources[0].feed_url, articles_for("a", 2, "software")),
+        sources[1].feed_url: RuntimeError("scheduler broke"),
+        sources[2].feed_url: None,
+    })
+
+    with pytest.raises(RuntimeError, match="scheduler broke"):
+        run_pipelined(db_session, CONFIG, tmp_path, sources, scheduler, model=encoder)
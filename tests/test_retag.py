@@ -0,0 +1,182 @@
+"""Tests for incremental re-tagging."""
+
+import pytest
+import numpy as np
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.storage.models import Base, Source, Article, ArticleTopic, Topic
+from feedrr.storage.db import save_articles, load_topics_from_config
+from feedrr.processor.batch import ArticleProcessor
+from feedrr.processor.retag import find_changed_topics, topic_version
+
+
+TOPICS = [
+    {"name": "Technology", "slug": "tech", "keywords": ["software", "code"]},
+    {"name": "Sports", "slug": "sports", "keywords": ["match", "team"]},
+]
+
+VOCAB = ["software", "code", "match", "team", "chess"]
+
+
+class KeywordEncoder:
+    """Deterministic encoder: one dimension per vocabulary word plus one for the rest."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            words = text.lower().split()
+            other = sum(1 for word in words if word not in VOCAB)
+            vectors.append([float(words.count(word)) for word in VOCAB] + [float(other)])
+        return np.array(vectors, dtype=np.float32)
+
+
+@pytest.fixture
+def db_session():
+    """Create an in-memory database with topics and a source."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    load_topics_from_config(session, TOPICS)
+    session.add(Source(name="Test Source", feed_url="https://example.com/feed.xml"))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def encoder():
+    """Patch the model loader with the keyword encoder."""
+    model = KeywordEncoder()
+    with patch('feedrr.processor.batch.get_model', return_value=model), \
+            patch('feedrr.processor.topics.get_model', return_value=model), \
+            patch.dict('feedrr.processor.topics._topic_matrices', clear=True):
+        yield model
+
+
+def make_processor(session, tmp_path, topics):
+    config = {"topics": topics, "tagging": {"threshold": 0.3, "top_k": 1}}
+    return ArticleProcessor(session, config, tmp_path)
+
+
+def tagged_slugs(session):
+    session.expire_all()
+    return {
+        article.title: sorted(t.topic.slug for t in article.topics)
+        for article in session.query(Article).order_by(Article.id)
+    }
+
+
+def test_topic_version_tracks_effective_settings():
+    """Test that the version changes with keywords, threshold and top_k."""
+    topic = {"slug": "tech", "keywords": ["software"]}
+
+    assert topic_version(topic) == topic_version(dict(topic))
+    assert topic_version(topic) != topic_version({"slug": "tech", "keywords": ["hardware"]})
+    assert topic_version(topic, default_threshold=0.3) == topic_version({**topic, "threshold": 0.3})
+    assert topic_version(topic, top_k=2) != topic_version(topic, top_k=3)
+
+
+def test_retag_after_keyword_change(db_session, encoder, tmp_path):
+    """Test that editing a topic re-scores stored embeddings without re-encoding articles."""
+    source = db_session.query(Source).one()
+    save_articles(db_session, source, [
+        {'url': 'https://a.example.com/1', 'title': 'Compiler', 'content': 'software code'},
+        {'url': 'https://b.example.com/1', 'title': 'Tournament', 'content': 'chess match'},
+    ])
+    processor = make_processor(db_session, tmp_path, TOPICS)
+    assert processor.retag().articles == 0  # Fresh topics: only records hashes
+    processor.process(db_session.query(Article).order_by(Article.id).all())
+    processor.close()
+    assert tagged_slugs(db_session) == {"Compiler": ["tech"], "Tournament": ["sports"]}
+    assert find_changed_topics(db_session, TOPICS, 0.3, 1) == []
+
+    edited = [TOPICS[0], {"name": "Games", "slug": "sports", "keywords": ["chess"]}]
+    encoder.calls.clear()
+    processor = make_processor(db_session, tmp_path, edited)
+    result = processor.retag()
+    processor.close()
+
+    assert result.changed_topics == ["sports"]
+    assert result.articles == 0  # Tournament still matches sports
+    # Only the edited topic's keywords reached the model
+    assert encoder.calls == [["chess"]]
+
+    edited = [{"name": "Technology", "slug": "tech", "keywords": ["chess"]}, TOPICS[1]]
+    processor = make_processor(db_session, tmp_path, edited)
+    result = processor.retag()
+    processor.close()
+
+    assert result.changed_topics == ["tech", "sports"]
+    assert result.articles == 2
+    assert tagged_slugs(db_session) == {"Compiler": ["general"], "Tournament": ["tech"]}
+    tournament = db_session.query(Article).filter_by(title="Tournament").one()
+    assert tournament.topics[0].score == pytest.approx(1 / np.sqrt(3), rel=1e-5)
+    assert tournament.topics[0].rank == 1
+    assert db_session.query(Topic).filter_by(slug="tech").one().definition_hash == \
+        topic_version(edited[0], 0.3, 1)
+
+
+def test_retag_follows_prefiltered_duplicates(db_session, encoder, tmp_path):
+    """Test that copies resolved by the prefilter follow their original."""
+    source = db_session.query(Source).one()
+    body = "match team match team match team chess match team final"
+    save_articles(db_session, source, [
+        {'url': 'https://a.example.com/2', 'title': 'Release', 'content': body},
+        {'url': 'https://b.example.com/2', 'title': 'Release', 'content': body},
+    ])
+    processor = make_processor(db_session, tmp_path, TOPICS)
+    processor.retag()
+    result = processor.process(db_session.query(Article).order_by(Article.id).all())
+    processor.close()
+    assert result.prefiltered == 1
+    assert tagged_slugs(db_session) == {"Release": ["sports"]}
+
+    edited = [TOPICS[0], {"name": "Sports", "slug": "sports", "keywords": ["chess"]}]
+    processor = make_processor(db_session, tmp_path, edited)
+    processor.retag()
+    processor.close()
+
+    original, copy = db_session.query(Article).order_by(Article.id).all()
+    assert copy.embedding is None
+    assert [t.topic.slug for t in copy.topics] == [t.topic.slug for t in original.topics] == ["general"]
+
+
+def test_retag_backfills_unscored_rows_once(db_session, encoder, tmp_path):
+    """Test that legacy unscored rows are scored once, and rows re-scoring cannot reach never retrigger it."""
+    source = db_session.query(Source).one()
+    save_articles(db_session, source, [
+        {'url': 'https://a.example.com/3', 'title': 'Compiler', 'content': 'software code'},
+        {'url': 'https://b.example.com/3', 'title': 'Archived', 'content': 'software'},
+    ])
+    processor = make_processor(db_session, tmp_path, TOPICS)
+    processor.retag()
+    processor.process(db_session.query(Article).order_by(Article.id).all())
+    processor.close()
+
+    # Legacy state: scores missing, a topic since removed from config, an article without an embedding
+    removed = Topic(name="Old", slug="old")
+    db_session.add(removed)
+    db_session.flush()
+    compiler, archived = db_session.query(Article).order_by(Article.id).all()
+    archived.embedding = None
+    db_session.add(ArticleTopic(article_id=compiler.id, topic_id=removed.id, score=None, rank=2))
+    db_session.query(ArticleTopic).update({ArticleTopic.score: None})
+    db_session.commit()
+
+    processor = make_processor(db_session, tmp_path, TOPICS)
+    processor.retag()
+    processor.close()
+    db_session.expire_all()
+    assert compiler.topics[0].topic.slug == "tech" and compiler.topics[0].score is not None
+
+    processor = make_processor(db_session, tmp_path, TOPICS)
+    with patch('feedrr.processor.retag.score_stored_embeddings', side_effect=AssertionError("re-scored")):
+        result = processor.retag()
+    processor.close()
+    assert result.articles == 0
@@ -0,0 +1,116 @@
+"""Tests for archive retention and compaction."""
+
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.storage.models import Base, Source, Article, Topic, ArticleTopic, create_database, get_engine, get_session
+from feedrr.storage.retention import archive_articles, cold_article_ids, iter_archive, vacuum
+
+
+NOW = datetime(2026, 6, 15, 12, 0)
+
+
+@pytest.fixture
+def db_session():
+    """Create an in-memory database with one tagged source."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(Source(name="Example", feed_url="https://example.com/feed.xml"))
+    session.add(Topic(name="Technology", slug="tech"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def add_article(session, n, age_days, content="Body text", published=True):
+    date = NOW - timedelta(days=age_days)
+    article = Article(
+        url=f"https://example.com/{n}", title=f"Article {n}", content=content,
+        embedding=b"vector", source_id=1, simhash=n,
+        published_date=date if published else None, fetched_date=date
+    )
+    session.add(article)
+    session.flush()
+    session.add(ArticleTopic(article_id=article.id, topic_id=1, score=0.5, rank=1))
+    session.commit()
+    return article
+
+
+def test_cold_article_ids(db_session):
+    """Test that only old articles with content, outside the newest keep, are cold."""
+    old = add_article(db_session, 1, 200)
+    unpublished = add_article(db_session, 2, 150, published=False)
+    add_article(db_session, 3, 10)
+    add_article(db_session, 4, 300, content=None)
+    db_session.query(Article).filter(Article.url.endswith("/4")).update({Article.embedding: None})
+    db_session.commit()
+
+    assert cold_article_ids(db_session, NOW - timedelta(days=90), keep=0) == [old.id, unpublished.id]
+    # The two newest in site order (undated articles sort last) are protected
+    assert cold_article_ids(db_session, NOW - timedelta(days=90), keep=2) == [unpublished.id]
+
+
+def test_archive_articles(db_session, tmp_path):
+    """Test that cold articles are written to monthly archives and stripped in the database."""
+    first = add_article(db_session, 1, 200)
+    second = add_article(db_session, 2, 170)
+    recent = add_article(db_session, 3, 5)
+
+    result = archive_articles(db_session, tmp_path, days=90, keep=0, now=NOW)
+
+    assert result.articles == 2
+    assert [path.name for path in result.files] == ["articles-2025-11.jsonl.gz", "articles-2025-12.jsonl.gz"]
+
+    records = list(iter_archive(tmp_path))
+    assert [record['id'] for record in records] == [first.id, second.id]
+    assert records[0]['content'] == "Body text"
+    assert records[0]['source'] == "Example"
+    assert records[0]['topics'] == ["tech"]
+
+    db_session.expire_all()
+    stripped = db_session.get(Article, first.id)
+    assert stripped.content is None
+    assert stripped.embedding is None
+    assert stripped.title == "Article 1"
+    assert stripped.simhash == 1
+    assert len(stripped.topics) == 1
+    assert db_session.get(Article, recent.id).content == "Body text"
+
+    # Nothing left to archive; a later run appends to the same monthly file
+    assert archive_articles(db_session, tmp_path, days=90, keep=0, now=NOW).articles == 0
+    add_article(db_session, 4, 200)
+    archive_articles(db_session, tmp_path, days=90, keep=0, now=NOW)
+    assert len(list(iter_archive(tmp_path))) == 3
+
+
+def test_archive_articles_dry_run(db_session, tmp_path):
+    """Test that a dry run counts without writing or clearing anything."""
+    add_article(db_session, 1, 200)
+
+    result = archive_articles(db_session, tmp_path / "archive", days=90, keep=0, now=NOW, dry_run=True)
+
+    assert result.articles == 1
+    assert not (tmp_path / "archive").exists()
+    assert db_session.query(Article).one().content == "Body text"
+
+
+def test_vacuum_reclaims_space(tmp_path):
+    """Test that clearing content and vacuuming shrinks the database file."""
+    db_path = tmp_path / "feedrr.db"
+    create_database(str(db_path))
+    session = get_session(str(db_path))
+    session.add(Source(name="Example", feed_url="https://example.com/feed.xml"))
+    session.add(Topic(name="Technology", slug="tech"))
+    session.commit()
+    for n in range(50):
+        add_article(session, n, 200, content="x" * 20000)
+    before = db_path.stat().st_size
+
+    archive_articles(session, tmp_path / "archive", days=90, keep=0, now=NOW)
+    session.close()
+    vacuum(get_engine(str(db_path)))
+
+    assert db_path.stat().st_size < before / 4
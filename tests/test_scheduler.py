@@ -0,0 +1,192 @@
+"""Tests for the per-host fetch scheduler."""
+
+import json
+import random
+import threading
+import pytest
+from datetime import datetime, timezone
+
+from feedrr.bench.corpus import CorpusSpec, generate_corpus
+from feedrr.bench.server import FeedServer
+from feedrr.fetcher.rss import FetchResult, fetch_feed_result, parse_retry_after
+from feedrr.fetcher.scheduler import HostScheduler, host_key, scheduler_from_config
+
+
+class FakeClock:
+    """Clock that only moves when the scheduler sleeps."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeFetch:
+    """Fetch function answering from a status map and logging calls."""
+
+    def __init__(self, clock, statuses=None, retry_after=None):
+        self.clock = clock
+        self.statuses = statuses or {}
+        self.retry_after = retry_after
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, url: str) -> FetchResult:
+        with self.lock:
+            self.calls.append((url, self.clock()))
+        status = self.statuses.get(url, 200)
+        if callable(status):
+            status = status()
+        result = FetchResult(url=url, status=status)
+        if status == 200:
+            result.articles = [{'url': f"{url}/1"}]
+        else:
+            result.error = f"{status} Error"
+            result.retry_after = self.retry_after
+        return result
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_scheduler(clock, fetch, **kwargs):
+    options = dict(min_interval=1.0, backoff_base=60.0, jitter=0.0, max_wait=30.0,
+                   fetch=fetch, clock=clock, sleep=clock.sleep, rng=random.Random(1))
+    options.update(kwargs)
+    return HostScheduler(**options)
+
+
+def test_host_key():
+    """Test that feeds are grouped by host and port."""
+    assert host_key("https://Example.com/feed") == "example.com"
+    assert host_key("http://127.0.0.1:8765/a.xml") == "127.0.0.1:8765"
+
+
+def test_parse_retry_after():
+    """Test both Retry-After forms."""
+    now = datetime(2024, 6, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Sat, 01 Jun 2024 12:01:30 GMT", now=now) == 90.0
+    assert parse_retry_after("Sat, 01 Jun 2024 11:00:00 GMT", now=now) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_same_host_is_spaced(clock):
+    """Test that requests to one host are min_interval apart."""
+    fetch = FakeFetch(clock)
+    scheduler = make_scheduler(clock, fetch, min_interval=2.0)
+
+    results = scheduler.fetch_all([f"https://a.example/{n}" for n in range(3)] + ["https://b.example/0"])
+
+    assert all(result.ok for _, result in results)
+    times = [when for url, when in fetch.calls if "a.example" in url]
+    assert times == [1000.0, 1002.0, 1004.0]
+    # The other host does not wait behind a.example
+    assert [when for url, when in fetch.calls if "b.example" in url] == [1000.0]
+
+
+def test_backoff_is_exponential_with_jitter(clock):
+    """Test backoff growth, the cap, jitter bounds and Retry-After."""
+    scheduler = make_scheduler(clock, FakeFetch(clock), backoff_max=300.0)
+
+    assert [scheduler.backoff_delay(n) for n in (1, 2, 3, 4, 5)] == [60.0, 120.0, 240.0, 300.0, 300.0]
+    assert scheduler.backoff_delay(1, retry_after=10.0) == 10.0
+    assert scheduler.backoff_delay(1, retry_after=10_000.0) == 300.0
+
+    jittered = make_scheduler(clock, FakeFetch(clock), jitter=0.2)
+    delays = [jittered.backoff_delay(1) for _ in range(50)]
+    assert all(48.0 <= delay <= 72.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_throttled_host_is_deferred(clock):
+    """Test that a throttled host's remaining feeds are deferred, not fetched."""
+    urls = [f"https://slow.example/{n}" for n in range(3)] + ["https://ok.example/0"]
+    fetch = FakeFetch(clock, statuses={url: 429 for url in urls[:3]})
+    scheduler = make_scheduler(clock, fetch)
+
+    results = dict(scheduler.fetch_all(urls))
+
+    assert results["https://ok.example/0"].ok
+    assert results["https://slow.example/0"].throttled
+    assert results["https://slow.example/1"] is None
+    assert results["https://slow.example/2"] is None
+    assert [url for url, _ in fetch.calls].count("https://slow.example/0") == 1
+    state = scheduler.hosts["slow.example"]
+    assert state.failures == 1
+    assert state.last_status == 429
+    assert state.next_allowed == pytest.approx(clock.now + 60.0)
+
+
+def test_short_retry_after_is_retried(clock):
+    """Test that a throttle with a short Retry-After is waited out and retried."""
+    answers = iter([429, 200])
+    fetch = FakeFetch(clock, statuses={"https://a.example/feed": lambda: next(answers)}, retry_after=5.0)
+    scheduler = make_scheduler(clock, fetch)
+
+    results = scheduler.fetch_all(["https://a.example/feed"])
+
+    assert results[0][1].ok
+    assert [when for _, when in fetch.calls] == [1000.0, 1005.0]
+    assert scheduler.hosts["a.example"].failures == 0
+
+
+def test_not_found_does_not_back_off_host(clock):
+    """Test that a feed-level error leaves the rest of the host alone."""
+    fetch = FakeFetch(clock, statuses={"https://a.example/gone": 404})
+    scheduler = make_scheduler(clock, fetch)
+
+    results = dict(scheduler.fetch_all(["https://a.example/gone", "https://a.example/feed"]))
+
+    assert not results["https://a.example/gone"].ok
+    assert results["https://a.example/feed"].ok
+    assert scheduler.hosts["a.example"].failures == 0
+
+
+def test_state_persists_between_runs(clock, tmp_path):
+    """Test that backoff carries over to the next run through the state file."""
+    state_path = tmp_path / "host_state.json"
+    fetch = FakeFetch(clock, statuses={"https://a.example/feed": 503})
+    make_scheduler(clock, fetch, state_path=state_path).fetch_all(["https://a.example/feed"])
+
+    assert json.loads(state_path.read_text())["a.example"]["failures"] == 1
+
+    clock.now += 10
+    later = FakeFetch(clock)
+    results = make_scheduler(clock, later, state_path=state_path).fetch_all(["https://a.example/feed"])
+    assert results == [("https://a.example/feed", None)]
+    assert later.calls == []
+
+    clock.now += 60
+    results = make_scheduler(clock, later, state_path=state_path).fetch_all(["https://a.example/feed"])
+    assert results[0][1].ok
+    assert json.loads(state_path.read_text())["a.example"]["failures"] == 0
+
+
+def test_scheduler_from_config():
+    """Test reading scheduler settings from the fetcher config."""
+    scheduler = scheduler_from_config({'fetcher': {'max_workers': 2, 'host_min_interval': 0.5}}, max_wait=5)
+
+    assert scheduler.max_workers == 2
+    assert scheduler.min_interval == 0.5
+    assert scheduler.max_wait == 5
+
+
+def test_retry_after_from_server(tmp_path):
+    """Test that a 429 with Retry-After from a real server is reported."""
+    corpus = generate_corpus(tmp_path, CorpusSpec(sources=1, entries=2))
+    with FeedServer(corpus.directory) as server:
+        result = fetch_feed_result(server.feed_url(corpus.feeds[0].path, status=429, retry_after=7))
+        ok = fetch_feed_result(server.feed_url(corpus.feeds[0].path))
+
+    assert result.throttled
+    assert result.retry_after == 7.0
+    assert result.articles == []
+    assert ok.ok and ok.status == 200 and len(ok.articles) == 2
@@ -0,0 +1,118 @@
+"""Tests for full-text search and the static search index."""
+
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.generator.search_index import build_shards, tokenize, write_search_index
+from feedrr.storage.models import Article, Base, Source, create_search_index
+from feedrr.storage.search import match_query, search_articles
+
+
+@pytest.fixture
+def db_session():
+    """Create an in-memory database with the search index and one source."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    assert create_search_index(engine)
+    session = Session(engine)
+    session.add(Source(name="Example", feed_url="https://example.com/feed.xml"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def add_article(session, n, title, content, **fields):
+    session.add(Article(url=f"https://example.com/{n}", title=title, content=content, source_id=1, **fields))
+    session.commit()
+
+
+def test_match_query():
+    """Test that free text becomes quoted terms with a prefix on the last one."""
+    assert match_query("rust compiler") == '"rust" "compiler"*'
+    assert match_query('NOT "x" OR (y)') == '"NOT" "x" "OR" "y"*'
+    assert match_query("  ?! ") == ''
+
+
+def test_search_articles_ranks_title_matches_first(db_session):
+    """Test that matches are found by stem and prefix, with title matches ranked first."""
+    add_article(db_session, 1, "Weekly roundup", "A new compiler release for Rust landed")
+    add_article(db_session, 2, "Rust compiler released", "Details inside")
+    add_article(db_session, 3, "Gardening tips", "Nothing about programming")
+
+    hits = search_articles(db_session, "rust compilers")
+    assert [hit.article.url for hit in hits] == ["https://example.com/2", "https://example.com/1"]
+    assert hits[0].article.source.name == "Example"
+    assert "[" in hits[1].snippet
+
+    assert [hit.article.url for hit in search_articles(db_session, "garden")] == ["https://example.com/3"]
+    assert search_articles(db_session, "") == []
+
+
+def test_search_index_follows_updates_and_duplicates(db_session):
+    """Test that triggers keep the index in step with updates, and duplicates are hidden by default."""
+    add_article(db_session, 1, "Budget vote", "Parliament debates the budget")
+    add_article(db_session, 2, "Budget vote (copy)", "Parliament debates the budget", is_duplicate=True)
+
+    assert len(search_articles(db_session, "parliament")) == 1
+    assert len(search_articles(db_session, "parliament", include_duplicates=True)) == 2
+
+    # Compaction clears the content; the title stays searchable
+    db_session.query(Article).update({Article.content: None})
+    db_session.commit()
+    assert search_articles(db_session, "parliament") == []
+    assert len(search_articles(db_session, "budget")) == 1
+
+    db_session.query(Article).delete()
+    db_session.commit()
+    assert search_articles(db_session, "budget", include_duplicates=True) == []
+
+
+def test_create_search_index_indexes_existing_rows(tmp_path):
+    """Test that an index added to an existing database covers its articles."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(Source(name="Example", feed_url="https://example.com/feed.xml"))
+    add_article(session, 1, "Existing story", "Stored before search existed")
+
+    assert create_search_index(engine)
+    assert create_search_index(engine)  # Idempotent
+
+    assert len(search_articles(session, "existed")) == 1
+    session.close()
+
+
+def test_tokenize():
+    """Test that terms are lowercased, stripped of accents and at least two characters."""
+    assert tokenize("Café Déjà-vu: a 5G rollout") == ["cafe", "deja", "vu", "5g", "rollout"]
+
+
+def test_build_shards():
+    """Test that postings are grouped by term prefix and delta-encoded."""
+    articles = [
+        {'id': 10, 'title': "Rust release", 'content': None, 'source_name': "Blog", 'topics': ["Technology"]},
+        {'id': 4, 'title': "Rust news", 'content': "A release", 'source_name': "News", 'topics': []},
+    ]
+
+    shards = build_shards(articles)
+
+    assert shards['ru'] == {'rust': [4, 6]}
+    assert shards['re'] == {'release': [4, 6]}
+    assert shards['te'] == {'technology': [10]}
+    assert shards['bl'] == {'blog': [10]}
+
+
+def test_write_search_index_replaces_stale_shards(tmp_path):
+    """Test that the index files are written and shards no longer needed are removed."""
+    write_search_index([{'id': 1, 'title': "Zebra", 'topics': []}], tmp_path)
+    assert (tmp_path / "terms-ze.json").exists()
+
+    write_search_index([{'id': 2, 'title': "Apple", 'topics': []}], tmp_path)
+
+    meta = json.loads((tmp_path / "meta.json").read_text())
+    assert meta == {'version': 1, 'documents': 1, 'shards': ["ap"]}
+    assert json.loads((tmp_path / "terms-ap.json").read_text()) == {'apple': [2]}
+    assert not (tmp_path / "terms-ze.json").exists()
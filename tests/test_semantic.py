@@ -0,0 +1,118 @@
+"""Tests for semantic search over the embedding matrix."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.processor.cache import EmbeddingCache
+from feedrr.processor.matrix import EmbeddingMatrix
+from feedrr.processor.semantic import SearchFilters, encode_query, passing_ids, semantic_search
+from feedrr.storage.db import load_topics_from_config
+from feedrr.storage.models import Article, ArticleTopic, Base, Source, Topic
+
+
+@pytest.fixture
+def db_session():
+    """Create an in-memory database with two sources and two topics."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(Source(name="Alpha", feed_url="https://alpha.example.com/feed.xml"))
+    session.add(Source(name="Beta", feed_url="https://beta.example.com/feed.xml"))
+    load_topics_from_config(session, [{"name": "Technology", "slug": "tech"}, {"name": "Sports", "slug": "sports"}])
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def matrix(db_session, tmp_path):
+    """Ten articles whose embeddings point further from [1, 0] as the id grows."""
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+    vectors = []
+    for n in range(10):
+        db_session.add(Article(
+            url=f"https://example.com/{n}", title=f"Article {n}", content=f"Text {n}",
+            source_id=1 if n % 2 == 0 else 2, published_date=datetime(2026, 1, n + 1),
+            is_duplicate=(n == 1)
+        ))
+        vectors.append([1.0, n / 5.0])
+    db_session.commit()
+    tech = db_session.query(Topic).filter_by(slug="tech").one()
+    for article_id in (6, 8, 10):
+        db_session.add(ArticleTopic(article_id=article_id, topic_id=tech.id, score=0.5, rank=1))
+    db_session.commit()
+    matrix.append(range(1, 11), np.array(vectors, dtype=np.float32))
+    return matrix
+
+
+def titles(hits):
+    return [hit.article.title for hit in hits]
+
+
+def test_semantic_search_ranks_by_similarity(db_session, matrix):
+    """Test that hits come back most similar first, without duplicates."""
+    hits = semantic_search(db_session, matrix, np.array([1.0, 0.0], dtype=np.float32), limit=3)
+
+    assert titles(hits) == ["Article 0", "Article 2", "Article 3"]
+    assert hits[0].score == pytest.approx(1.0)
+    assert hits[0].snippet == "Text 0"
+    assert hits[0].article.source.name == "Alpha"
+
+
+def test_semantic_search_filters(db_session, matrix):
+    """Test the time range, source and topic filters, which widen the candidate set as needed."""
+    query = np.array([1.0, 0.0], dtype=np.float32)
+
+    hits = semantic_search(db_session, matrix, query, limit=2,
+                           filters=SearchFilters(since=datetime(2026, 1, 5), until=datetime(2026, 1, 8)))
+    assert titles(hits) == ["Article 4", "Article 5"]
+
+    hits = semantic_search(db_session, matrix, query, limit=10, filters=SearchFilters(source="Beta"))
+    assert titles(hits) == ["Article 3", "Article 5", "Article 7", "Article 9"]
+
+    # The only tech articles are the least similar, so a tight overfetch has to widen
+    hits = semantic_search(db_session, matrix, query, limit=1, filters=SearchFilters(topic="Technology"))
+    assert titles(hits) == ["Article 5"]
+
+    hits = semantic_search(db_session, matrix, query, limit=3, filters=SearchFilters(include_duplicates=True))
+    assert titles(hits) == ["Article 0", "Article 1", "Article 2"]
+
+
+def test_semantic_search_selective_filter(db_session, matrix):
+    """Test that a filter too selective for candidate checks is run over the whole table."""
+    query = np.array([1.0, 0.0], dtype=np.float32)
+
+    with patch('feedrr.processor.semantic.MAX_CANDIDATES', 4), \
+            patch('feedrr.processor.semantic.passing_ids', wraps=passing_ids) as checks:
+        hits = semantic_search(db_session, matrix, query, limit=1, filters=SearchFilters(topic="tech"))
+
+    # The four best candidates were checked, then the table was filtered instead of widening
+    assert titles(hits) == ["Article 5"]
+    assert checks.call_count == 1
+
+
+def test_semantic_search_empty_matrix(db_session, tmp_path):
+    """Test that an empty matrix returns no hits."""
+    matrix = EmbeddingMatrix(tmp_path, "test-model")
+
+    assert semantic_search(db_session, matrix, np.array([1.0, 0.0], dtype=np.float32)) == []
+
+
+def test_encode_query_uses_cache(tmp_path):
+    """Test that a cached query is answered without loading the model."""
+    cache = EmbeddingCache(tmp_path / "cache.db", "test-model")
+    model = Mock()
+    model.encode.return_value = np.array([3.0, 4.0], dtype=np.float32)
+
+    first = encode_query("rust compilers", model=model, cache=cache)
+    with patch('feedrr.processor.semantic.get_model', side_effect=AssertionError("model loaded")):
+        second = encode_query("rust compilers", cache=cache)
+
+    assert model.encode.call_count == 1
+    np.testing.assert_allclose(first, [0.6, 0.8])
+    np.testing.assert_allclose(second, first)
+    cache.close()
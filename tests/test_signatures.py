@@ -0,0 +1,110 @@
+"""Tests for the URL canonicalization and SimHash prefilter."""
+
+import pytest
+
+from feedrr.storage.signatures import (
+    canonicalize_url,
+    compute_simhash,
+    hamming_distance,
+    SignatureIndex,
+)
+
+
+STORY = (
+    "Netflix has struck a deal to acquire Warner Bros in a landmark agreement "
+    "that reshapes the streaming industry and brings HBO under one roof"
+)
+
+
+@pytest.mark.parametrize("variant", [
+    "https://example.com/news/story",
+    "http://example.com/news/story",
+    "https://www.example.com/news/story",
+    "https://EXAMPLE.com/news/story/",
+    "https://example.com/news/story?utm_source=rss&utm_medium=feed",
+    "https://example.com/news/story#comments",
+    "https://example.com/news/story/amp",
+    "https://amp.example.com/news/story",
+    "https://example.com:443/news/story?fbclid=abc",
+])
+def test_canonicalize_url_variants(variant):
+    """Test that tracking, scheme, host and AMP variants canonicalize together."""
+    assert canonicalize_url(variant) == "https://example.com/news/story"
+
+
+def test_canonicalize_url_keeps_meaningful_query():
+    """Test that non-tracking parameters are kept and sorted."""
+    url = "https://example.com/article?page=2&id=7&utm_campaign=x"
+    assert canonicalize_url(url) == "https://example.com/article?id=7&page=2"
+
+
+def test_canonicalize_url_invalid():
+    """Test that strings without a host are returned unchanged."""
+    assert canonicalize_url("not a url") == "not a url"
+
+
+def test_simhash_identical_text():
+    """Test that identical text produces identical signatures."""
+    assert compute_simhash("Netflix buys Warner", STORY) == compute_simhash("Netflix buys Warner", STORY)
+
+
+def test_simhash_ignores_html_and_case():
+    """Test that HTML markup and case do not change the signature."""
+    html = f"<p>{STORY.upper()}</p>"
+    assert compute_simhash("Netflix buys Warner", html) == compute_simhash("netflix buys warner", STORY)
+
+
+def test_simhash_near_duplicate_is_close():
+    """Test that a small edit moves only a few bits."""
+    edited = STORY + " according to people familiar with the matter"
+    a = compute_simhash("Netflix buys Warner", STORY)
+    b = compute_simhash("Netflix buys Warner", edited)
+    c = compute_simhash("Local team wins", "The home side won the championship match after extra time in a tense final")
+    assert hamming_distance(a, b) < hamming_distance(a, c)
+
+
+def test_simhash_short_text():
+    """Test that very short texts get no signature."""
+    assert compute_simhash("Comments", None) is None
+
+
+def test_simhash_fits_signed_64bit():
+    """Test that signatures fit an SQLite INTEGER column."""
+    signature = compute_simhash("Netflix buys Warner", STORY)
+    assert -(1 << 63) <= signature < (1 << 63)
+
+
+def test_signature_index_exact_and_near():
+    """Test finding exact and near-exact signatures."""
+    index = SignatureIndex()
+    index.add(1, 0b1011)
+    index.add(2, 1 << 40)
+
+    assert index.find(0b1011) == 1
+    assert index.find(0b1010, max_distance=1) == 1
+    assert index.find(0b1010, max_distance=0) is None
+    assert index.find((1 << 40) | (1 << 41) | (1 << 42), max_distance=3) == 2
+
+
+def test_signature_index_before_id():
+    """Test that only earlier articles are matched."""
+    index = SignatureIndex()
+    index.add(5, 42)
+    index.add(9, 42)
+
+    assert index.find(42, before_id=9) == 5
+    assert index.find(42, before_id=5) is None
+
+
+def test_signature_index_negative_signatures():
+    """Test signed signatures round-trip through the bands."""
+    index = SignatureIndex()
+    index.add(1, -1)
+    assert index.find(-1) == 1
+    assert index.find(-2, max_distance=1) == 1
+
+
+def test_signature_index_rejects_large_distance():
+    """Test that distances beyond the band guarantee are rejected."""
+    with pytest.raises(ValueError):
+        SignatureIndex().find(0, max_distance=4)
@@ -0,0 +1,190 @@
+"""Tests for warm-start snapshots."""
+
+import io
+import json
+import os
+import tarfile
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from feedrr.processor.cache import EmbeddingCache
+from feedrr.snapshot import (
+    SnapshotError,
+    export_snapshot,
+    import_snapshot,
+    model_folder_name,
+)
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Data directory with an embedding cache and matrix, and a hub cache with the model."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    cache = EmbeddingCache(data_dir / "embedding_cache.db", "test-model")
+    cache.put("hello", np.ones(4, dtype=np.float32))
+    cache.close()
+    (data_dir / "embeddings.f32").write_bytes(np.ones((2, 4), dtype=np.float32).tobytes())
+    (data_dir / "embeddings.ids").write_bytes(np.arange(2, dtype=np.int64).tobytes())
+    (data_dir / "embeddings.json").write_text(json.dumps({"version": 1, "rows": 2}))
+
+    model_dir = tmp_path / "hub"
+    model = model_dir / model_folder_name()
+    (model / "blobs").mkdir(parents=True)
+    (model / "blobs" / "abc123").write_text("weights")
+    (model / "snapshots" / "rev").mkdir(parents=True)
+    os.symlink("../../blobs/abc123", model / "snapshots" / "rev" / "model.safetensors")
+    return data_dir, model_dir
+
+
+def test_roundtrip(source, tmp_path):
+    """Test that export then import into empty directories restores everything."""
+    data_dir, model_dir = source
+    archive = tmp_path / "snapshot.tar"
+
+    manifest = export_snapshot(archive, data_dir, model_dir)
+    assert "data/embedding_cache.db" in manifest["files"]
+    assert f"model/{model_folder_name()}/blobs/abc123" in manifest["files"]
+
+    target_data, target_model = tmp_path / "new-data", tmp_path / "new-hub"
+    outcome = import_snapshot(archive, target_data, target_model)
+
+    assert "model" in outcome["restored"]
+    assert outcome["skipped"] == []
+    assert (target_data / "embeddings.f32").read_bytes() == (data_dir / "embeddings.f32").read_bytes()
+    link = target_model / model_folder_name() / "snapshots" / "rev" / "model.safetensors"
+    assert link.is_symlink()
+    assert link.read_text() == "weights"
+
+    cache = EmbeddingCache(target_data / "embedding_cache.db", "test-model")
+    assert cache.get("hello") is not None
+    cache.close()
+
+
+def test_import_keeps_existing_files(source, tmp_path):
+    """Test that existing files are skipped unless overwrite is set."""
+    data_dir, model_dir = source
+    archive = tmp_path / "snapshot.tar"
+    export_snapshot(archive, data_dir, model_dir)
+    (data_dir / "embeddings.json").write_text("newer")
+
+    outcome = import_snapshot(archive, data_dir, model_dir)
+    assert "data/embeddings.json" in outcome["skipped"]
+    assert "model" in outcome["skipped"]
+    assert (data_dir / "embeddings.json").read_text() == "newer"
+
+    import_snapshot(archive, data_dir, model_dir, overwrite=True)
+    assert json.loads((data_dir / "embeddings.json").read_text())["rows"] == 2
+
+
+def rewrite(archive, change):
+    """Rewrite a snapshot, passing (name, bytes) through change."""
+    with tarfile.open(archive) as original:
+        members = [(m, original.extractfile(m).read() if m.isfile() else None) for m in original.getmembers()]
+    with tarfile.open(archive, "w") as updated:
+        for member, data in members:
+            if data is not None:
+                data = change(member.name, data)
+                member.size = len(data)
+                updated.addfile(member, io.BytesIO(data))
+            else:
+                updated.addfile(member)
+
+
+def test_import_rejects_other_model(source, tmp_path):
+    """Test that a snapshot built for another model is refused."""
+    data_dir, model_dir = source
+    archive = tmp_path / "snapshot.tar"
+    export_snapshot(archive, data_dir, model_dir)
+
+    def other_model(name, data):
+        if name != "manifest.json":
+            return data
+        manifest = json.loads(data)
+        manifest["model"] = "someone/else"
+        return json.dumps(manifest).encode()
+
+    rewrite(archive, other_model)
+    with pytest.raises(SnapshotError, match="someone/else"):
+        import_snapshot(archive, tmp_path / "new-data", tmp_path / "new-hub")
+    assert not (tmp_path / "new-data").exists()
+
+
+def test_import_skips_matrix_of_other_format(source, tmp_path):
+    """Test that a matrix in another format is left to be rebuilt from the database."""
+    data_dir, model_dir = source
+    archive = tmp_path / "snapshot.tar"
+    export_snapshot(archive, data_dir, model_dir)
+
+    def old_format(name, data):
+        if name != "manifest.json":
+            return data
+        manifest = json.loads(data)
+        manifest["matrix_format"] = 0
+        return json.dumps(manifest).encode()
+
+    rewrite(archive, old_format)
+    outcome = import_snapshot(archive, tmp_path / "new-data", tmp_path / "new-hub")
+
+    assert "data/embeddings.f32" in outcome["skipped"]
+    assert "data/embedding_cache.db" in outcome["restored"]
+    assert not (tmp_path / "new-data" / "embeddings.f32").exists()
+
+
+def test_import_rejects_corrupt_file(source, tmp_path):
+    """Test that a checksum mismatch aborts before anything is moved into place."""
+    data_dir, model_dir = source
+    archive = tmp_path / "snapshot.tar"
+    export_snapshot(archive, data_dir, model_dir)
+
+    rewrite(archive, lambda name, data: b"corrupt" if name == "data/embeddings.json" else data)
+    with pytest.raises(SnapshotError, match="checksum"):
+        import_snapshot(archive, tmp_path / "new-data", tmp_path / "new-hub")
+    assert not (tmp_path / "new-data").exists()
+
+
+def test_import_rejects_non_snapshot(tmp_path):
+    """Test that an arbitrary file is reported as unusable."""
+    archive = tmp_path / "snapshot.tar"
+    archive.write_text("not a tar file")
+
+    with pytest.raises(SnapshotError):
+        import_snapshot(archive, tmp_path / "data", tmp_path / "hub")
+
+
+@pytest.mark.parametrize("has_data_filter", [True, False])
+@pytest.mark.parametrize("name, kind, linkname", [
+    ("model/../../escape.txt", tarfile.REGTYPE, ""),
+    ("model/link", tarfile.SYMTYPE, "/etc/passwd"),
+    ("model/a/link", tarfile.SYMTYPE, "../../../escape.txt"),
+    ("model/fifo", tarfile.FIFOTYPE, ""),
+])
+def test_import_rejects_unsafe_members(source, tmp_path, has_data_filter, name, kind, linkname):
+    """Test that members escaping the staging folder are refused, with or without tarfile filters."""
+    data_dir, model_dir = source
+    archive = tmp_path / "snapshot.tar"
+    export_snapshot(archive, data_dir, model_dir)
+    with tarfile.open(archive, "a") as snapshot:
+        member = tarfile.TarInfo(name)
+        member.type, member.linkname = kind, linkname
+        snapshot.addfile(member, io.BytesIO(b"") if kind == tarfile.REGTYPE else None)
+
+    with patch("feedrr.snapshot.HAS_DATA_FILTER", has_data_filter), pytest.raises(SnapshotError):
+        import_snapshot(archive, tmp_path / "new-data", tmp_path / "new-hub")
+    assert not (tmp_path / "escape.txt").exists()
+    assert not (tmp_path / "new-data").exists()
+
+
+def test_import_without_data_filter_keeps_model_links(source, tmp_path):
+    """Test that the hub cache's relative symlinks pass the manual member check."""
+    data_dir, model_dir = source
+    archive = tmp_path / "snapshot.tar"
+    export_snapshot(archive, data_dir, model_dir)
+
+    with patch("feedrr.snapshot.HAS_DATA_FILTER", False):
+        import_snapshot(archive, tmp_path / "new-data", tmp_path / "new-hub")
+
+    link = tmp_path / "new-hub" / model_folder_name() / "snapshots" / "rev" / "model.safetensors"
+    assert link.is_symlink() and link.read_text() == "weights"
@@ -0,0 +1,172 @@
+"""Tests for streaming feed parsing and fetching."""
+
+import pytest
+from datetime import datetime, timezone
+
+from feedrr.bench.corpus import CorpusSpec, generate_corpus
+from feedrr.bench.server import FeedServer
+from feedrr.fetcher.frequency import observed_post_interval
+from feedrr.fetcher.rss import parse_feed
+from feedrr.fetcher.stream import StreamOptions, iter_entries, known_url_checker, stream_feed
+
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/">
+    <channel>
+        <title>Test Feed</title>
+        <item>
+            <title>With media</title>
+            <link>https://example.com/1</link>
+            <description><![CDATA[<p><img src="https://example.com/html.jpg" /> Summary</p>]]></description>
+            <media:group><media:content url="https://example.com/media.jpg" /></media:group>
+            <pubDate>Mon, 01 Jan 2024 12:00:00 GMT</pubDate>
+        </item>
+        <item>
+            <title>Full content</title>
+            <guid>https://example.com/2</guid>
+            <description>Short</description>
+            <content:encoded><![CDATA[<p>Long <img src="https://example.com/body.jpg"/></p>]]></content:encoded>
+        </item>
+        <item>
+            <title>No link</title>
+            <guid isPermaLink="false">abc-123</guid>
+        </item>
+    </channel>
+</rss>""".encode('utf-8')
+
+
+def chunked(data: bytes, size: int = 7):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_iter_entries_fields():
+    """Test field extraction from small chunks."""
+    articles = list(iter_entries(chunked(RSS)))
+
+    assert [a['url'] for a in articles] == ["https://example.com/1", "https://example.com/2"]
+    assert articles[0]['image_url'] == "https://example.com/media.jpg"
+    assert articles[0]['published_date'] == datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    assert articles[1]['title'] == "Full content"
+    assert "Long" in articles[1]['content']
+    assert articles[1]['image_url'] == "https://example.com/body.jpg"
+
+
+def test_iter_entries_skips_known_urls():
+    """Test that known entries are reported without extracting their fields."""
+    known = {"https://example.com/1"}
+
+    articles = list(iter_entries([RSS], known_url_checker(known)))
+
+    assert articles[0] == {
+        'url': "https://example.com/1", 'known': True,
+        'published_date': datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    }
+    assert articles[1]['title'] == "Full content"
+
+
+def test_known_url_checker_uses_canonical_urls():
+    """Test that tracking-parameter variants of stored URLs count as known."""
+    is_known = known_url_checker({"https://example.com/story"})
+
+    assert is_known("https://example.com/story")
+    assert is_known("http://www.example.com/story/?utm_source=rss")
+    assert not is_known("https://example.com/other")
+
+
+def test_iter_entries_matches_feedparser(tmp_path):
+    """Test that streamed RSS and Atom parse like parse_feed."""
+    corpus = generate_corpus(tmp_path, CorpusSpec(sources=4, entries=6, atom_fraction=0.5, seed=5))
+
+    for feed in corpus.feeds:
+        data = corpus.feed_bytes(feed)
+        streamed = list(iter_entries(chunked(data, 1000)))
+        parsed = parse_feed(data)
+        assert [a['url'] for a in streamed] == [a['url'] for a in parsed]
+        assert [a['title'] for a in streamed] == [a['title'] for a in parsed]
+        assert [a['published_date'] for a in streamed] == [a['published_date'] for a in parsed]
+
+
+def test_iter_entries_falls_back_on_bad_xml():
+    """Test that HTML entities invalid in XML fall back to feedparser."""
+    data = b"""<?xml version="1.0"?><rss version="2.0"><channel>
+        <item><title>One</title><link>https://example.com/1</link></item>
+        <item><title>Caf&eacute;&nbsp;two</title><link>https://example.com/2</link></item>
+    </channel></rss>"""
+
+    articles = list(iter_entries(chunked(data, 40)))
+
+    assert [a['url'] for a in articles] == ["https://example.com/1", "https://example.com/2"]
+
+
+def test_iter_entries_truncated_body():
+    """Test that a body cut off mid-entry keeps the complete entries."""
+    data = RSS[:RSS.index(b"<title>No link")]
+
+    articles = list(iter_entries([data]))
+
+    assert len(articles) == 2
+
+
+@pytest.fixture
+def server(tmp_path):
+    corpus = generate_corpus(tmp_path, CorpusSpec(sources=1, entries=3))
+    with FeedServer(corpus.directory) as feed_server:
+        yield feed_server
+
+
+def test_stream_feed_stops_at_known_urls(server):
+    """Test early stop after a run of already-stored entries."""
+    url = server.feed_url("huge.xml", entries=2000)
+    known = {f"https://huge.bench.example/{n}" for n in range(5, 2000)}
+
+    result = stream_feed(url, options=StreamOptions(known_urls=known, stop_after_known=10))
+
+    assert result.ok
+    assert result.stopped_early
+    assert [a['url'] for a in result.articles] == [f"https://huge.bench.example/{n}" for n in range(5)]
+    assert result.entries == 15
+    assert len(result.published_dates) == 15  # Known entries are dated too
+    assert result.bytes < 200_000  # Stopped long before the ~1 MB body was read
+
+
+def test_stream_feed_dates_known_entries(server):
+    """Test that a poll with one new entry still yields a posting interval from the known ones."""
+    url = server.feed_url("huge.xml", entries=50)
+    known = {f"https://huge.bench.example/{n}" for n in range(1, 50)}
+
+    result = stream_feed(url, options=StreamOptions(known_urls=known, stop_after_known=10))
+
+    assert [a['url'] for a in result.articles] == ["https://huge.bench.example/0"]
+    assert len(result.published_dates) == 11
+    assert observed_post_interval(result.published_dates, datetime(2025, 1, 1)) == 60.0
+
+
+def test_stream_feed_stops_at_old_entries(server):
+    """Test early stop at entries older than the last fetch."""
+    since = datetime(2024, 5, 31, 23, 0)  # Huge feed entries are a minute apart from 2024-06-01
+    result = stream_feed(server.feed_url("huge.xml", entries=500),
+                         options=StreamOptions(since=since, stop_after_known=3))
+
+    assert result.stopped_early
+    assert len(result.articles) == 64  # 61 newer entries, then 3 old ones before stopping
+
+
+def test_stream_feed_size_cap(server):
+    """Test that the body is cut off at max_bytes."""
+    result = stream_feed(server.feed_url("huge.xml", entries=2000),
+                         options=StreamOptions(max_bytes=100_000, stop_after_known=0))
+
+    assert result.ok
+    assert result.truncated
+    assert result.bytes == 100_000
+    assert 0 < len(result.articles) < 2000
+
+
+def test_stream_feed_errors(server):
+    """Test that HTTP errors are reported, not raised."""
+    result = stream_feed(server.feed_url("missing.xml"))
+
+    assert not result.ok
+    assert result.status == 404
+    assert result.articles == []
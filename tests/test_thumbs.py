@@ -0,0 +1,190 @@
+"""Tests for local image thumbnails."""
+
+import io
+import json
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from feedrr.generator.site import generate_site
+from feedrr.generator.thumbs import (
+    FAILURE_RETRY, ThumbnailOptions, download, generate_thumbnails, make_thumbnail,
+    thumbnail_options_from_config
+)
+from feedrr.storage.models import Article, Base, Source
+
+Image = pytest.importorskip("PIL.Image")
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def encoded(size, color="red", mode="RGB", image_format="PNG"):
+    out = io.BytesIO()
+    Image.new(mode, size, color).save(out, image_format)
+    return out.getvalue()
+
+
+@pytest.fixture
+def images():
+    """Image bodies by URL; the first two are the same picture."""
+    return {
+        "https://cdn.example.com/a.png": encoded((1200, 800)),
+        "https://mirror.example.com/a.png": encoded((1200, 800)),
+        "https://cdn.example.com/b.jpg": encoded((300, 900), "blue", image_format="JPEG"),
+    }
+
+
+def fake_download(images):
+    def download(http, url, options):
+        if url not in images:
+            raise ValueError("404 Not Found")
+        return images[url]
+    return download
+
+
+def view_model(*urls):
+    return [{'id': n, 'title': f"Article {n}", 'image_url': url} for n, url in enumerate(urls, start=1)]
+
+
+def test_make_thumbnail_fits_box():
+    """Test that images shrink to fit the box, keeping their aspect ratio, and are never enlarged."""
+    options = ThumbnailOptions(width=600, height=400)
+
+    data, width, height = make_thumbnail(encoded((1200, 1200)), options)
+    assert (width, height) == (400, 400)
+    with Image.open(io.BytesIO(data)) as image:
+        assert (image.format, image.size) == ("WEBP", (400, 400))
+
+    assert make_thumbnail(encoded((100, 50)), options)[1:] == (100, 50)
+
+
+def test_make_thumbnail_jpeg_flattens_transparency():
+    """Test that transparent images become JPEGs on a white background."""
+    data, _, _ = make_thumbnail(encoded((40, 40), (0, 0, 0, 0), mode="RGBA"), ThumbnailOptions(format='jpeg'))
+
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "JPEG"
+        assert all(channel > 250 for channel in image.getpixel((20, 20)))
+
+
+def test_generate_thumbnails(images, tmp_path):
+    """Test that thumbnails are content-addressed and the view model points at them."""
+    articles = view_model(*images, "https://cdn.example.com/missing.png", None, "data:image/png;base64,AAAA")
+
+    with patch('feedrr.generator.thumbs.download', side_effect=fake_download(images)):
+        result = generate_thumbnails(articles, tmp_path, ThumbnailOptions(), now=NOW)
+
+    assert (result.images, result.downloaded, result.failed) == (4, 3, 1)
+    thumbs = sorted(path.name for path in (tmp_path / "static" / "thumbs").glob("*.webp"))
+    assert len(thumbs) == 2  # The mirrored image is stored once
+
+    first, mirror, tall, missing, no_image, inline = articles
+    assert first['thumbnail'] == mirror['thumbnail']
+    assert first['thumbnail']['url'].startswith("static/thumbs/")
+    assert (first['thumbnail']['width'], first['thumbnail']['height']) == (600, 400)
+    assert (tall['thumbnail']['width'], tall['thumbnail']['height']) == (133, 400)
+    assert missing['thumbnail'] is None and no_image['thumbnail'] is None and inline['thumbnail'] is None
+
+
+def test_generate_thumbnails_skips_processed_images(images, tmp_path):
+    """Test that processed images and recent failures are not downloaded again."""
+    urls = [*images, "https://cdn.example.com/missing.png"]
+    with patch('feedrr.generator.thumbs.download', side_effect=fake_download(images)):
+        generate_thumbnails(view_model(*urls), tmp_path, ThumbnailOptions(), now=NOW)
+
+    articles = view_model(*urls)
+    with patch('feedrr.generator.thumbs.download', side_effect=AssertionError("downloaded")):
+        result = generate_thumbnails(articles, tmp_path, ThumbnailOptions(), now=NOW + timedelta(hours=1))
+    assert (result.downloaded, result.failed) == (0, 0)
+    assert articles[0]['thumbnail'] is not None
+
+    # Failures are retried once FAILURE_RETRY has passed
+    with patch('feedrr.generator.thumbs.download', side_effect=fake_download(images)) as fetch:
+        result = generate_thumbnails(view_model(*urls), tmp_path, ThumbnailOptions(), now=NOW + FAILURE_RETRY)
+    assert fetch.call_count == 1
+    assert result.failed == 1
+
+
+def test_generate_thumbnails_prunes_and_follows_settings(images, tmp_path):
+    """Test that thumbnails no longer shown are removed and new settings start a new cache."""
+    thumbs_dir = tmp_path / "static" / "thumbs"
+    with patch('feedrr.generator.thumbs.download', side_effect=fake_download(images)):
+        generate_thumbnails(view_model(*images), tmp_path, ThumbnailOptions(), now=NOW)
+        result = generate_thumbnails(view_model("https://cdn.example.com/b.jpg"), tmp_path,
+                                     ThumbnailOptions(), now=NOW)
+        assert (result.downloaded, result.removed) == (0, 1)
+
+        result = generate_thumbnails(view_model("https://cdn.example.com/b.jpg"), tmp_path,
+                                     ThumbnailOptions(format='jpeg'), now=NOW)
+
+    assert (result.downloaded, result.removed) == (1, 1)
+    assert [path.suffix for path in thumbs_dir.iterdir() if path.name != "manifest.json"] == [".jpg"]
+    manifest = json.loads((thumbs_dir / "manifest.json").read_text())
+    assert manifest['settings'] == "600x400-jpeg-q75"
+    assert list(manifest['images']) == ["https://cdn.example.com/b.jpg"]
+
+
+def test_download_caps_size():
+    """Test that bodies over max_bytes are refused, by header or while reading."""
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.headers = {}
+    response.iter_content.return_value = [b"x" * 60, b"x" * 60]
+    http = MagicMock()
+    http.get.return_value = response
+
+    with pytest.raises(ValueError, match="larger than 100 bytes"):
+        download(http, "https://cdn.example.com/big.png", ThumbnailOptions(max_bytes=100))
+
+    response.headers = {'Content-Length': "500"}
+    with pytest.raises(ValueError, match="larger than 100 bytes"):
+        download(http, "https://cdn.example.com/big.png", ThumbnailOptions(max_bytes=100))
+
+    response.headers = {}
+    assert download(http, "https://cdn.example.com/ok.png", ThumbnailOptions()) == b"x" * 120
+
+
+def test_thumbnail_options_from_config():
+    """Test that thumbnails are off unless enabled, and bad settings are reported."""
+    assert thumbnail_options_from_config({}) is None
+    assert thumbnail_options_from_config({'generator': {'thumbnails': {'enabled': False}}}) is None
+
+    options = thumbnail_options_from_config({'generator': {'thumbnails': {'enabled': True, 'width': 320}}})
+    assert (options.width, options.height) == (320, 400)
+
+    with pytest.raises(ValueError, match="Unknown thumbnail format"):
+        thumbnail_options_from_config({'generator': {'thumbnails': {'enabled': True, 'format': 'gif'}}})
+
+    with patch('feedrr.generator.thumbs.importlib.util.find_spec', return_value=None):
+        with pytest.raises(ValueError, match="Pillow"):
+            thumbnail_options_from_config({'generator': {'thumbnails': {'enabled': True}}})
+
+
+def test_generate_site_serves_thumbnails(images, tmp_path):
+    """Test that pages use lazy local thumbnails and the cache survives the static copy."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(Source(name="Example", feed_url="https://example.com/feed.xml"))
+    session.add(Article(url="https://example.com/1", title="Pictured", source_id=1,
+                        image_url="https://cdn.example.com/a.png"))
+    session.commit()
+
+    with patch('feedrr.generator.thumbs.download', side_effect=fake_download(images)):
+        generate_site(session, tmp_path, thumbnails=ThumbnailOptions())
+    with patch('feedrr.generator.thumbs.download', side_effect=AssertionError("downloaded")):
+        generate_site(session, tmp_path, thumbnails=ThumbnailOptions())
+
+    html = (tmp_path / "index.html").read_text()
+    assert 'src="static/thumbs/' in html
+    assert 'width="600" height="400" loading="lazy"' in html
+    assert (tmp_path / "static" / "css" / "style.css").exists()
+
+    # Without thumbnails the cache is dropped and originals are hot-linked
+    generate_site(session, tmp_path)
+    assert 'src="https://cdn.example.com/a.png" loading="lazy"' in (tmp_path / "index.html").read_text()
+    assert not (tmp_path / "static" / "thumbs").exists()
+    session.close()
@@ -4,7 +4,14 @@ import pytest
 from unittest.mock import Mock, patch
 import numpy as np
 
-from feedrr.processor.topics import assign_topics, cosine_similarity
+from feedrr.processor.topics import (
+    assign_topics,
+    cosine_similarity,
+    score_topics_batch,
+    get_topic_thresholds,
+    get_topic_matrix,
+    assign_topics_batch,
+)
 
 
 def test_cosine_similarity():
@@ -155,3 +162,89 @@ def test_assign_topics_sorting():
             assert len(result) == 2
             assert result[0] == "business"
             assert result[1] == "science"
+
+
+def test_score_topics_batch_thresholds_and_top_k():
+    """Test vectorized scoring with per-topic thresholds and top-k."""
+    slugs = ["tech", "science", "business"]
+    topic_matrix = np.eye(3, dtype=np.float32)
+    articles = np.array([
+        [0.8, 0.7, 0.1],   # tech and science match; business below threshold
+        [0.6, 0.4, 0.0],   # science scores 0.55 but its threshold is higher
+        [0.0, 0.0, 1.0],   # only business
+        [-1.0, 0.0, 0.0],  # nothing
+    ])
+    thresholds = np.array([0.3, 0.6, 0.3], dtype=np.float32)
+
+    results = score_topics_batch(articles, topic_matrix, slugs, thresholds, top_k=2)
+
+    assert [slug for slug, _ in results[0]] == ["tech", "science"]
+    assert results[0][0][1] > results[0][1][1]
+    assert [slug for slug, _ in results[1]] == ["tech"]
+    assert [slug for slug, _ in results[2]] == ["business"]
+    assert results[3] == []
+
+
+def test_score_topics_batch_top_k_limits_matches():
+    """Test that at most top_k topics are returned per article."""
+    slugs = ["a", "b", "c", "d"]
+    topic_matrix = np.eye(4, dtype=np.float32)
+    articles = np.array([[0.4, 0.3, 0.2, 0.1]])
+    thresholds = np.zeros(4, dtype=np.float32)
+
+    assert [s for s, _ in score_topics_batch(articles, topic_matrix, slugs, thresholds, top_k=3)[0]] == ["a", "b", "c"]
+    assert [s for s, _ in score_topics_batch(articles, topic_matrix, slugs, thresholds, top_k=10)[0]] == ["a", "b", "c", "d"]
+
+
+def test_score_topics_batch_thresholds_before_top_k():
+    """Test that topics failing their own threshold do not take top-k slots."""
+    slugs = ["strict", "picky", "loose"]
+    topic_matrix = np.eye(3, dtype=np.float32)
+    articles = np.array([[0.6, 0.5, 0.4]])
+    thresholds = np.array([0.9, 0.9, 0.1], dtype=np.float32)
+
+    results = score_topics_batch(articles, topic_matrix, slugs, thresholds, top_k=2)
+
+    assert [slug for slug, _ in results[0]] == ["loose"]
+    assert results[0][0][1] == pytest.approx(0.4 / np.linalg.norm([0.6, 0.5, 0.4]))
+
+
+def test_get_topic_thresholds():
+    """Test per-topic threshold overrides."""
+    topics = [
+        {"slug": "tech", "keywords": ["code"], "threshold": 0.5},
+        {"slug": "science", "keywords": ["research"]},
+    ]
+    thresholds = get_topic_thresholds(topics, ["tech", "science"], default_threshold=0.3)
+    np.testing.assert_allclose(thresholds, [0.5, 0.3])
+
+
+def test_get_topic_matrix_is_cached():
+    """Test that the topic matrix is encoded once per definition set."""
+    topics = [
+        {"slug": "cached-a", "keywords": ["alpha"]},
+        {"slug": "cached-b", "keywords": ["beta"]},
+        {"slug": "cached-empty", "keywords": []},
+    ]
+    model = Mock()
+    model.encode.return_value = np.array([[3.0, 4.0], [0.0, 2.0]])
+
+    slugs, matrix = get_topic_matrix(topics, model=model)
+    get_topic_matrix(topics, model=model)
+
+    assert slugs == ["cached-a", "cached-b"]
+    np.testing.assert_allclose(matrix, [[0.6, 0.8], [0.0, 1.0]])
+    model.encode.assert_called_once()
+
+
+def test_assign_topics_batch_falls_back_to_general():
+    """Test that articles without a match get the general topic."""
+    topics = [{"slug": "fallback-tech", "keywords": ["code"]}]
+    model = Mock()
+    model.encode.return_value = np.array([[1.0, 0.0]])
+
+    with patch('feedrr.processor.topics.get_model', return_value=model):
+        results = assign_topics_batch(np.array([[1.0, 0.0], [0.0, 1.0]]), topics)
+
+    assert results[0][0][0] == "fallback-tech"
+    assert results[1] == [("general", None)]